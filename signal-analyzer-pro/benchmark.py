@@ -0,0 +1,244 @@
+"""
+Signal Analyzer Pro - Benchmark de extremo a extremo
+Alimenta server.py con una traza (sintética o grabada, ver sources.py) y mide,
+sin radio ni herramientas del sistema:
+    - muestras/s del pipeline publish_wifi (estadísticas, buffer, almacén, emisión)
+    - latencia de emisión hasta la cola de los clientes (JSON y lotes binarios)
+    - crecimiento de memoria (tracemalloc y RSS)
+    - costo de fan-out por cliente conectado
+
+Uso:
+    python benchmark.py
+    python benchmark.py --trace sesion.csv --samples 50000 --clients 0,1,10,100 --json bench.json
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+
+
+# Muestras entre vaciados de las colas de los clientes de prueba
+DRAIN_EVERY = 500
+
+
+def percentile(values, p):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+
+def connect_clients(server, count, batch=False):
+    """Clientes de prueba suscritos a 'wifi' (el hilo de muestreo casi no corre)"""
+    clients = []
+    for _ in range(count):
+        client = server.socketio.test_client(server.app)
+        client.emit('start_wifi', {'interval': 3600, 'batch': batch, 'flush_interval': 0.05})
+        client.get_received()
+        clients.append(client)
+    return clients
+
+
+def disconnect(clients):
+    for client in clients:
+        client.disconnect()
+
+
+def bench_source(source, samples):
+    start = time.perf_counter()
+    for _ in range(samples):
+        source.read()
+    elapsed = time.perf_counter() - start
+    return {'samples_per_s': samples / elapsed}
+
+
+def bench_throughput(server, source, samples, clients):
+    """Publicación a máxima velocidad con `clients` clientes JSON"""
+    connected = connect_clients(server, clients)
+    latencies = []
+    received = 0
+    try:
+        elapsed = 0.0
+        for block in range(0, samples, DRAIN_EVERY):
+            start = time.perf_counter()
+            for _ in range(min(DRAIN_EVERY, samples - block)):
+                t = time.perf_counter()
+                server.publish_wifi(source.read())
+                latencies.append(time.perf_counter() - t)
+            elapsed += time.perf_counter() - start
+            # Vaciar las colas del cliente de prueba fuera del tiempo medido
+            received += sum(len(c.get_received()) for c in connected)
+    finally:
+        disconnect(connected)
+    return {
+        'clients': clients,
+        'samples_per_s': samples / elapsed,
+        'publish_us_p50': percentile(latencies, 0.5) * 1e6,
+        'publish_us_p99': percentile(latencies, 0.99) * 1e6,
+        'delivered': received
+    }
+
+
+def bench_latency(server, source, rate, seconds):
+    """
+    Publicación a ritmo fijo con un cliente JSON y uno por lotes; un hilo
+    drena sus colas cada 1 ms y compara la llegada con la hora de la muestra.
+    """
+    from emitter import FRAME_HEADER
+
+    json_client = connect_clients(server, 1)[0]
+    batch_client = connect_clients(server, 1, batch=True)[0]
+    # El cliente de prueba no envía acks: sin límite de frames en vuelo
+    max_in_flight = server.batch_emitter.max_in_flight
+    server.batch_emitter.max_in_flight = 1 << 30
+    json_latency, batch_latency = [], []
+    stop = threading.Event()
+
+    def poll():
+        while True:
+            stopping = stop.is_set()
+            now = time.time()
+            for message in json_client.get_received():
+                if message['name'] == 'wifi_data':
+                    sent = datetime.fromisoformat(message['args'][0]['timestamp']).timestamp()
+                    json_latency.append(now - sent)
+            for message in batch_client.get_received():
+                if message['name'] == 'wifi_batch':
+                    frame = message['args'][0]
+                    header = FRAME_HEADER.unpack_from(frame)
+                    count, t0 = header[3], header[5]
+                    deltas = memoryview(frame)[FRAME_HEADER.size:FRAME_HEADER.size + 2 * count].cast('H')
+                    ts = t0
+                    for delta in deltas:
+                        ts += delta / 1000
+                        batch_latency.append(now - ts)
+            if stopping:
+                return
+            time.sleep(0.001)
+
+    poller = threading.Thread(target=poll, daemon=True)
+    poller.start()
+    try:
+        interval = 1.0 / rate
+        deadline = time.monotonic()
+        end = deadline + seconds
+        while deadline < end:
+            server.publish_wifi(source.read())
+            deadline += interval
+            time.sleep(max(0.0, deadline - time.monotonic()))
+        time.sleep(0.3)  # Último flush del emisor
+    finally:
+        stop.set()
+        poller.join(timeout=2)
+        server.batch_emitter.max_in_flight = max_in_flight
+        disconnect([json_client, batch_client])
+
+    def summary(values):
+        values = [v * 1000 for v in values]
+        return {'count': len(values), 'p50_ms': percentile(values, 0.5),
+                'p99_ms': percentile(values, 0.99), 'max_ms': max(values, default=0.0)}
+
+    return {'rate_hz': rate, 'json': summary(json_latency), 'batch': summary(batch_latency)}
+
+
+def bench_memory(server, source, samples):
+    """Crecimiento de memoria al publicar `samples` muestras con un cliente"""
+    import psutil
+
+    process = psutil.Process()
+    connected = connect_clients(server, 1)
+    try:
+        server.store.flush()
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        rss_before = process.memory_info().rss
+        for i in range(samples):
+            server.publish_wifi(source.read())
+            if i % DRAIN_EVERY == 0:
+                connected[0].get_received()
+        connected[0].get_received()
+        server.store.flush()
+        after = tracemalloc.take_snapshot()
+        rss_after = process.memory_info().rss
+        tracemalloc.stop()
+    finally:
+        disconnect(connected)
+
+    growth = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    return {
+        'samples': samples,
+        'traced_growth_kb': growth / 1024,
+        'bytes_per_sample': growth / samples,
+        'rss_growth_kb': (rss_after - rss_before) / 1024
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de Signal Analyzer Pro')
+    parser.add_argument('--trace', help='traza CSV/NDJSON a reproducir (por defecto sintética)')
+    parser.add_argument('--samples', type=int, default=5000)
+    parser.add_argument('--clients', default='0,1,10,50', help='clientes JSON para el fan-out')
+    parser.add_argument('--rate', type=float, default=200.0, help='Hz de la prueba de latencia')
+    parser.add_argument('--seconds', type=float, default=3.0, help='duración de la prueba de latencia')
+    parser.add_argument('--json', help='guardar los resultados en este archivo')
+    args = parser.parse_args()
+
+    # server.py abre el almacén al importarse: base temporal y fuente de replay
+    workdir = tempfile.mkdtemp(prefix='signal-bench-')
+    os.environ['SIGNAL_DB'] = os.path.join(workdir, 'bench.db')
+    os.environ['SIGNAL_SOURCE'] = f"replay:{args.trace}@0" if args.trace else 'synthetic@0'
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import server
+
+    source = server.wifi_source
+    results = {'source': source.describe(), 'samples': args.samples}
+    try:
+        results['source_read'] = bench_source(source, args.samples)
+
+        results['throughput'] = []
+        for clients in (int(c) for c in args.clients.split(',')):
+            results['throughput'].append(bench_throughput(server, source, args.samples, clients))
+        base = results['throughput'][0]
+        for run in results['throughput']:
+            if run['clients'] > base['clients']:
+                per_sample = 1e6 / run['samples_per_s'] - 1e6 / base['samples_per_s']
+                run['fanout_us_per_client'] = per_sample / (run['clients'] - base['clients'])
+
+        results['latency'] = bench_latency(server, source, args.rate, args.seconds)
+        results['memory'] = bench_memory(server, source, args.samples)
+    finally:
+        server.store.close()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print("=" * 60)
+    print(f"Fuente: {results['source']} | lectura {results['source_read']['samples_per_s']:,.0f} muestras/s")
+    print("-" * 60)
+    print(f"{'clientes':>8} {'muestras/s':>12} {'p50 µs':>9} {'p99 µs':>9} {'fan-out µs/cliente':>20}")
+    for run in results['throughput']:
+        fanout = run.get('fanout_us_per_client')
+        print(f"{run['clients']:>8} {run['samples_per_s']:>12,.0f} {run['publish_us_p50']:>9.1f} "
+              f"{run['publish_us_p99']:>9.1f} {'' if fanout is None else f'{fanout:.1f}':>20}")
+    print("-" * 60)
+    latency = results['latency']
+    for mode in ('json', 'batch'):
+        stats = latency[mode]
+        print(f"Latencia {mode:>5} @ {latency['rate_hz']:.0f} Hz: p50 {stats['p50_ms']:.2f} ms | "
+              f"p99 {stats['p99_ms']:.2f} ms | máx {stats['max_ms']:.2f} ms ({stats['count']} muestras)")
+    memory = results['memory']
+    print(f"Memoria: {memory['traced_growth_kb']:.1f} KB trazados "
+          f"({memory['bytes_per_sample']:.1f} B/muestra) | RSS +{memory['rss_growth_kb']:.0f} KB")
+    print("=" * 60)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+"""
+Signal Analyzer Pro - Sondeo Bluetooth concurrente
+Descubre dispositivos con una sola consulta (hcitool inq, sin resolver nombres)
+y sondea RSSI y nombres en un pool acotado de workers. El RSSI se cachea por
+MAC con TTL y los nombres se conservan entre escaneos, ambos con expulsión LRU;
+el tiempo de ciclo escala con el número de workers, no de dispositivos.
+"""
+import subprocess
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import parsers
+
+
+DEFAULT_RSSI = -70
+
+
+class LRUCache:
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._data:
+                return None
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def __len__(self):
+        return len(self._data)
+
+
+class BluetoothProber:
+    def __init__(self, run_tool, workers=8, rssi_ttl=10.0, max_devices=1024,
+                 inquiry_timeout=8, probe_timeout=1):
+        self.run_tool = run_tool
+        self.rssi_ttl = rssi_ttl
+        self.inquiry_timeout = inquiry_timeout
+        self.probe_timeout = probe_timeout
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='bt-probe')
+        self._rssi = LRUCache(max_devices)    # mac -> (rssi, monotonic)
+        self._names = LRUCache(max_devices)   # mac -> nombre
+        self.last_cycle = None
+
+    def discover(self):
+        """Lista de MACs visibles; usa inquiry y cae a 'hcitool scan' si falla"""
+        try:
+            macs = parsers.parse_hcitool_inq(
+                self.run_tool(['hcitool', 'inq', '--flush'], self.inquiry_timeout)
+            )
+            if macs:
+                return macs
+        except (subprocess.SubprocessError, OSError) as e:
+            print(f"Error en hcitool inq: {e}")
+
+        # 'scan' ya resuelve nombres: aprovecharlos para el caché
+        devices = parsers.parse_hcitool_scan(
+            self.run_tool(['hcitool', 'scan', '--flush'], self.inquiry_timeout)
+        )
+        for mac, name in devices:
+            if name:
+                self._names.put(mac, name)
+        return [mac for mac, _ in devices]
+
+    def scan(self):
+        """Un ciclo completo: descubrimiento + sondeos en paralelo"""
+        start = time.monotonic()
+        macs = self.discover()
+
+        futures = []
+        for mac in macs:
+            if self._fresh_rssi(mac) is None:
+                futures.append(self._executor.submit(self._probe_rssi, mac))
+            if self._names.get(mac) is None:
+                futures.append(self._executor.submit(self._probe_name, mac))
+        if futures:
+            wait(futures, timeout=self.probe_timeout * (len(futures) + 1))
+
+        devices = []
+        for mac in macs:
+            cached = self._rssi.get(mac)
+            devices.append({
+                'mac': mac,
+                'name': self._names.get(mac) or 'Desconocido',
+                'rssi': cached[0] if cached else DEFAULT_RSSI
+            })
+
+        self.last_cycle = {
+            'devices': len(macs),
+            'probes': len(futures),
+            'seconds': time.monotonic() - start
+        }
+        return devices
+
+    def _fresh_rssi(self, mac):
+        cached = self._rssi.get(mac)
+        if cached and time.monotonic() - cached[1] <= self.rssi_ttl:
+            return cached[0]
+        return None
+
+    def _probe_rssi(self, mac):
+        try:
+            rssi = parsers.parse_hcitool_rssi(
+                self.run_tool(['hcitool', 'rssi', mac], self.probe_timeout)
+            )
+        except (subprocess.SubprocessError, OSError):
+            rssi = None
+        # Un fallo también se cachea para no repetir el sondeo hasta que expire
+        self._rssi.put(mac, (rssi if rssi is not None else DEFAULT_RSSI, time.monotonic()))
+
+    def _probe_name(self, mac):
+        try:
+            name = self.run_tool(['hcitool', 'name', mac], self.probe_timeout).strip()
+        except (subprocess.SubprocessError, OSError):
+            name = ''
+        # Cadena vacía = no resolvió; no se reintenta mientras siga en caché
+        self._names.put(mac, name)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
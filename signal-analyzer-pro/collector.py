@@ -0,0 +1,348 @@
+"""
+Signal Analyzer Pro - Colector headless para sondas
+Muestrea todas las interfaces inalámbricas de la sonda en cada ciclo y envía
+lotes compactos (ver ingest.py) al endpoint /api/ingest de un server.py
+central. Si el enlace cae, los lotes se guardan en disco y se reenvían en
+orden cuando vuelve; el muestreo nunca espera a la red.
+
+Uso:
+    python collector.py --server http://central:5000 --probe piso2-a
+    python collector.py --server http://localhost:5000 --simulate 300 --duration 60
+"""
+import argparse
+import os
+import queue
+import random
+import socket
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from ingest import encode_batch, PAYLOAD_VERSION
+from scheduler import AdaptiveScheduler
+
+
+DEFAULT_SPOOL = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'spool')
+
+
+# ===== Envío y spool =====
+
+class Uploader:
+    """POST de lotes ya codificados a /api/ingest"""
+
+    def __init__(self, server, token=None, timeout=5.0):
+        self.url = server.rstrip('/') + '/api/ingest'
+        self.token = token
+        self.timeout = timeout
+        self.latencies = []
+        self.failures = 0
+
+    def post(self, data):
+        """Retorna True si el servidor aceptó el lote"""
+        headers = {'Content-Type': 'application/json', 'Content-Encoding': 'gzip'}
+        if self.token:
+            headers['X-Probe-Token'] = self.token
+        request = urllib.request.Request(self.url, data=data, headers=headers, method='POST')
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                response.read()
+        except urllib.error.HTTPError as e:
+            self.failures += 1
+            if 400 <= e.code < 500:
+                # Lote rechazado: reenviarlo no lo arreglará
+                print(f"Lote rechazado por el servidor ({e.code})")
+                return True
+            return False
+        except (urllib.error.URLError, socket.timeout, ConnectionError):
+            self.failures += 1
+            return False
+        self.latencies.append(time.perf_counter() - start)
+        return True
+
+
+class Spool:
+    """Lotes pendientes en disco, un archivo por lote, reenviados en orden"""
+
+    def __init__(self, directory, max_files=100000):
+        self.directory = directory
+        self.max_files = max_files
+        os.makedirs(directory, exist_ok=True)
+
+    def put(self, seq, data):
+        name = f"{time.time():017.6f}-{seq:010d}.json.gz"
+        tmp = os.path.join(self.directory, name + '.tmp')
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        # Renombrar es atómico: un corte no deja lotes a medio escribir
+        os.replace(tmp, os.path.join(self.directory, name))
+        self._trim()
+
+    def pending(self):
+        return sorted(name for name in os.listdir(self.directory) if name.endswith('.json.gz'))
+
+    def _trim(self):
+        names = self.pending()
+        for name in names[:max(0, len(names) - self.max_files)]:
+            os.remove(os.path.join(self.directory, name))
+
+    def drain(self, post, limit=50):
+        """Reenvía hasta `limit` lotes; se detiene en el primer fallo"""
+        sent = 0
+        for name in self.pending()[:limit]:
+            path = os.path.join(self.directory, name)
+            with open(path, 'rb') as f:
+                data = f.read()
+            if not post(data):
+                break
+            os.remove(path)
+            sent += 1
+        return sent
+
+
+# ===== Fuentes de muestras =====
+
+class LinuxSource:
+    """Todas las interfaces en una sola lectura de /proc/net/wireless (+ nl80211)"""
+
+    def __init__(self):
+        from linux_backend import LinuxWirelessBackend
+        self.backend = LinuxWirelessBackend()
+
+    def read_all(self):
+        return self.backend.read_all()
+
+
+class SimulatedSource:
+    """Paseo aleatorio de RSSI por interfaz, para pruebas de carga"""
+
+    def __init__(self, interfaces=2, seed=None):
+        rng = random.Random(seed)
+        self.rng = rng
+        self.state = {f"wlan{i}": [rng.randint(-75, -45), f"Red-{rng.randint(1, 9)}",
+                                   rng.choice((1, 6, 11, 36, 44))]
+                      for i in range(interfaces)}
+
+    def read_all(self):
+        readings = {}
+        for iface, state in self.state.items():
+            state[0] = max(-95, min(-30, state[0] + self.rng.randint(-2, 2)))
+            readings[iface] = tuple(state)
+        return readings
+
+
+# ===== Colector =====
+
+class Collector:
+    def __init__(self, probe, source, uploader, spool=None, interval=0.5, flush_interval=2.0,
+                 adaptive=False):
+        self.probe = probe
+        self.source = source
+        self.uploader = uploader
+        self.spool = spool
+        self.interval = interval
+        self.flush_interval = flush_interval
+        self.scheduler = AdaptiveScheduler(interval, adaptive=adaptive)
+        # seq vuelve a 1 en cada arranque: el id de arranque distingue los lotes
+        # de esta corrida de los de la anterior en la deduplicación del servidor
+        self.boot = f"{int(time.time()):x}-{os.urandom(4).hex()}"
+        self.seq = 0
+        self.samples = 0
+        self._streams = {}
+        self._batch = []
+        self._t0 = None
+
+    def sample(self):
+        """Lee todas las interfaces y agrega las muestras al lote en curso"""
+        now = time.time()
+        readings = self.source.read_all()
+        if self._t0 is None:
+            self._t0 = now
+        dt = int(round((now - self._t0) * 1000))
+        for iface, (rssi, ssid, channel) in readings.items():
+            if rssi is None:
+                continue
+            stream = self._streams.get(iface)
+            if stream is None or stream['ssid'] != ssid or stream['channel'] != channel:
+                # Un cambio de red abre un flujo nuevo dentro del lote
+                stream = {'iface': iface, 'ssid': ssid, 'channel': channel, 'dt': [], 'rssi': []}
+                self._streams[iface] = stream
+                self._batch.append(stream)
+            stream['dt'].append(dt)
+            stream['rssi'].append(int(rssi))
+            self.samples += 1
+        # El planificador sigue el promedio de las interfaces: un cambio en
+        # cualquiera de ellas acelera el muestreo de toda la sonda
+        values = [r[0] for r in readings.values() if r[0] is not None]
+        if values:
+            self.scheduler.observe(sum(values) / len(values))
+        return len(readings)
+
+    def take_batch(self):
+        """Codifica el lote en curso; retorna bytes o None si está vacío"""
+        if not self._batch:
+            return None
+        self.seq += 1
+        data = encode_batch({'v': PAYLOAD_VERSION, 'probe': self.probe, 'boot': self.boot,
+                             'seq': self.seq, 't0': self._t0, 'streams': self._batch})
+        self._batch = []
+        self._streams = {}
+        self._t0 = None
+        return data
+
+    def deliver(self, data):
+        """Envía un lote; si falla va al spool. Con enlace activo se vacía el spool"""
+        if self.uploader.post(data):
+            if self.spool:
+                self.spool.drain(self.uploader.post)
+            return True
+        if self.spool:
+            self.spool.put(self.seq, data)
+        return False
+
+    def run(self, stop=None):
+        """Muestreo con plazos monótonos; el envío corre en otro hilo"""
+        stop = stop or threading.Event()
+        outbox = queue.Queue(maxsize=64)
+
+        def upload_loop():
+            while not stop.is_set() or not outbox.empty():
+                try:
+                    data = outbox.get(timeout=0.5)
+                except queue.Empty:
+                    if self.spool:
+                        self.spool.drain(self.uploader.post)
+                    continue
+                self.deliver(data)
+
+        uploader = threading.Thread(target=upload_loop, daemon=True)
+        uploader.start()
+
+        next_flush = time.monotonic() + self.flush_interval
+        self.scheduler.reset()
+        try:
+            while not stop.is_set():
+                try:
+                    self.sample()
+                except OSError as e:
+                    print(f"Error leyendo interfaces: {e}")
+                now = time.monotonic()
+                if now >= next_flush:
+                    next_flush = now + self.flush_interval
+                    data = self.take_batch()
+                    if data:
+                        try:
+                            outbox.put_nowait(data)
+                        except queue.Full:
+                            # Envío atascado: el lote va directo al disco
+                            if self.spool:
+                                self.spool.put(self.seq, data)
+                self.scheduler.sleep(stop)
+        finally:
+            # Último lote parcial antes de salir
+            stop.set()
+            data = self.take_batch()
+            if data:
+                outbox.put(data)
+            uploader.join(timeout=self.uploader.timeout + 1)
+
+
+# ===== Flota simulada =====
+
+def simulate(server, count, duration=30.0, interval=0.5, flush_interval=2.0,
+             interfaces=2, workers=32, token=None):
+    """
+    Prueba de carga: `count` sondas simuladas en un solo proceso. Un hilo
+    muestrea todas las sondas y los envíos se reparten en un pool de `workers`.
+    """
+    collectors = [
+        Collector(f"sim-{i:04d}", SimulatedSource(interfaces, seed=i),
+                  Uploader(server, token=token), interval=interval,
+                  flush_interval=flush_interval)
+        for i in range(count)
+    ]
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='upload')
+    futures = []
+
+    start = time.monotonic()
+    next_tick = start
+    ticks_per_flush = max(1, int(round(flush_interval / interval)))
+    tick = 0
+    lag = 0.0
+    while time.monotonic() - start < duration:
+        for collector in collectors:
+            collector.sample()
+        tick += 1
+        if tick % ticks_per_flush == 0:
+            for collector in collectors:
+                data = collector.take_batch()
+                if data:
+                    futures.append(pool.submit(collector.uploader.post, data))
+        next_tick += interval
+        delay = next_tick - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        else:
+            lag = max(lag, -delay)
+    for collector in collectors:
+        data = collector.take_batch()
+        if data:
+            futures.append(pool.submit(collector.uploader.post, data))
+    accepted = sum(1 for f in futures if f.result())
+    pool.shutdown()
+    elapsed = time.monotonic() - start
+
+    latencies = sorted(l for c in collectors for l in c.uploader.latencies)
+    failures = sum(c.uploader.failures for c in collectors)
+    samples = sum(c.samples for c in collectors)
+
+    def pct(p):
+        return latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000 if latencies else 0.0
+
+    print("=" * 60)
+    print(f"Sondas: {count} x {interfaces} interfaces, {elapsed:.1f} s")
+    print(f"Muestras: {samples} ({samples / elapsed:.0f}/s)")
+    print(f"Lotes: {len(futures)} enviados, {accepted} aceptados, {failures} fallos")
+    print(f"Latencia POST: p50 {pct(0.5):.1f} ms | p95 {pct(0.95):.1f} ms | p99 {pct(0.99):.1f} ms")
+    print(f"Retraso máximo del muestreo: {lag * 1000:.1f} ms")
+    print("=" * 60)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Colector headless de Signal Analyzer Pro')
+    parser.add_argument('--server', default=os.environ.get('SIGNAL_SERVER', 'http://localhost:5000'))
+    parser.add_argument('--probe', default=os.environ.get('SIGNAL_PROBE', socket.gethostname()))
+    parser.add_argument('--token', default=os.environ.get('SIGNAL_INGEST_TOKEN'))
+    parser.add_argument('--interval', type=float, default=0.5, help='segundos entre muestras')
+    parser.add_argument('--flush', type=float, default=2.0, help='segundos entre lotes')
+    parser.add_argument('--adaptive', action='store_true',
+                        help='acelerar con la señal cambiando y espaciar con la señal plana')
+    parser.add_argument('--spool', default=os.environ.get('SIGNAL_SPOOL', DEFAULT_SPOOL))
+    parser.add_argument('--simulate', type=int, metavar='N',
+                        help='prueba de carga con N sondas simuladas')
+    parser.add_argument('--interfaces', type=int, default=2, help='interfaces por sonda simulada')
+    parser.add_argument('--duration', type=float, default=30.0, help='duración de la simulación')
+    args = parser.parse_args()
+
+    if args.simulate:
+        simulate(args.server, args.simulate, args.duration, args.interval, args.flush,
+                 args.interfaces, token=args.token)
+        return
+
+    collector = Collector(args.probe, LinuxSource(), Uploader(args.server, args.token),
+                          Spool(os.path.join(args.spool, args.probe)),
+                          interval=args.interval, flush_interval=args.flush,
+                          adaptive=args.adaptive)
+    print(f"📡 Colector {args.probe} -> {args.server} (cada {args.interval} s)")
+    try:
+        collector.run()
+    except KeyboardInterrupt:
+        stats = collector.scheduler.stats()
+        print(f"\n⏹ Colector detenido ({stats['observed_hz']} Hz efectivos, "
+              f"{stats['missed']} plazos perdidos)")
+
+
+if __name__ == '__main__':
+    main()
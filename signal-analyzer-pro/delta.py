@@ -0,0 +1,103 @@
+"""
+Signal Analyzer Pro - Actualizaciones incrementales de escaneos
+Compara cada escaneo (dispositivos Bluetooth, BSSIDs vecinos) con el último
+estado enviado y emite solo lo agregado, lo modificado y lo eliminado. En
+ambientes con cientos de beacons el tráfico y el trabajo del navegador quedan
+proporcionales a la rotación y no al tamaño del escaneo.
+
+Delta:
+    {"seq": 42, "full": false,
+     "added": [{...}], "changed": [{...}], "removed": ["aa:bb:..."],
+     "count": 180}
+
+Con "full": true, "added" trae el estado completo y el cliente descarta el
+suyo. Si al cliente le falta un seq (se perdió un delta) pide una instantánea.
+"""
+import threading
+
+
+class SnapshotDiff:
+    """
+    Estado del último escaneo enviado, indexado por `key`.
+    Un cambio de RSSI menor que `tolerance` dB no cuenta como modificación;
+    la referencia es el último valor enviado, así el error del cliente nunca
+    supera la tolerancia.
+    """
+
+    def __init__(self, key, fields, level_field=None, tolerance=0):
+        self.key = key
+        self.fields = tuple(fields)
+        self.level_field = level_field
+        self.tolerance = tolerance
+        self.items = {}
+        self.seq = 0
+        self._lock = threading.Lock()
+
+    def _changed(self, old, new):
+        for field in self.fields:
+            if field == self.level_field:
+                a, b = old.get(field), new.get(field)
+                if a is None or b is None:
+                    if a is not b:
+                        return True
+                elif a != b and abs(a - b) >= self.tolerance:
+                    return True
+            elif old.get(field) != new.get(field):
+                return True
+        return False
+
+    def diff(self, items):
+        """Retorna el delta contra el último escaneo, o None si no hubo cambios"""
+        current = {}
+        for item in items:
+            current[self.key(item)] = item
+        with self._lock:
+            added, changed = [], []
+            for key, item in current.items():
+                old = self.items.get(key)
+                if old is None:
+                    added.append(item)
+                elif self._changed(old, item):
+                    changed.append(item)
+                else:
+                    # Dentro de la tolerancia: el cliente conserva el valor enviado
+                    current[key] = old
+            removed = [key for key in self.items if key not in current]
+            self.items = current
+            if not (added or changed or removed):
+                return None
+            self.seq += 1
+            return {'seq': self.seq, 'full': False, 'added': added, 'changed': changed,
+                    'removed': removed, 'count': len(current)}
+
+    def snapshot(self):
+        """Estado completo con el seq vigente (resincronización y clientes nuevos)"""
+        with self._lock:
+            items = list(self.items.values())
+            return {'seq': self.seq, 'full': True, 'added': items, 'changed': [],
+                    'removed': [], 'count': len(items)}
+
+    def reset(self):
+        with self._lock:
+            self.items = {}
+
+
+def device_key(device):
+    """MAC del dispositivo; en Windows sin MAC ('N/A') se usa el nombre"""
+    mac = device.get('mac')
+    return mac if mac and mac != 'N/A' else f"name:{device.get('name')}"
+
+
+def flatten_networks(networks):
+    """Redes [{ssid, auth, bssids: [...]}] -> una fila por BSSID"""
+    rows = []
+    for network in networks:
+        for bssid in network.get('bssids') or [{}]:
+            rows.append({
+                'bssid': bssid.get('mac') or f"ssid:{network.get('ssid')}",
+                'ssid': network.get('ssid'),
+                'auth': network.get('auth'),
+                'channel': bssid.get('channel'),
+                'signal': bssid.get('signal')
+            })
+    return rows
@@ -0,0 +1,123 @@
+"""
+Signal Analyzer Pro - Reducción visual de series largas
+Reduce una serie (tiempo, RSSI) a unos pocos puntos por píxel antes de
+enviarla al navegador, así el payload y el tiempo de dibujo dependen del
+ancho del gráfico y no del largo de la sesión:
+    - LTTB (Largest-Triangle-Three-Buckets): un punto por bucket, el que forma
+      el triángulo de mayor área con el punto elegido en el bucket anterior y
+      el promedio del siguiente. Conserva la forma visual de la curva.
+    - min/max: el mínimo y el máximo de cada bucket de tiempo, en su orden.
+      Conserva exactamente la envolvente (ningún pico se pierde).
+
+Todo lo que es proporcional al largo de la serie (promedios, áreas, mínimos
+y máximos por bucket) se calcula con NumPy (reduceat, searchsorted); en
+Python solo queda la recurrencia de LTTB, una iteración por punto de salida.
+"""
+import numpy as np
+
+
+METHODS = ('lttb', 'minmax')
+MAX_WIDTH = 4000
+
+
+def lttb(ts, values, threshold):
+    """Índices de los `threshold` puntos que elige LTTB (incluye el primero y el último)"""
+    n = len(ts)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    ts = np.asarray(ts, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64)
+
+    # threshold - 2 buckets interiores de igual cantidad de puntos
+    edges = (np.arange(threshold - 1) * ((n - 2) / (threshold - 2))).astype(np.int64) + 1
+    edges[-1] = n - 1
+    starts, ends = edges[:-1], edges[1:]
+    counts = ends - starts
+    mean_t = np.add.reduceat(ts[:n - 1], starts) / counts
+    mean_v = np.add.reduceat(values[:n - 1], starts) / counts
+    # Tercer vértice de cada bucket: promedio del siguiente (el último punto para el final)
+    next_t = np.append(mean_t[1:], ts[-1])
+    next_v = np.append(mean_v[1:], values[-1])
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = starts[i], ends[i]
+        at, av = ts[a], values[a]
+        # Doble del área del triángulo (a, p, c); lineal en p
+        area = np.abs((at - next_t[i]) * (values[lo:hi] - av)
+                      - (at - ts[lo:hi]) * (next_v[i] - av))
+        a = lo + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def minmax(ts, values, buckets, start=None, end=None, low=None, high=None):
+    """
+    Mínimo y máximo de cada bucket de tiempo entre start y end, en orden
+    cronológico: (índices, valores). Con `low`/`high` (agregados min/max) se
+    usan esas columnas; un agregado solo en su bucket aporta sus dos extremos.
+    """
+    ts = np.asarray(ts, dtype=np.float64)
+    low = np.asarray(values if low is None else low)
+    high = np.asarray(values if high is None else high)
+    n = len(ts)
+    if n == 0:
+        return np.arange(0), low[:0]
+    start = ts[0] if start is None else start
+    end = ts[-1] if end is None else end
+
+    # Inicio de cada bucket en la serie; los vacíos se descartan
+    bounds = np.searchsorted(ts, np.linspace(start, end, buckets + 1)[1:-1], side='left')
+    starts = np.unique(np.concatenate(([0], bounds[bounds < n])))
+    counts = np.diff(np.append(starts, n))
+    bucket = np.repeat(np.arange(len(starts)), counts)
+
+    lows = np.minimum.reduceat(low, starts)
+    highs = np.maximum.reduceat(high, starts)
+    # Primera posición que alcanza el extremo de su bucket
+    low_hits = np.flatnonzero(low == lows[bucket])
+    high_hits = np.flatnonzero(high == highs[bucket])
+    low_idx = low_hits[np.unique(bucket[low_hits], return_index=True)[1]]
+    high_idx = high_hits[np.unique(bucket[high_hits], return_index=True)[1]]
+
+    idx = np.concatenate((low_idx, high_idx))
+    vals = np.concatenate((low[low_idx], high[high_idx]))
+    order = np.lexsort((vals, idx))
+    idx, vals = idx[order], vals[order]
+    # Un mismo punto que es mínimo y máximo de su bucket va una sola vez
+    keep = np.r_[True, (idx[1:] != idx[:-1]) | (vals[1:] != vals[:-1])]
+    return idx[keep], vals[keep]
+
+
+def downsample(ts, values, width, method='lttb', start=None, end=None, low=None, high=None):
+    """
+    Serie reducida para un gráfico de `width` píxeles: {'ts', 'rssi'} como
+    arrays NumPy. `low`/`high` son las columnas min/max cuando la serie viene
+    de un nivel agregado (LTTB usa `values`, la media).
+    """
+    if method not in METHODS:
+        raise ValueError(f"Método desconocido: {method}")
+    width = max(3, min(int(width), MAX_WIDTH))
+    ts = np.asarray(ts)
+    if method == 'lttb':
+        idx = lttb(ts, values, width)
+        return {'ts': ts[idx], 'rssi': np.asarray(values)[idx]}
+    # Dos puntos por bucket: el payload queda en ~width puntos como con LTTB
+    idx, vals = minmax(ts, values, max(1, width // 2), start, end, low, high)
+    return {'ts': ts[idx], 'rssi': vals}
+
+
+if __name__ == '__main__':
+    import time
+
+    rng = np.random.default_rng(0)
+    for n in (10_000, 100_000, 1_000_000):
+        ts = 1.7e9 + np.arange(n) * 0.1
+        rssi = np.cumsum(rng.normal(0, 0.5, n)) - 60
+        for method in METHODS:
+            t0 = time.perf_counter()
+            out = downsample(ts, rssi, 1200, method)
+            elapsed = time.perf_counter() - t0
+            print(f"{method:6s} n={n:>9,} -> {len(out['ts']):5d} puntos en {elapsed * 1000:7.2f} ms")
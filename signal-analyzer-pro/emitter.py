@@ -0,0 +1,188 @@
+"""
+Signal Analyzer Pro - Emisión por lotes con frames binarios
+Agrupa las muestras por cliente durante una ventana configurable y las envía
+como un frame binario compacto (timestamps delta + RSSI int8), con control
+de contrapresión por cliente basado en acks de Socket.IO.
+
+Formato del frame (little-endian):
+    cabecera  '<2sBBHHdffbb' (26 bytes)
+        magic 'SA', versión, flags, cantidad, descartadas,
+        t0 (epoch s, float64), promedio y desviación (float32), mín y máx (int8)
+    deltas    uint16[cantidad]  ms desde la muestra anterior (la primera = 0)
+    rssi      int8[cantidad]
+    canal     uint8[cantidad]
+"""
+import math
+import struct
+import threading
+import time
+from collections import deque
+
+from metrics import REGISTRY
+
+
+FRAME_MAGIC = b'SA'
+FRAME_VERSION = 1
+FRAME_HEADER = struct.Struct('<2sBBHHdffbb')
+MAX_FRAME_SAMPLES = 0xFFFF
+# Ventana por cliente aceptada (segundos)
+MIN_FLUSH_INTERVAL = 0.05
+MAX_FLUSH_INTERVAL = 5.0
+
+# Edad de la muestra más vieja de cada frame al enviarlo
+EMIT_LATENCY = REGISTRY.histogram(
+    'signal_emit_latency_seconds', 'Tiempo de muestra a emisión', ('path',))
+BATCH_LATENCY = EMIT_LATENCY.labels('batch')
+FRAMES_SENT = REGISTRY.counter('signal_batch_frames_total', 'Frames binarios enviados')
+SAMPLES_DROPPED = REGISTRY.counter(
+    'signal_batch_dropped_total', 'Muestras descartadas por colas de cliente llenas')
+
+
+def _clamp(value, low, high):
+    return max(low, min(high, int(round(value))))
+
+
+def parse_flush_interval(value):
+    """Ventana pedida por un cliente, acotada; lanza ValueError si no es un número"""
+    if isinstance(value, bool):
+        raise ValueError('flush_interval debe ser un número')
+    try:
+        interval = float(value)
+    except (TypeError, ValueError):
+        raise ValueError('flush_interval debe ser un número')
+    if not math.isfinite(interval):
+        raise ValueError('flush_interval debe ser finito')
+    return min(max(interval, MIN_FLUSH_INTERVAL), MAX_FLUSH_INTERVAL)
+
+
+def pack_frame(samples, dropped=0, stats=None):
+    """Empaqueta [(ts, rssi, channel), ...] en un frame binario"""
+    count = len(samples)
+    t0 = samples[0][0] if samples else 0.0
+    stats = stats or {}
+    header = FRAME_HEADER.pack(
+        FRAME_MAGIC, FRAME_VERSION, 0, count, min(dropped, 0xFFFF), t0,
+        float(stats.get('avg') or 0), float(stats.get('std') or 0),
+        _clamp(stats.get('min') or 0, -128, 127), _clamp(stats.get('max') or 0, -128, 127)
+    )
+
+    deltas = []
+    previous = t0
+    for ts, _, _ in samples:
+        deltas.append(_clamp((ts - previous) * 1000, 0, 0xFFFF))
+        previous = ts
+    rssis = [_clamp(rssi, -128, 127) for _, rssi, _ in samples]
+    channels = [_clamp(channel or 0, 0, 255) for _, _, channel in samples]
+
+    return (header + struct.pack(f'<{count}H', *deltas)
+            + struct.pack(f'<{count}b', *rssis)
+            + struct.pack(f'<{count}B', *channels))
+
+
+class BatchEmitter:
+    def __init__(self, socketio, event='wifi_batch', flush_interval=0.25,
+                 max_queue=4096, max_in_flight=2, ack_timeout=5.0):
+        self.socketio = socketio
+        self.event = event
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.max_in_flight = max_in_flight
+        self.ack_timeout = ack_timeout
+        self._clients = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stats = None
+
+    def register(self, sid, flush_interval=None):
+        """Activa el envío por lotes para un cliente (ValueError si flush_interval es inválido)"""
+        if flush_interval is None:
+            flush_interval = self.flush_interval
+        else:
+            flush_interval = parse_flush_interval(flush_interval)
+        with self._lock:
+            self._clients[sid] = {
+                'queue': deque(maxlen=self.max_queue),
+                'flush_interval': flush_interval,
+                'next_flush': time.monotonic(),
+                'in_flight': 0,
+                'last_sent': 0.0,
+                'dropped': 0,
+                'sent': 0
+            }
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._flush_loop, daemon=True)
+                self._thread.start()
+
+    def unregister(self, sid):
+        with self._lock:
+            self._clients.pop(sid, None)
+
+    def is_registered(self, sid):
+        return sid in self._clients
+
+    def push(self, ts, rssi, channel, stats=None):
+        """Encola una muestra para todos los clientes registrados"""
+        sample = (ts, rssi, channel)
+        with self._lock:
+            self._stats = stats
+            for client in self._clients.values():
+                if len(client['queue']) == client['queue'].maxlen:
+                    client['dropped'] += 1
+                    SAMPLES_DROPPED.inc()
+                client['queue'].append(sample)
+
+    def client_info(self):
+        """Estado de cola/contrapresión de cada cliente"""
+        with self._lock:
+            return {sid: {'queued': len(c['queue']), 'in_flight': c['in_flight'],
+                          'dropped': c['dropped'], 'sent': c['sent']}
+                    for sid, c in self._clients.items()}
+
+    def _flush_loop(self):
+        while True:
+            now = time.monotonic()
+            frames = []
+            with self._lock:
+                if not self._clients:
+                    self._thread = None
+                    return
+                wait = self.flush_interval
+                for sid, client in self._clients.items():
+                    due = client['next_flush'] - now
+                    if due > 0:
+                        wait = min(wait, due)
+                        continue
+                    client['next_flush'] = now + client['flush_interval']
+                    wait = min(wait, client['flush_interval'])
+                    # Contrapresión: si el cliente no confirmó, seguir acumulando
+                    # (un ack perdido no bloquea al cliente más de ack_timeout)
+                    if client['in_flight'] >= self.max_in_flight \
+                            and now - client['last_sent'] > self.ack_timeout:
+                        client['in_flight'] = 0
+                    if not client['queue'] or client['in_flight'] >= self.max_in_flight:
+                        continue
+                    samples = [client['queue'].popleft()
+                               for _ in range(min(len(client['queue']), MAX_FRAME_SAMPLES))]
+                    frames.append((sid, samples[0][0], pack_frame(samples, client['dropped'], self._stats)))
+                    client['dropped'] = 0
+                    client['in_flight'] += 1
+                    client['last_sent'] = now
+                    client['sent'] += 1
+
+            for sid, oldest, frame in frames:
+                try:
+                    self.socketio.emit(self.event, frame, to=sid,
+                                       callback=lambda *args, sid=sid: self._ack(sid))
+                    BATCH_LATENCY.observe(time.time() - oldest)
+                    FRAMES_SENT.inc()
+                except Exception as e:
+                    print(f"Error enviando lote a {sid}: {e}")
+                    self._ack(sid)
+
+            time.sleep(max(wait, 0.005))
+
+    def _ack(self, sid):
+        with self._lock:
+            client = self._clients.get(sid)
+            if client and client['in_flight'] > 0:
+                client['in_flight'] -= 1
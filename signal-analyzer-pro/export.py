@@ -0,0 +1,136 @@
+"""
+Signal Analyzer Pro - Exportación en streaming
+Generadores que convierten los bloques del almacén en CSV, NDJSON o formatos
+columnares (Parquet / Arrow IPC) sin materializar el historial completo:
+la memoria usada depende del tamaño de bloque, no de la duración de la sesión.
+"""
+import csv
+import io
+import json
+from datetime import datetime
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet/Arrow son opcionales
+    pa = None
+    pq = None
+
+
+FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+    'parquet': 'application/vnd.apache.parquet',
+    'arrow': 'application/vnd.apache.arrow.stream'
+}
+
+COLUMNAR_FORMATS = ('parquet', 'arrow')
+
+
+def columnar_available():
+    return pa is not None
+
+
+def _iso(ts):
+    return datetime.fromtimestamp(ts).isoformat()
+
+
+def csv_stream(chunks, columns):
+    """Una cabecera y luego un bloque de texto CSV por cada bloque de filas"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(('timestamp',) + tuple(columns))
+    yield buffer.getvalue()
+    for rows in chunks:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows((_iso(row[0]),) + tuple(row) for row in rows)
+        yield buffer.getvalue()
+
+
+def ndjson_stream(chunks, columns):
+    """Un objeto JSON por línea"""
+    for rows in chunks:
+        yield ''.join(
+            json.dumps(dict(zip(columns, row), timestamp=_iso(row[0])), ensure_ascii=False) + '\n'
+            for row in rows
+        )
+
+
+class _ChunkSink(io.RawIOBase):
+    """Archivo de solo escritura que acumula bytes hasta que se drenan"""
+
+    def __init__(self):
+        self._parts = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        data = bytes(data)
+        self._parts.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self):
+        data = b''.join(self._parts)
+        self._parts = []
+        return data
+
+
+# Tipo Arrow de cada columna del almacén
+ARROW_TYPES = {
+    'ts': 'float64',
+    'source': 'string',
+    'rssi': 'int16',
+    'ssid': 'string',
+    'channel': 'int16',
+    'mac': 'string',
+    'name': 'string',
+    'series': 'string',
+    'count': 'int64',
+    'min': 'int16',
+    'max': 'int16',
+    'mean': 'float64'
+}
+
+
+def arrow_schema(columns):
+    return pa.schema([(name, pa.type_for_alias(ARROW_TYPES[name])) for name in columns])
+
+
+def columnar_stream(chunks, columns, fmt):
+    """Parquet (un row group por bloque) o Arrow IPC (un record batch por bloque)"""
+    if pa is None:
+        raise RuntimeError('pyarrow no está instalado')
+    schema = arrow_schema(columns)
+    sink = _ChunkSink()
+    output = pa.PythonFile(sink, mode='w')
+    if fmt == 'parquet':
+        writer = pq.ParquetWriter(output, schema)
+    else:
+        writer = pa.ipc.new_stream(output, schema)
+    try:
+        for rows in chunks:
+            table = pa.table([[row[i] for row in rows] for i in range(len(columns))],
+                             schema=schema)
+            writer.write_table(table)
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def stream(chunks, columns, fmt):
+    """Generador de bytes/texto para el formato pedido"""
+    if fmt == 'csv':
+        return csv_stream(chunks, columns)
+    if fmt == 'ndjson':
+        return ndjson_stream(chunks, columns)
+    if fmt in COLUMNAR_FORMATS:
+        return columnar_stream(chunks, columns, fmt)
+    raise ValueError(f"Formato desconocido: {fmt}")
@@ -0,0 +1,346 @@
+"""
+Signal Analyzer Pro - Motor de mapas de calor
+Interpolación vectorizada de los puntos del mapa (kernels exponencial,
+gaussiano e IDW). Los pesos menores a 0.01 se descartan, así que cada kernel
+tiene un radio de corte finito: los puntos se acumulan en una grilla y el
+mapa se obtiene como una convolución por FFT con el kernel truncado, con
+costo independiente del número de puntos. Salida PNG o cruda por teselas.
+
+El radio del kernel en celdas se acota a MAX_KERNEL_RADIUS: con un paso más
+fino que cutoff / MAX_KERNEL_RADIUS la convolución se hace en esa grilla más
+gruesa y se remuestrea (bilineal) al paso pedido. El campo es suave a la
+escala del kernel, así que el detalle no cambia y el costo de una tesela no
+crece con el zoom.
+"""
+import hashlib
+import math
+import struct
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from functools import lru_cache
+
+import numpy as np
+
+
+TILE_SIZE = 256
+MAX_ZOOM = 4
+MIN_WEIGHT = 0.01
+MAX_KERNEL_RADIUS = 128      # celdas
+MAX_CELLS = 1 << 21          # celdas de salida por render (~1450 x 1450)
+
+# Parámetros por defecto de cada kernel (unidades = píxeles del mapa)
+KERNELS = {
+    'exp': {'scale': 100.0},            # exp(-d/scale), igual que el cliente
+    'gaussian': {'scale': 100.0},       # exp(-d²/2σ²)
+    'idw': {'scale': 10.0, 'power': 2}  # min(1, (scale/d)^p)
+}
+
+# Escala de colores del cliente (getRssiColorRGB)
+COLOR_LEVELS = (-67, -80, -90)
+COLORS = np.array([
+    [81, 207, 102],
+    [255, 212, 59],
+    [255, 159, 67],
+    [255, 107, 107]
+], dtype=np.uint8)
+
+
+# ===== Kernels =====
+
+def kernel_weight(kernel, d, scale=None, power=None):
+    """Peso del kernel a distancia `d` (array)"""
+    params = KERNELS[kernel]
+    scale = scale or params['scale']
+    if kernel == 'exp':
+        return np.exp(-d / scale)
+    if kernel == 'gaussian':
+        return np.exp(-(d * d) / (2 * scale * scale))
+    power = power or params['power']
+    with np.errstate(divide='ignore'):
+        return np.minimum(1.0, (scale / np.maximum(d, 1e-9)) ** power)
+
+
+def cutoff_radius(kernel, scale=None, power=None):
+    """Distancia a partir de la cual el peso cae bajo MIN_WEIGHT"""
+    params = KERNELS[kernel]
+    scale = scale or params['scale']
+    if kernel == 'exp':
+        return scale * math.log(1 / MIN_WEIGHT)
+    if kernel == 'gaussian':
+        return scale * math.sqrt(2 * math.log(1 / MIN_WEIGHT))
+    power = power or params['power']
+    return scale * (1 / MIN_WEIGHT) ** (1 / power)
+
+
+def _fast_len(n):
+    """Menor longitud >= n cuyos factores primos son 2, 3 y 5 (FFT rápida)"""
+    best = 2 ** int(math.ceil(math.log2(n)))
+    p5 = 1
+    while p5 < best:
+        p35 = p5
+        while p35 < best:
+            p235 = p35
+            while p235 < n:
+                p235 *= 2
+            best = min(best, p235)
+            p35 *= 3
+        p5 *= 5
+    return best
+
+
+@lru_cache(maxsize=32)
+def _kernel_spectrum(kernel, step, scale, power, shape):
+    weights, _ = _kernel_grid(kernel, step, scale, power)
+    return np.fft.rfft2(weights, shape)
+
+
+def _kernel_grid(kernel, step, scale, power):
+    r = int(math.ceil(cutoff_radius(kernel, scale, power) / step))
+    offsets = np.arange(-r, r + 1) * step
+    d = np.hypot(offsets[:, None], offsets[None, :])
+    weights = kernel_weight(kernel, d, scale, power)
+    weights[weights <= MIN_WEIGHT] = 0.0
+    return weights, r
+
+
+# ===== Interpolación =====
+
+def as_points(points):
+    """Convierte [{x, y, rssi}] o un array Nx3 a un array float64 Nx3"""
+    if isinstance(points, np.ndarray):
+        return np.asarray(points, dtype=np.float64).reshape(-1, 3)
+    return np.array([(p['x'], p['y'], p['rssi']) for p in points],
+                    dtype=np.float64).reshape(-1, 3)
+
+
+def _fft_convolve(images, kernel, step, scale, power, r):
+    """Convolución 'same' por FFT de varias imágenes apiladas con el mismo kernel"""
+    size = 2 * r + 1
+    shape = (_fast_len(images.shape[1] + size - 1), _fast_len(images.shape[2] + size - 1))
+    spectrum = np.fft.rfft2(images, shape) * _kernel_spectrum(kernel, step, scale, power, shape)
+    full = np.fft.irfft2(spectrum, shape)
+    return full[:, r:r + images.shape[1], r:r + images.shape[2]]
+
+
+def _accumulate(pts, x0, y0, nx, ny, step, kernel, scale, power):
+    """(peso_total, suma ponderada) en los nodos x0 + i·step, y0 + j·step"""
+    r = int(math.ceil(cutoff_radius(kernel, scale, power) / step))
+
+    # Grilla extendida con el radio de corte: los puntos fuera no aportan
+    gx = np.rint((pts[:, 0] - x0) / step).astype(np.int64) + r
+    gy = np.rint((pts[:, 1] - y0) / step).astype(np.int64) + r
+    inside = (gx >= 0) & (gx < nx + 2 * r) & (gy >= 0) & (gy < ny + 2 * r)
+    grids = np.zeros((2, ny + 2 * r, nx + 2 * r))
+    if inside.any():
+        flat = gy[inside] * grids.shape[2] + gx[inside]
+        size = grids[0].size
+        grids[0].flat[:] = np.bincount(flat, minlength=size)
+        grids[1].flat[:] = np.bincount(flat, weights=pts[inside, 2], minlength=size)
+
+    total, weighted = _fft_convolve(grids, kernel, step, scale, power, r)[:, r:r + ny, r:r + nx]
+    return total, weighted
+
+
+def _resample(grid, fy, fx):
+    """Interpolación bilineal de `grid` en las posiciones fraccionarias (fy, fx) de celda"""
+    i = np.minimum(fy.astype(np.int64), grid.shape[0] - 2)
+    j = np.minimum(fx.astype(np.int64), grid.shape[1] - 2)
+    ty = (fy - i)[:, None]
+    tx = fx - j
+    rows, below = grid[i], grid[i + 1]
+    top = rows[:, j] * (1 - tx) + rows[:, j + 1] * tx
+    bottom = below[:, j] * (1 - tx) + below[:, j + 1] * tx
+    return top * (1 - ty) + bottom * ty
+
+
+def interpolate(points, x0, y0, width, height, step=1.0, kernel='exp',
+                scale=None, power=None):
+    """
+    Interpola el RSSI sobre la región [x0, x0+width) x [y0, y0+height)
+    muestreada cada `step` píxeles. Retorna (rssi, peso_total) como arrays
+    (alto/step, ancho/step); rssi es NaN donde ningún punto aporta peso.
+    Lanza ValueError si la grilla de salida supera MAX_CELLS.
+    """
+    if not (math.isfinite(step) and step > 0):
+        raise ValueError('step debe ser un número positivo')
+    if not (math.isfinite(width) and math.isfinite(height) and width > 0 and height > 0):
+        raise ValueError('width y height deben ser positivos')
+    pts = as_points(points)
+    nx = int(math.ceil(width / step))
+    ny = int(math.ceil(height / step))
+    if nx * ny > MAX_CELLS:
+        raise ValueError(f"Región demasiado grande: {nx}x{ny} celdas (máximo {MAX_CELLS})")
+
+    cutoff = cutoff_radius(kernel, scale, power)
+    if not (math.isfinite(cutoff) and cutoff > 0):
+        raise ValueError('scale y power deben ser positivos')
+    coarse = cutoff / MAX_KERNEL_RADIUS
+    if coarse > step:
+        # Nodos gruesos que cubren la región (al menos 2 por eje para interpolar)
+        cnx = int(math.ceil((nx - 1) * step / coarse)) + 2
+        cny = int(math.ceil((ny - 1) * step / coarse)) + 2
+        grids = _accumulate(pts, x0, y0, cnx, cny, coarse, kernel, scale, power)
+        fx = np.arange(nx) * (step / coarse)
+        fy = np.arange(ny) * (step / coarse)
+        total, weighted = (_resample(grid, fy, fx) for grid in grids)
+    else:
+        total, weighted = _accumulate(pts, x0, y0, nx, ny, step, kernel, scale, power)
+
+    covered = total > 1e-9
+    rssi = np.full(total.shape, np.nan)
+    rssi[covered] = weighted[covered] / total[covered]
+    total[~covered] = 0.0
+    return rssi, total
+
+
+def colorize(rssi, total):
+    """RGBA uint8 con la misma escala y alfa que el cliente"""
+    rgba = np.zeros(rssi.shape + (4,), dtype=np.uint8)
+    covered = ~np.isnan(rssi)
+    levels = np.searchsorted(-np.array(COLOR_LEVELS), -rssi[covered], side='right')
+    rgba[covered, :3] = COLORS[levels]
+    rgba[covered, 3] = np.minimum(255, total[covered] * 180).astype(np.uint8)
+    return rgba
+
+
+def encode_png(rgba):
+    """Codifica un array RGBA (alto, ancho, 4) como PNG sin dependencias"""
+    height, width = rgba.shape[:2]
+    raw = np.zeros((height, width * 4 + 1), dtype=np.uint8)
+    raw[:, 1:] = rgba.reshape(height, width * 4)
+
+    def chunk(tag, data):
+        return (struct.pack('>I', len(data)) + tag + data
+                + struct.pack('>I', zlib.crc32(tag + data) & 0xFFFFFFFF))
+
+    return (b'\x89PNG\r\n\x1a\n'
+            + chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 6, 0, 0, 0))
+            + chunk(b'IDAT', zlib.compress(raw.tobytes(), 6))
+            + chunk(b'IEND', b''))
+
+
+# ===== Servicio con caché =====
+
+class HeatmapService:
+    """
+    Conjuntos de puntos registrados y caché LRU de renders acotada por bytes
+    (max_bytes). Un render de más de max_entry_bytes (una región completa en
+    crudo llega a ~16 MB) se entrega sin cachear: la caché es para teselas y
+    regiones chicas, que son las que se repiten.
+    """
+
+    def __init__(self, max_entries=256, max_sets=64, max_bytes=64 << 20, max_entry_bytes=2 << 20):
+        self.max_entries = max_entries
+        self.max_sets = max_sets
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self._cache = OrderedDict()
+        self._cache_bytes = 0
+        self._sets = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def point_key(points):
+        """Hash estable del conjunto de puntos"""
+        return hashlib.sha1(as_points(points).tobytes()).hexdigest()[:16]
+
+    def register(self, points):
+        """Guarda un conjunto de puntos para pedirlo luego por teselas"""
+        pts = as_points(points)
+        key = self.point_key(pts)
+        with self._lock:
+            self._sets[key] = pts
+            self._sets.move_to_end(key)
+            while len(self._sets) > self.max_sets:
+                self._sets.popitem(last=False)
+        return key
+
+    def points(self, key):
+        with self._lock:
+            return self._sets.get(key)
+
+    def render(self, points, x0, y0, width, height, step=2.0, kernel='exp',
+               scale=None, power=None, fmt='png'):
+        """Renderiza una región; el resultado se cachea por (puntos, parámetros)"""
+        if kernel not in KERNELS:
+            raise ValueError(f"Kernel desconocido: {kernel}")
+        if fmt not in ('png', 'raw'):
+            raise ValueError(f"Formato desconocido: {fmt}")
+        pts = as_points(points)
+        cache_key = (self.point_key(pts), x0, y0, width, height, step, kernel, scale, power, fmt)
+        with self._lock:
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                self._cache.move_to_end(cache_key)
+                return cached
+
+        rssi, total = interpolate(pts, x0, y0, width, height, step, kernel, scale, power)
+        if fmt == 'png':
+            result = encode_png(colorize(rssi, total))
+        else:
+            # float32 little-endian: rssi (NaN sin cobertura) seguido del peso total
+            result = (rssi.astype('<f4').tobytes() + total.astype('<f4').tobytes())
+        result = (result, rssi.shape)
+        size = len(result[0])
+        if size > self.max_entry_bytes:
+            return result
+
+        with self._lock:
+            previous = self._cache.pop(cache_key, None)
+            if previous is not None:
+                self._cache_bytes -= len(previous[0])
+            self._cache[cache_key] = result
+            self._cache_bytes += size
+            while len(self._cache) > self.max_entries or self._cache_bytes > self.max_bytes:
+                _, (data, _) = self._cache.popitem(last=False)
+                self._cache_bytes -= len(data)
+        return result
+
+    def tile(self, key, z, x, y, **options):
+        """Tesela (z, x, y): a zoom z cada tesela cubre TILE_SIZE / 2**z píxeles del mapa"""
+        if not 0 <= z <= MAX_ZOOM:
+            raise ValueError(f"Zoom fuera de rango (0-{MAX_ZOOM})")
+        pts = self.points(key)
+        if pts is None:
+            raise KeyError(key)
+        step = 1.0 / (2 ** z)
+        span = TILE_SIZE * step
+        return self.render(pts, x * span, y * span, span, span, step=step, **options)
+
+
+# ===== Benchmark =====
+
+def reference_heatmap(points, width, height, step=2):
+    """Algoritmo original del cliente (O(W·H·N)), vectorizado por filas"""
+    pts = as_points(points)
+    xs = np.arange(0, width, step, dtype=np.float64)
+    rssi = np.full((len(range(0, height, step)), len(xs)), np.nan)
+    total = np.zeros_like(rssi)
+    for row, y in enumerate(range(0, height, step)):
+        d = np.hypot(xs[:, None] - pts[None, :, 0], y - pts[None, :, 1])
+        w = np.exp(-d / 100)
+        w[w <= MIN_WEIGHT] = 0.0
+        tw = w.sum(axis=1)
+        covered = tw > 0
+        rssi[row, covered] = (w @ pts[:, 2])[covered] / tw[covered]
+        total[row] = tw
+    return rssi, total
+
+
+if __name__ == '__main__':
+    rng = np.random.default_rng(0)
+    width, height = 800, 600
+    for n in (100, 1000, 10000):
+        pts = np.column_stack([rng.uniform(0, width, n), rng.uniform(0, height, n),
+                               rng.uniform(-95, -30, n)])
+        t = time.perf_counter()
+        fast, fast_total = interpolate(pts, 0, 0, width, height, step=2)
+        t_fast = time.perf_counter() - t
+        t = time.perf_counter()
+        ref, ref_total = reference_heatmap(pts, width, height, step=2)
+        t_ref = time.perf_counter() - t
+        err = np.nanmax(np.abs(fast - ref))
+        print(f"{n:6d} puntos: FFT {t_fast * 1000:8.1f} ms | original {t_ref * 1000:9.1f} ms "
+              f"| x{t_ref / t_fast:6.1f} | error máx {err:.2f} dB")
@@ -0,0 +1,196 @@
+"""
+Signal Analyzer Pro - Ingesta de sondas remotas
+Formato de los lotes que envían los colectores (collector.py) y el hub que
+los recibe en el servidor central: cada flujo (sonda, interfaz) se escribe en
+el almacén con source = "<sonda>/<interfaz>" y su último estado se publica
+agrupado a la sala 'probes'.
+
+Lote (JSON comprimido con gzip):
+    {"v": 1, "probe": "piso2-a", "boot": "6553f100-9c2e41d7", "seq": 17,
+     "t0": 1700000000.0,
+     "streams": [{"iface": "wlan0", "ssid": "Oficina", "channel": 6,
+                  "dt": [0, 500, ...],          # ms desde t0
+                  "rssi": [-61, -60, ...]}]}
+`boot` identifica la corrida del colector (seq se reinicia con él); los
+lotes sin `boot` se deduplican solo por (sonda, seq).
+"""
+import gzip
+import json
+import math
+import re
+import threading
+from collections import deque
+
+
+PAYLOAD_VERSION = 1
+MAX_SAMPLES_PER_BATCH = 50000
+RSSI_RANGE = (-128, 0)  # dBm aceptados (el frame binario lo guarda como int8)
+PROBE_ID_RE = re.compile(r'^[A-Za-z0-9_.:-]{1,64}$')
+
+
+# ===== Formato de lote =====
+
+def encode_batch(batch):
+    """Serializa un lote a JSON compacto comprimido con gzip"""
+    return gzip.compress(json.dumps(batch, separators=(',', ':')).encode('utf-8'), 6)
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+
+def decode_batch(body, encoding=None):
+    """Decodifica y valida un lote; lanza ValueError si es inválido"""
+    try:
+        if encoding == 'gzip' or body[:2] == b'\x1f\x8b':
+            body = gzip.decompress(body)
+        batch = json.loads(body)
+    except (OSError, EOFError, ValueError) as e:
+        raise ValueError(f"Lote ilegible: {e}")
+
+    if not isinstance(batch, dict) or batch.get('v') != PAYLOAD_VERSION:
+        raise ValueError('Versión de lote no soportada')
+    if not PROBE_ID_RE.match(str(batch.get('probe', ''))):
+        raise ValueError('Identificador de sonda inválido')
+    if not isinstance(batch.get('seq'), int) or not _is_number(batch.get('t0')):
+        raise ValueError('Lote sin seq/t0')
+    if 'boot' in batch and not PROBE_ID_RE.match(str(batch['boot'])):
+        raise ValueError('Identificador de arranque inválido')
+
+    streams = batch.get('streams', [])
+    if not isinstance(streams, list) or not all(isinstance(s, dict) for s in streams):
+        raise ValueError('streams debe ser una lista de flujos')
+
+    low, high = RSSI_RANGE
+    total = 0
+    for stream in streams:
+        if not PROBE_ID_RE.match(str(stream.get('iface', ''))):
+            raise ValueError('Interfaz inválida')
+        dt, rssi = stream.get('dt'), stream.get('rssi')
+        if not isinstance(dt, list) or not isinstance(rssi, list) or len(dt) != len(rssi):
+            raise ValueError(f"Columnas desiguales en {stream.get('iface')}")
+        # json acepta NaN/Infinity (y 1e999 es inf): se rechazan junto con los no numéricos
+        if not all(_is_number(v) for v in dt + rssi):
+            raise ValueError(f"Valores no numéricos en {stream.get('iface')}")
+        if not all(low <= v <= high for v in rssi):
+            raise ValueError(f"RSSI fuera de rango en {stream.get('iface')} ({low} a {high} dBm)")
+        total += len(dt)
+    if total > MAX_SAMPLES_PER_BATCH:
+        raise ValueError('Lote demasiado grande')
+    return batch
+
+
+# ===== Hub de ingesta =====
+
+class IngestHub:
+    def __init__(self, store, dedupe_window=256, boots_window=4):
+        self.store = store
+        self.dedupe_window = dedupe_window
+        self.boots_window = boots_window
+        self._streams = {}
+        self._seen = {}
+        self._changed = set()
+        self._listeners = []
+        self._lock = threading.Lock()
+        self.accepted = 0
+        self.duplicates = 0
+
+    def add_listener(self, listener):
+        """Función llamada con las filas (ts, source, rssi, ssid, channel) de cada lote aceptado"""
+        self._listeners.append(listener)
+
+    @staticmethod
+    def source(probe, iface):
+        return f"{probe}/{iface}"
+
+    def _is_duplicate(self, probe, boot, seq):
+        """Los colectores reintentan lotes: (sonda, arranque, seq) recientes se descartan"""
+        boots = self._seen.setdefault(probe, {})
+        if boot not in boots:
+            boots[boot] = (deque(), set())
+            # Las corridas viejas solo llegan desde el spool: bastan las últimas
+            while len(boots) > self.boots_window:
+                boots.pop(next(iter(boots)))
+        order, seen = boots[boot]
+        if seq in seen:
+            return True
+        order.append(seq)
+        seen.add(seq)
+        if len(order) > self.dedupe_window:
+            seen.discard(order.popleft())
+        return False
+
+    def ingest(self, batch):
+        """Guarda un lote ya validado; retorna (muestras aceptadas, duplicado)"""
+        probe, t0 = batch['probe'], float(batch['t0'])
+        with self._lock:
+            if self._is_duplicate(probe, batch.get('boot'), batch['seq']):
+                self.duplicates += 1
+                return 0, True
+
+        rows = []
+        updates = []
+        for stream in batch.get('streams', []):
+            if not stream['rssi']:
+                continue
+            source = self.source(probe, stream['iface'])
+            ssid, channel = stream.get('ssid'), stream.get('channel')
+            times = [t0 + dt / 1000.0 for dt in stream['dt']]
+            values = [int(v) for v in stream['rssi']]
+            rows.extend(zip(times, [source] * len(values), values,
+                            [ssid] * len(values), [channel] * len(values)))
+            updates.append((source, stream['iface'], ssid, channel, times, values))
+
+        self.store.append_wifi_many(rows)
+        for listener in self._listeners:
+            try:
+                listener(rows)
+            except Exception as e:
+                print(f"Error notificando lote de {probe}: {e}")
+
+        with self._lock:
+            for source, iface, ssid, channel, times, values in updates:
+                state = self._streams.get(source)
+                if state is None:
+                    state = self._streams[source] = {
+                        'source': source, 'probe': probe, 'iface': iface,
+                        'count': 0, 'sum': 0, 'min': values[0], 'max': values[0], 'ts': 0.0
+                    }
+                state['count'] += len(values)
+                state['sum'] += sum(values)
+                state['min'] = min(state['min'], min(values))
+                state['max'] = max(state['max'], max(values))
+                if times[-1] >= state['ts']:
+                    state.update(ts=times[-1], rssi=values[-1], ssid=ssid, channel=channel)
+                self._changed.add(source)
+            self.accepted += len(rows)
+        return len(rows), False
+
+    @staticmethod
+    def _public(state):
+        return {
+            'source': state['source'],
+            'probe': state['probe'],
+            'iface': state['iface'],
+            'ssid': state.get('ssid') or 'N/A',
+            'channel': state.get('channel'),
+            'rssi': state.get('rssi'),
+            'ts': state['ts'],
+            'count': state['count'],
+            'avg': round(state['sum'] / state['count'], 1),
+            'min': state['min'],
+            'max': state['max']
+        }
+
+    def streams(self, probe=None):
+        """Estado de todos los flujos (o los de una sonda)"""
+        with self._lock:
+            return [self._public(s) for s in self._streams.values()
+                    if probe is None or s['probe'] == probe]
+
+    def drain_changed(self):
+        """Flujos que cambiaron desde la llamada anterior"""
+        with self._lock:
+            changed = [self._public(self._streams[source]) for source in self._changed]
+            self._changed.clear()
+        return changed
@@ -0,0 +1,282 @@
+"""
+Signal Analyzer Pro - Backend nativo de Linux
+Lee el RSSI desde /proc/net/wireless (y opcionalmente SSID/frecuencia vía
+nl80211 sobre un socket netlink) sin lanzar iwconfig/nmcli en cada muestra.
+Los descriptores se mantienen abiertos entre muestras para llegar a 20-50 Hz.
+"""
+import os
+import socket
+import struct
+import time
+
+from parsers import freq_to_channel
+
+
+PROC_NET_WIRELESS = '/proc/net/wireless'
+
+# Constantes de netlink / generic netlink / nl80211
+NETLINK_GENERIC = 16
+NLM_F_REQUEST = 0x1
+NLM_F_DUMP = 0x300
+NLMSG_ERROR = 0x2
+NLMSG_DONE = 0x3
+GENL_ID_CTRL = 0x10
+CTRL_CMD_GETFAMILY = 3
+CTRL_ATTR_FAMILY_ID = 1
+CTRL_ATTR_FAMILY_NAME = 2
+NL80211_CMD_GET_INTERFACE = 5
+NL80211_CMD_GET_STATION = 17
+NL80211_ATTR_IFINDEX = 3
+NL80211_ATTR_STA_INFO = 21
+NL80211_ATTR_WIPHY_FREQ = 38
+NL80211_ATTR_SSID = 52
+NL80211_STA_INFO_SIGNAL = 7
+
+
+def _dbm(value):
+    """Nivel de procfs en dBm: algunos drivers lo reportan como u8 sin signo; 0 = sin dato"""
+    if value > 0:
+        value -= 256
+    return int(value) if -256 < value < 0 else None
+
+
+def parse_proc_net_wireless(text):
+    """
+    Parsea el contenido de /proc/net/wireless -> {iface: {link, level, noise}}.
+    level/noise son None cuando el driver no los informa (interfaz sin asociar).
+    """
+    interfaces = {}
+    for line in text.split('\n')[2:]:
+        if ':' not in line:
+            continue
+        iface, _, rest = line.partition(':')
+        fields = rest.split()
+        if len(fields) < 4:
+            continue
+        try:
+            link = float(fields[1].rstrip('.'))
+            level = float(fields[2].rstrip('.'))
+            noise = float(fields[3].rstrip('.'))
+        except ValueError:
+            continue
+        interfaces[iface.strip()] = {
+            'link': link,
+            'level': _dbm(level),
+            'noise': _dbm(noise)
+        }
+    return interfaces
+
+
+def wireless_interfaces(sys_path='/sys/class/net'):
+    """Lista las interfaces con soporte cfg80211"""
+    try:
+        return sorted(name for name in os.listdir(sys_path)
+                      if os.path.exists(os.path.join(sys_path, name, 'phy80211')))
+    except OSError:
+        return []
+
+
+class ProcNetWirelessReader:
+    """Lector de /proc/net/wireless con el descriptor abierto entre lecturas"""
+
+    def __init__(self, path=PROC_NET_WIRELESS):
+        self.path = path
+        self._fd = None
+
+    def read(self):
+        if self._fd is None:
+            self._fd = os.open(self.path, os.O_RDONLY)
+        # pread en offset 0 regenera el contenido de procfs sin seek adicional
+        data = os.pread(self._fd, 65536, 0)
+        return parse_proc_net_wireless(data.decode('ascii', errors='ignore'))
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+class Nl80211Client:
+    """Cliente mínimo de nl80211 (SSID, frecuencia y señal de la estación)"""
+
+    def __init__(self):
+        self._sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, NETLINK_GENERIC)
+        self._sock.bind((0, 0))
+        self._sock.settimeout(0.5)
+        self._seq = 0
+        self.family_id = self._resolve_family('nl80211')
+
+    def close(self):
+        self._sock.close()
+
+    # ===== Codificación de mensajes =====
+
+    @staticmethod
+    def _attr(attr_type, payload):
+        length = 4 + len(payload)
+        padding = b'\0' * ((4 - length % 4) % 4)
+        return struct.pack('HH', length, attr_type) + payload + padding
+
+    @staticmethod
+    def _parse_attrs(data):
+        attrs = {}
+        offset = 0
+        while offset + 4 <= len(data):
+            length, attr_type = struct.unpack_from('HH', data, offset)
+            if length < 4:
+                break
+            attrs[attr_type & 0x3fff] = data[offset + 4:offset + length]
+            offset += (length + 3) & ~3
+        return attrs
+
+    def _request(self, msg_type, cmd, attrs, flags=NLM_F_REQUEST):
+        self._seq += 1
+        payload = struct.pack('BBH', cmd, 1, 0) + attrs
+        header = struct.pack('IHHII', 16 + len(payload), msg_type, flags, self._seq, 0)
+        self._sock.send(header + payload)
+
+        messages = []
+        while True:
+            data = self._sock.recv(65536)
+            offset = 0
+            while offset < len(data):
+                length, rtype, _, seq, _ = struct.unpack_from('IHHII', data, offset)
+                body = data[offset + 16:offset + length]
+                offset += (length + 3) & ~3
+                if seq != self._seq:
+                    continue
+                if rtype == NLMSG_DONE:
+                    return messages
+                if rtype == NLMSG_ERROR:
+                    error = struct.unpack_from('i', body)[0]
+                    if error:
+                        raise OSError(-error, os.strerror(-error))
+                    return messages
+                messages.append(self._parse_attrs(body[4:]))
+            if not flags & NLM_F_DUMP:
+                return messages
+
+    def _resolve_family(self, name):
+        attrs = self._attr(CTRL_ATTR_FAMILY_NAME, name.encode() + b'\0')
+        for msg in self._request(GENL_ID_CTRL, CTRL_CMD_GETFAMILY, attrs):
+            if CTRL_ATTR_FAMILY_ID in msg:
+                return struct.unpack('H', msg[CTRL_ATTR_FAMILY_ID][:2])[0]
+        raise OSError('nl80211 no disponible')
+
+    # ===== Consultas =====
+
+    def get_interface(self, ifname):
+        """Retorna (ssid, frecuencia) de la interfaz"""
+        ifindex = socket.if_nametoindex(ifname)
+        attrs = self._attr(NL80211_ATTR_IFINDEX, struct.pack('I', ifindex))
+        for msg in self._request(self.family_id, NL80211_CMD_GET_INTERFACE, attrs):
+            ssid = msg.get(NL80211_ATTR_SSID)
+            freq = msg.get(NL80211_ATTR_WIPHY_FREQ)
+            return (ssid.decode('utf-8', errors='replace') if ssid else None,
+                    struct.unpack('I', freq[:4])[0] if freq else None)
+        return None, None
+
+    def get_station_signal(self, ifname):
+        """Retorna la señal (dBm) de la estación asociada"""
+        ifindex = socket.if_nametoindex(ifname)
+        attrs = self._attr(NL80211_ATTR_IFINDEX, struct.pack('I', ifindex))
+        messages = self._request(self.family_id, NL80211_CMD_GET_STATION, attrs,
+                                 flags=NLM_F_REQUEST | NLM_F_DUMP)
+        for msg in messages:
+            info = msg.get(NL80211_ATTR_STA_INFO)
+            if info:
+                signal = self._parse_attrs(info).get(NL80211_STA_INFO_SIGNAL)
+                if signal:
+                    return struct.unpack('b', signal[:1])[0]
+        return None
+
+
+class LinuxWirelessBackend:
+    """
+    Backend WiFi en proceso para Linux.
+    El RSSI sale de procfs en cada muestra; SSID y canal se consultan vía
+    nl80211 (o con `info_fallback`) como máximo cada `info_ttl` segundos.
+    """
+
+    def __init__(self, interface=None, proc_path=PROC_NET_WIRELESS,
+                 use_netlink=True, info_fallback=None, info_ttl=5.0):
+        self.interface = interface
+        self.reader = ProcNetWirelessReader(proc_path)
+        self.info_fallback = info_fallback
+        self.info_ttl = info_ttl
+        self._info = {}
+        self.netlink = None
+        if use_netlink:
+            try:
+                self.netlink = Nl80211Client()
+            except OSError as e:
+                print(f"nl80211 no disponible, usando solo procfs: {e}")
+
+    def read_all(self):
+        """Lee todas las interfaces inalámbricas -> {iface: (rssi, ssid, channel)}"""
+        readings = {}
+        for iface, values in self.reader.read().items():
+            if values['level'] is None:
+                continue
+            ssid, channel = self._get_info(iface)
+            readings[iface] = (values['level'], ssid, channel)
+        if self.netlink:
+            # Interfaces ausentes de procfs o sin nivel: preguntar a nl80211
+            for iface in wireless_interfaces():
+                if iface in readings:
+                    continue
+                try:
+                    rssi = self.netlink.get_station_signal(iface)
+                except OSError:
+                    continue
+                if rssi is not None:
+                    readings[iface] = (rssi,) + self._get_info(iface)
+        return readings
+
+    def read(self):
+        """Lee la interfaz configurada (o la primera) -> (rssi, ssid, channel)"""
+        interfaces = self.reader.read()
+        if interfaces:
+            iface = self.interface if self.interface in interfaces else next(iter(interfaces))
+            rssi = interfaces[iface]['level']
+        else:
+            iface = self.interface or next(iter(wireless_interfaces()), None)
+            rssi = None
+        if rssi is None:
+            # Kernels sin extensiones wext dejan procfs vacío y una interfaz sin
+            # asociar informa nivel 0: preguntar a nl80211
+            if not iface or not self.netlink:
+                return None, None, None
+            try:
+                rssi = self.netlink.get_station_signal(iface)
+            except OSError as e:
+                print(f"Error nl80211: {e}")
+                return None, None, None
+            if rssi is None:
+                return None, None, None
+        ssid, channel = self._get_info(iface)
+        return rssi, ssid, channel
+
+    def _get_info(self, iface):
+        cached = self._info.get(iface)
+        now = time.monotonic()
+        if cached and now - cached[2] < self.info_ttl:
+            return cached[0], cached[1]
+
+        ssid, channel = None, None
+        if self.netlink:
+            try:
+                ssid, freq = self.netlink.get_interface(iface)
+                channel = freq_to_channel(freq)
+            except OSError as e:
+                print(f"Error nl80211: {e}")
+        if ssid is None and self.info_fallback:
+            ssid, channel = self.info_fallback()
+
+        self._info[iface] = (ssid, channel, now)
+        return ssid, channel
+
+    def close(self):
+        self.reader.close()
+        if self.netlink:
+            self.netlink.close()
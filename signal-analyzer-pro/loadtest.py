@@ -0,0 +1,263 @@
+"""
+Signal Analyzer Pro - Prueba de carga de los handlers de Socket.IO
+N clientes Socket.IO reales (websocket) piden eventos al servidor en bucle
+(test_wifi, get_channel_info, get_network_stats, get_wifi_history y
+scan_networks) y se mide la latencia de cada handler: desde el emit hasta el
+evento de respuesta. Cada cliente tiene una sola petición en vuelo, así un
+escaneo lento que bloqueara el servidor se vería en el p99 de todos los demás.
+
+Sin --url levanta server.py en un proceso hijo (modo threading, puerto
+libre; los clientes no compiten por el GIL del servidor) con la fuente sintética y las herramientas lentas simuladas con la demora
+típica de netsh/nmcli (--scan-delay, --channel-delay), así corre en
+máquinas sin radio. Con --url mide un servidor ya corriendo con sus
+herramientas reales, p. ej.:
+    SIGNAL_ASYNC_MODE=eventlet SIGNAL_PORT=5001 python server.py
+
+Uso:
+    python loadtest.py --clients 100 --duration 30
+    python loadtest.py --clients 100 --think 0.05     # saturar: ~20 peticiones/s por cliente
+    python loadtest.py --url http://localhost:5001 --clients 100 --json carga.json
+
+Requiere el cliente de python-socketio (requests y websocket-client).
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import socket
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+# (evento, payload, evento de respuesta, peso en la mezcla)
+REQUESTS = (
+    ('test_wifi', None, 'wifi_test_result', 4),
+    ('get_channel_info', None, 'channel_info', 2),
+    ('get_network_stats', None, 'network_stats', 2),
+    ('get_wifi_history', {'limit': 100}, 'wifi_history', 2),
+    ('scan_networks', {}, 'networks_found', 1)
+)
+# Eventos que esperan una herramienta lenta (el resto son handlers "rápidos")
+SLOW_EVENTS = ('scan_networks', 'get_channel_info')
+
+
+def percentile(values, p):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+
+# ===== Servidor en proceso =====
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _slow(delay, value):
+    """Herramienta simulada: bloquea `delay` segundos como netsh/nmcli y retorna `value`"""
+    def loader():
+        time.sleep(delay)
+        return value
+    return loader
+
+
+def _serve(port, scan_delay, channel_delay):
+    """Proceso hijo: importa server.py con fuente sintética y herramientas simuladas"""
+    # Los prints y el log por conexión del servidor taparían el reporte
+    sys.stdout = sys.stderr = open(os.devnull, 'w')
+    os.environ.setdefault('SIGNAL_DB', os.path.join(tempfile.mkdtemp(prefix='signal-load-'), 'load.db'))
+    os.environ.setdefault('SIGNAL_SOURCE', 'synthetic')
+    os.environ['SIGNAL_ASYNC_MODE'] = 'threading'
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import server
+
+    networks = [{'ssid': f'Red-{i}', 'auth': 'WPA2-Personal',
+                 'bssids': [{'mac': f'9c:53:22:aa:bb:{i:02x}', 'signal': 40 + i, 'channel': 1 + i % 11}]}
+                for i in range(20)]
+    server.engine.register('networks', _slow(scan_delay, networks))
+    server.engine.register('channel', _slow(channel_delay, {
+        'channel': 44, 'band': '802.11ax', 'frequency': 5.22, 'width': '80 MHz'}))
+
+    server.socketio.run(server.app, host='127.0.0.1', port=port, allow_unsafe_werkzeug=True,
+                        log_output=False, use_reloader=False)
+
+
+def start_server(scan_delay, channel_delay):
+    """Levanta el servidor en un proceso hijo; retorna (proceso, URL)"""
+    port = _free_port()
+    process = multiprocessing.Process(target=_serve, args=(port, scan_delay, channel_delay),
+                                      daemon=True)
+    process.start()
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline and process.is_alive():
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.2).close()
+            return process, f'http://127.0.0.1:{port}'
+        except OSError:
+            time.sleep(0.05)
+    process.terminate()
+    raise RuntimeError('El servidor no arrancó')
+
+
+# ===== Clientes =====
+
+class LoadClient:
+    """Cliente con una petición en vuelo; registra la latencia de cada respuesta"""
+
+    def __init__(self, url, seed, timeout=10.0, think=0.5):
+        import socketio
+        self.url = url
+        self.rng = random.Random(seed)
+        self.timeout = timeout
+        self.think = think
+        self.sio = socketio.Client(reconnection=False)
+        self.latencies = {event: [] for event, _, _, _ in REQUESTS}
+        self.errors = 0
+        self.timeouts = 0
+        self._expected = None
+        self._failed = False
+        self._done = threading.Event()
+        for _, _, reply, _ in REQUESTS:
+            self.sio.on(reply, self._on_reply(reply))
+        self.sio.on('wifi_error', self._on_reply('wifi_error'))
+
+    def _on_reply(self, event):
+        def handler(*args):
+            if event == self._expected or event == 'wifi_error':
+                self._failed = event == 'wifi_error'
+                self._done.set()
+        return handler
+
+    def connect(self):
+        start = time.perf_counter()
+        self.sio.connect(self.url, transports=['websocket'], wait_timeout=10)
+        return time.perf_counter() - start
+
+    def run(self, stop):
+        weights = [weight for _, _, _, weight in REQUESTS]
+        while not stop.is_set() and self.sio.connected:
+            event, payload, reply, _ = self.rng.choices(REQUESTS, weights)[0]
+            self._done.clear()
+            self._expected = reply
+            start = time.perf_counter()
+            if payload is None:
+                self.sio.emit(event)
+            else:
+                self.sio.emit(event, payload)
+            if not self._done.wait(self.timeout):
+                self.timeouts += 1
+            elif self._failed:
+                self.errors += 1
+            else:
+                self.latencies[event].append(time.perf_counter() - start)
+            self._expected = None
+            stop.wait(self.rng.uniform(0, 2 * self.think))
+
+    def close(self):
+        try:
+            self.sio.disconnect()
+        except Exception:
+            pass
+
+
+def run_load(url, clients=100, duration=30.0, think=0.5, timeout=10.0):
+    """Conecta `clients` clientes, los hace pedir durante `duration` s y retorna el resumen"""
+    pool = ThreadPoolExecutor(max_workers=32)
+    load = [LoadClient(url, seed=i, timeout=timeout, think=think) for i in range(clients)]
+    connect_times = list(pool.map(lambda c: c.connect(), load))
+
+    stop = threading.Event()
+    threads = [threading.Thread(target=c.run, args=(stop,), daemon=True) for c in load]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    stop.wait(duration)
+    stop.set()
+    for thread in threads:
+        thread.join(timeout + 1)
+    elapsed = time.perf_counter() - start
+    # disconnect() espera el cierre del websocket: en paralelo
+    list(pool.map(lambda c: c.close(), load))
+    pool.shutdown()
+
+    def summary(values):
+        return {'count': len(values),
+                'p50_ms': percentile(values, 0.5) * 1000,
+                'p95_ms': percentile(values, 0.95) * 1000,
+                'p99_ms': percentile(values, 0.99) * 1000,
+                'max_ms': max(values) * 1000 if values else 0.0}
+
+    events = {event: summary([l for c in load for l in c.latencies[event]])
+              for event, _, _, _ in REQUESTS}
+    fast = [l for c in load for event, values in c.latencies.items()
+            if event not in SLOW_EVENTS for l in values]
+    total = sum(e['count'] for e in events.values())
+    return {
+        'url': url,
+        'clients': clients,
+        'duration_s': elapsed,
+        'requests': total,
+        'requests_per_s': total / elapsed,
+        'errors': sum(c.errors for c in load),
+        'timeouts': sum(c.timeouts for c in load),
+        'connect_p99_ms': percentile(connect_times, 0.99) * 1000,
+        'fast': summary(fast),
+        'events': events
+    }
+
+
+def print_report(result):
+    print("=" * 72)
+    print(f"Clientes: {result['clients']} | {result['duration_s']:.1f} s | "
+          f"{result['requests']} peticiones ({result['requests_per_s']:.0f}/s) | "
+          f"{result['errors']} errores | {result['timeouts']} sin respuesta")
+    print(f"Conexión p99: {result['connect_p99_ms']:.1f} ms")
+    print(f"{'handler':20s} {'n':>7s} {'p50 ms':>9s} {'p95 ms':>9s} {'p99 ms':>9s} {'máx ms':>9s}")
+    rows = list(result['events'].items()) + [('(rápidos)', result['fast'])]
+    for name, s in rows:
+        print(f"{name:20s} {s['count']:7d} {s['p50_ms']:9.1f} {s['p95_ms']:9.1f} "
+              f"{s['p99_ms']:9.1f} {s['max_ms']:9.1f}")
+    print("=" * 72)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Prueba de carga de Socket.IO de Signal Analyzer Pro')
+    parser.add_argument('--url', help='servidor ya corriendo (sin esto se levanta en proceso)')
+    parser.add_argument('--clients', type=int, default=100)
+    parser.add_argument('--duration', type=float, default=30.0, help='segundos de carga')
+    parser.add_argument('--think', type=float, default=0.5,
+                        help='pausa media entre peticiones de un cliente (s)')
+    parser.add_argument('--timeout', type=float, default=10.0, help='espera máxima por respuesta (s)')
+    parser.add_argument('--scan-delay', type=float, default=2.0,
+                        help='demora simulada de un escaneo de redes (s)')
+    parser.add_argument('--channel-delay', type=float, default=0.3,
+                        help='demora simulada de la consulta de canal (s)')
+    parser.add_argument('--json', help='guardar el resumen en este archivo')
+    args = parser.parse_args()
+
+    url = args.url
+    if not url:
+        process, url = start_server(args.scan_delay, args.channel_delay)
+        try:
+            result = run_load(url, args.clients, args.duration, args.think, args.timeout)
+        finally:
+            process.terminate()
+        result.update(scan_delay_s=args.scan_delay, channel_delay_s=args.channel_delay)
+    else:
+        result = run_load(url, args.clients, args.duration, args.think, args.timeout)
+
+    print_report(result)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,314 @@
+"""
+Signal Analyzer Pro - Métricas e instrumentación
+Contadores, gauges e histogramas de buckets fijos con etiquetas, pensados
+para el camino caliente: registrar una observación es una búsqueda binaria
+y una suma bajo un lock, sin asignar memoria. El registro se expone en
+formato de texto de Prometheus (/metrics) y como diccionario para el stream
+de diagnóstico de Socket.IO.
+
+Incluye un perfilador por muestreo opcional: recorre las pilas de todos los
+hilos a una frecuencia fija durante una ventana y las devuelve en formato
+"folded" (una pila por línea con su conteo), listo para flamegraph.pl o
+speedscope.
+"""
+import bisect
+import math
+import os
+import sys
+import threading
+import time
+from collections import Counter as StackCounter
+
+
+# Buckets por defecto en segundos: de 100 µs a 10 s
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                   0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value)
+
+
+# ===== Métricas =====
+
+class _Metric:
+    kind = 'untyped'
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self._children = {}
+        self._lock = threading.Lock()
+        if not self.label_names:
+            self._children[()] = self._new_child()
+
+    def labels(self, *values):
+        """Serie de la combinación de etiquetas (se crea la primera vez)"""
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def remove(self, *values):
+        with self._lock:
+            self._children.pop(tuple(str(v) for v in values), None)
+
+    def _series(self):
+        with self._lock:
+            return list(self._children.items())
+
+
+class _CounterChild:
+    __slots__ = ('value', '_lock')
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+
+class Counter(_Metric):
+    kind = 'counter'
+    _new_child = _CounterChild
+
+    def inc(self, amount=1):
+        self._children[()].inc(amount)
+
+    def render(self):
+        for values, child in self._series():
+            yield f"{self.name}{_format_labels(self.label_names, values)} {_format_value(child.value)}"
+
+    def snapshot(self):
+        return [{'labels': dict(zip(self.label_names, values)), 'value': child.value}
+                for values, child in self._series()]
+
+
+class _GaugeChild:
+    __slots__ = ('value',)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def set(self, value):
+        self.value = value
+
+
+class Gauge(_Metric):
+    kind = 'gauge'
+    _new_child = _GaugeChild
+
+    def set(self, value):
+        self._children[()].set(value)
+
+    def render(self):
+        for values, child in self._series():
+            yield f"{self.name}{_format_labels(self.label_names, values)} {_format_value(child.value)}"
+
+    def snapshot(self):
+        return [{'labels': dict(zip(self.label_names, values)), 'value': child.value}
+                for values, child in self._series()]
+
+
+class _HistogramChild:
+    __slots__ = ('bounds', 'counts', 'sum', 'count', '_lock')
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        i = bisect.bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+            self.count += 1
+
+    def quantile(self, q):
+        """Cuantil estimado interpolando dentro del bucket"""
+        with self._lock:
+            counts, total = list(self.counts), self.count
+        if total == 0:
+            return None
+        rank = q * total
+        seen = 0
+        for i, count in enumerate(counts):
+            if seen + count >= rank and count:
+                low = self.bounds[i - 1] if i > 0 else 0.0
+                high = self.bounds[i] if i < len(self.bounds) else self.bounds[-1]
+                return low + (high - low) * (rank - seen) / count
+            seen += count
+        return self.bounds[-1]
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        self.bounds = tuple(sorted(buckets))
+        super().__init__(name, help_text, labels)
+
+    def _new_child(self):
+        return _HistogramChild(self.bounds)
+
+    def observe(self, value):
+        self._children[()].observe(value)
+
+    def render(self):
+        for values, child in self._series():
+            with child._lock:
+                counts, total, acc = list(child.counts), child.count, child.sum
+            cumulative = 0
+            for bound, count in zip(self.bounds + (math.inf,), counts):
+                cumulative += count
+                labels = _format_labels(self.label_names, values, ('le', _format_value(float(bound))))
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.label_names, values)
+            yield f"{self.name}_sum{labels} {_format_value(acc)}"
+            yield f"{self.name}_count{labels} {total}"
+
+    def snapshot(self):
+        series = []
+        for values, child in self._series():
+            series.append({
+                'labels': dict(zip(self.label_names, values)),
+                'count': child.count,
+                'sum': child.sum,
+                'p50': child.quantile(0.5),
+                'p99': child.quantile(0.99)
+            })
+        return series
+
+
+# ===== Registro =====
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def _add(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, help_text, labels=()):
+        return self._add(Counter(name, help_text, labels))
+
+    def gauge(self, name, help_text, labels=()):
+        return self._add(Gauge(name, help_text, labels))
+
+    def histogram(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        return self._add(Histogram(name, help_text, labels, buckets))
+
+    def add_collector(self, collect):
+        """
+        Registra una función que se evalúa en cada lectura y retorna métricas
+        ya calculadas en otro lado: [(nombre, tipo, ayuda, [(etiquetas, valor)])]
+        """
+        self._collectors.append(collect)
+
+    def _collected(self):
+        for collect in self._collectors:
+            try:
+                yield from collect()
+            except Exception as e:
+                print(f"Error recolectando métricas: {e}")
+
+    def render(self):
+        """Texto en formato de exposición de Prometheus (versión 0.0.4)"""
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        for name, kind, help_text, samples in self._collected():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                lines.append(f"{name}{_format_labels(labels.keys(), labels.values())} "
+                             f"{_format_value(float(value))}")
+        return '\n'.join(lines) + '\n'
+
+    def snapshot(self):
+        """Diccionario {métrica: [series]} para el stream de diagnóstico"""
+        data = {metric.name: metric.snapshot() for metric in self._metrics}
+        for name, _, _, samples in self._collected():
+            data[name] = [{'labels': labels, 'value': value} for labels, value in samples]
+        return data
+
+
+# Registro del proceso: cada módulo declara ahí las métricas que observa
+REGISTRY = Registry()
+
+
+# ===== Perfilador por muestreo =====
+
+class SamplingProfiler:
+    """
+    Muestrea las pilas de todos los hilos con sys._current_frames() y las
+    agrega en formato folded. Una sola captura a la vez; el costo existe
+    solo mientras dura la ventana pedida.
+    """
+
+    def __init__(self, max_seconds=60.0, max_hz=1000.0):
+        self.max_seconds = max_seconds
+        self.max_hz = max_hz
+        self._busy = threading.Lock()
+
+    @staticmethod
+    def _frame_name(frame):
+        code = frame.f_code
+        return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+    def profile(self, seconds=10.0, hz=100.0):
+        """Captura durante `seconds`; retorna el texto folded o None si ya hay una captura"""
+        if not self._busy.acquire(blocking=False):
+            return None
+        try:
+            seconds = min(max(float(seconds), 0.1), self.max_seconds)
+            period = 1.0 / min(max(float(hz), 1.0), self.max_hz)
+            own = threading.get_ident()
+            stacks = StackCounter()
+            deadline = time.monotonic()
+            end = deadline + seconds
+            while deadline < end:
+                names = {t.ident: t.name for t in threading.enumerate()}
+                for ident, frame in sys._current_frames().items():
+                    if ident == own:
+                        continue
+                    stack = []
+                    while frame is not None:
+                        stack.append(self._frame_name(frame))
+                        frame = frame.f_back
+                    stack.append(names.get(ident, f"thread-{ident}"))
+                    stacks[';'.join(reversed(stack))] += 1
+                deadline += period
+                time.sleep(max(0.0, deadline - time.monotonic()))
+            return ''.join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+        finally:
+            self._busy.release()
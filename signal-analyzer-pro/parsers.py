@@ -0,0 +1,298 @@
+"""
+Signal Analyzer Pro - Parsers de herramientas del sistema
+Tablas de campos por idioma (precompiladas) para netsh, nmcli, iwconfig y
+airport. Cada salida se recorre una sola vez, sin line.lower() repetidos ni
+patrones sin compilar.
+"""
+import re
+
+
+# ===== Tablas de etiquetas por idioma (netsh) =====
+# Etiqueta normalizada (casefold, sin sufijo numérico) -> campo canónico
+
+NETSH_LABELS = {
+    'en': {
+        'ssid': 'ssid',
+        'bssid': 'bssid',
+        'ap bssid': 'bssid',
+        'signal': 'signal',
+        'rssi': 'rssi',
+        'channel': 'channel',
+        'radio type': 'radio_type',
+        'band': 'band',
+        'frequency': 'frequency',
+        'state': 'state',
+        'authentication': 'auth',
+        'network type': 'network_type'
+    },
+    'es': {
+        'ssid': 'ssid',
+        'bssid': 'bssid',
+        'bssid de ap': 'bssid',
+        'señal': 'signal',
+        'canal': 'channel',
+        'tipo de radio': 'radio_type',
+        'banda': 'band',
+        'frecuencia': 'frequency',
+        'estado': 'state',
+        'autenticación': 'auth',
+        'tipo de red': 'network_type'
+    },
+    'pt': {
+        'sinal': 'signal',
+        'canal': 'channel',
+        'tipo de rádio': 'radio_type',
+        'banda': 'band',
+        'estado': 'state',
+        'autenticação': 'auth'
+    },
+    'fr': {
+        'signal': 'signal',
+        'canal': 'channel',
+        'type de radio': 'radio_type',
+        'bande': 'band',
+        'état': 'state',
+        'authentification': 'auth'
+    },
+    'de': {
+        'signal': 'signal',
+        'kanal': 'channel',
+        'funktyp': 'radio_type',
+        'band': 'band',
+        'status': 'state',
+        'authentifizierung': 'auth'
+    }
+}
+
+# Tabla única con todos los idiomas: una sola búsqueda por línea
+NETSH_FIELDS = {}
+for _table in NETSH_LABELS.values():
+    NETSH_FIELDS.update(_table)
+
+# Valores "sí" de la columna ACTIVE de nmcli según el idioma
+NMCLI_ACTIVE = frozenset(['yes', 'sí', 'si', 'oui', 'ja', 'sim'])
+
+AIRPORT_FIELDS = {
+    'agrctlrssi': 'rssi',
+    'agrctlnoise': 'noise',
+    'ssid': 'ssid',
+    'bssid': 'bssid',
+    'channel': 'channel'
+}
+
+# ===== Patrones precompilados =====
+
+_LABEL_RE = re.compile(r'^\s*(?P<label>[^:\n]*?)(?:\s+\d+)?\s*:\s?(?P<value>.*?)\s*$', re.M)
+_INT_RE = re.compile(r'-?\d+')
+_FLOAT_RE = re.compile(r'\d+(?:[.,]\d+)?')
+_IWCONFIG_RE = re.compile(
+    r'ESSID:"(?P<ssid>[^"]*)"'
+    r'|Frequency[:=](?P<freq>[\d.]+)\s*GHz'
+    r'|Channel[:= ](?P<chan>\d+)'
+    r'|Signal level[:=](?P<level>-?\d+)(?P<scale>/\d+)?'
+)
+_NMCLI_SPLIT_RE = re.compile(r'(?<!\\):')
+_MAC_LINE_RE = re.compile(r'^\s*(?P<mac>[0-9A-Fa-f]{2}(?::[0-9A-Fa-f]{2}){5})(?P<rest>.*)$', re.M)
+_HCI_RSSI_RE = re.compile(r'RSSI return value:\s*(-?\d+)')
+
+# netsh escribe en la página de códigos OEM (cp850 en Windows occidental);
+# cp850 decodifica cualquier byte, así que nunca hace falta un tercer intento
+ENCODINGS = ('utf-8', 'cp850')
+
+
+# ===== Utilidades =====
+
+def decode_output(raw, encoding_cache=None):
+    """
+    Decodifica la salida en bytes de una herramienta.
+    Retorna (texto, encoding) probando primero el encoding cacheado; nunca
+    vuelve a lanzar el proceso.
+    """
+    if encoding_cache:
+        try:
+            return raw.decode(encoding_cache), encoding_cache
+        except UnicodeDecodeError:
+            pass
+    for enc in ENCODINGS:
+        try:
+            return raw.decode(enc), enc
+        except UnicodeDecodeError:
+            continue
+    return raw.decode('utf-8', errors='replace'), None
+
+
+def percent_to_dbm(percent):
+    """Convierte calidad en % (netsh/nmcli) a dBm aproximado"""
+    return int((percent / 2) - 100)
+
+
+def freq_to_channel(freq_mhz):
+    """Convierte frecuencia (MHz) a número de canal"""
+    if not freq_mhz:
+        return None
+    freq_mhz = int(freq_mhz)
+    if freq_mhz == 2484:
+        return 14
+    if 2412 <= freq_mhz <= 2472:
+        return (freq_mhz - 2407) // 5
+    if 5000 <= freq_mhz < 5925:
+        return (freq_mhz - 5000) // 5
+    if 5925 <= freq_mhz <= 7125:
+        return (freq_mhz - 5950) // 5
+    return None
+
+
+def _first_int(value):
+    match = _INT_RE.search(value)
+    return int(match.group()) if match else None
+
+
+def _iter_fields(text, table):
+    """Genera (campo, valor) para cada línea 'Etiqueta : valor' conocida"""
+    for match in _LABEL_RE.finditer(text):
+        field = table.get(match.group('label').casefold())
+        if field:
+            yield field, match.group('value')
+
+
+# ===== netsh (Windows) =====
+
+def parse_netsh_interfaces(text):
+    """Parsea 'netsh wlan show interfaces' -> dict con rssi, ssid, canal, etc."""
+    info = {}
+    for field, value in _iter_fields(text, NETSH_FIELDS):
+        if field in info:
+            continue
+        if field == 'signal':
+            percent = _first_int(value)
+            if percent is not None:
+                info['signal'] = percent
+        elif field == 'rssi':
+            info['rssi'] = _first_int(value)
+        elif field == 'channel':
+            info['channel'] = _first_int(value)
+        elif field == 'frequency':
+            match = _FLOAT_RE.search(value)
+            if match:
+                info['frequency'] = float(match.group().replace(',', '.'))
+        else:
+            info[field] = value
+
+    # El RSSI directo (Windows 11) tiene prioridad sobre el porcentaje
+    if info.get('rssi') is None and 'signal' in info:
+        info['rssi'] = percent_to_dbm(info['signal'])
+    return info
+
+
+def parse_netsh_networks(text):
+    """Parsea 'netsh wlan show networks mode=bssid' -> lista de redes"""
+    networks = []
+    current = None
+    for field, value in _iter_fields(text, NETSH_FIELDS):
+        if field == 'ssid':
+            current = {'ssid': value, 'bssids': []}
+            networks.append(current)
+        elif current is None:
+            continue
+        elif field == 'bssid':
+            current['bssids'].append({'mac': value})
+        elif current['bssids'] and field in ('signal', 'channel'):
+            number = _first_int(value)
+            if number is not None:
+                current['bssids'][-1][field] = number
+        elif field == 'auth':
+            current['auth'] = value
+    return networks
+
+
+# ===== nmcli (Linux) =====
+
+def _split_nmcli(line):
+    return [part.replace('\\:', ':') for part in _NMCLI_SPLIT_RE.split(line)]
+
+
+def parse_nmcli_active(text):
+    """Parsea 'nmcli -t -f ACTIVE,SSID,SIGNAL,CHAN dev wifi' -> (rssi, ssid, channel)"""
+    for line in text.split('\n'):
+        parts = _split_nmcli(line)
+        if len(parts) >= 3 and parts[0].casefold() in NMCLI_ACTIVE:
+            try:
+                rssi = percent_to_dbm(int(parts[2]))
+            except ValueError:
+                continue
+            channel = int(parts[3]) if len(parts) >= 4 and parts[3].isdigit() else None
+            return rssi, parts[1], channel
+    return None, None, None
+
+
+def parse_nmcli_networks(text):
+    """Parsea 'nmcli -t -f SSID,BSSID,CHAN,SIGNAL dev wifi' -> lista de redes"""
+    networks = []
+    for line in text.split('\n'):
+        parts = _split_nmcli(line)
+        if len(parts) >= 4:
+            networks.append({
+                'ssid': parts[0],
+                'bssids': [{
+                    'mac': parts[1],
+                    'channel': int(parts[2]) if parts[2].isdigit() else 0,
+                    'signal': int(parts[3]) if parts[3].isdigit() else -100
+                }]
+            })
+    return networks
+
+
+# ===== iwconfig (Linux) =====
+
+def parse_iwconfig(text):
+    """Parsea la salida de iwconfig -> (rssi, ssid, channel)"""
+    rssi, ssid, channel, freq = None, None, None, None
+    for match in _IWCONFIG_RE.finditer(text):
+        if match.group('ssid') is not None and ssid is None:
+            ssid = match.group('ssid')
+        elif match.group('freq') and freq is None:
+            freq = float(match.group('freq'))
+        elif match.group('chan') and channel is None:
+            channel = int(match.group('chan'))
+        elif match.group('level') and rssi is None:
+            level = int(match.group('level'))
+            # Algunos drivers reportan calidad relativa (p. ej. 60/100)
+            rssi = percent_to_dbm(level) if match.group('scale') else level
+    if channel is None and freq:
+        channel = freq_to_channel(round(freq * 1000))
+    return rssi, ssid, channel
+
+
+# ===== airport (macOS) =====
+
+def parse_airport(text):
+    """Parsea 'airport -I' -> (rssi, ssid, channel)"""
+    info = {}
+    for field, value in _iter_fields(text, AIRPORT_FIELDS):
+        if field not in info:
+            info[field] = value
+    rssi = _first_int(info['rssi']) if 'rssi' in info else None
+    channel = _first_int(info['channel']) if 'channel' in info else None
+    return rssi, info.get('ssid'), channel
+
+
+# ===== hcitool (Linux, Bluetooth) =====
+
+def parse_hcitool_scan(text):
+    """Parsea 'hcitool scan' -> [(mac, nombre)]"""
+    devices = []
+    for match in _MAC_LINE_RE.finditer(text):
+        name = match.group('rest').strip()
+        devices.append((match.group('mac').upper(), name or None))
+    return devices
+
+
+def parse_hcitool_inq(text):
+    """Parsea 'hcitool inq' -> [mac] (sin resolución de nombres)"""
+    return [match.group('mac').upper() for match in _MAC_LINE_RE.finditer(text)]
+
+
+def parse_hcitool_rssi(text):
+    """Parsea 'hcitool rssi <mac>' -> dBm o None"""
+    match = _HCI_RSSI_RE.search(text)
+    return int(match.group(1)) if match else None
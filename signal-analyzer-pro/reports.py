@@ -0,0 +1,331 @@
+"""
+Signal Analyzer Pro - Reportes PDF en el servidor
+Renderiza serie temporal, histograma y mapa de calor con matplotlib (backend
+Agg) sobre el historial completo del almacén y arma el PDF con reportlab.
+Cada figura se genera en un pool de procesos y se cachea en disco por rango
+de datos: repetir un reporte sobre la misma ventana reutiliza las imágenes.
+"""
+import hashlib
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+from datetime import datetime
+
+
+FIGURES = ('timeseries', 'histogram', 'heatmap')
+
+# Nivel de agregación de la serie temporal según la duración del rango
+TIMESERIES_TIERS = ((2 * 3600, 'raw'), (7 * 86400, '1m'), (math.inf, '1h'))
+
+DAYS = ('Lun', 'Mar', 'Mié', 'Jue', 'Vie', 'Sáb', 'Dom')
+
+
+# ===== Trabajo en los procesos del pool =====
+# Funciones de nivel de módulo (se serializan por nombre); cada proceso abre su
+# propia conexión de solo lectura e importa matplotlib con el backend Agg.
+
+@contextmanager
+def _connect(db_path):
+    conn = sqlite3.connect(f'file:{db_path}?mode=ro', uri=True, timeout=10)
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+def _pyplot():
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def compute_summary(db_path, start, end, source='local'):
+    """Estadísticas del rango de una fuente en SQL (sin cargar las muestras)"""
+    with _connect(db_path) as conn:
+        n, avg, avg_sq, low, high = conn.execute(
+            'SELECT COUNT(*), AVG(rssi), AVG(rssi * rssi), MIN(rssi), MAX(rssi) '
+            'FROM wifi_samples WHERE source = ? AND ts BETWEEN ? AND ?', (source, start, end)
+        ).fetchone()
+    if not n:
+        return {'count': 0, 'avg': 0, 'min': 0, 'max': 0, 'std': 0}
+    variance = max(avg_sq - avg * avg, 0.0) * n / (n - 1) if n > 1 else 0.0
+    return {'count': n, 'avg': avg, 'min': low, 'max': high, 'std': math.sqrt(variance)}
+
+
+def render_figure(kind, db_path, start, end, output_path, points=None, source='local'):
+    """Renderiza una figura de una fuente (serie WiFi) a PNG y retorna su ruta"""
+    plt = _pyplot()
+    fig, ax = plt.subplots(figsize=(10, 4.5), dpi=120)
+    try:
+        if kind == 'timeseries':
+            _plot_timeseries(ax, db_path, start, end, source)
+        elif kind == 'histogram':
+            _plot_histogram(ax, db_path, start, end, source)
+        elif kind == 'heatmap':
+            if points:
+                _plot_map_heatmap(fig, ax, points)
+            else:
+                _plot_weekly_heatmap(fig, ax, db_path, start, end, source)
+        else:
+            raise ValueError(f"Figura desconocida: {kind}")
+        fig.tight_layout()
+        tmp_path = output_path + '.tmp'
+        fig.savefig(tmp_path, format='png')
+        os.replace(tmp_path, output_path)
+    finally:
+        plt.close(fig)
+    return output_path
+
+
+def _plot_timeseries(ax, db_path, start, end, source):
+    tier = next(name for limit, name in TIMESERIES_TIERS if end - start <= limit)
+    with _connect(db_path) as conn:
+        if tier == 'raw':
+            rows = conn.execute(
+                'SELECT ts, rssi FROM wifi_samples WHERE source = ? AND ts BETWEEN ? AND ? '
+                'ORDER BY ts', (source, start, end)
+            ).fetchall()
+            times = [datetime.fromtimestamp(ts) for ts, _ in rows]
+            ax.plot(times, [rssi for _, rssi in rows], color='#4c9aff', linewidth=0.8)
+        else:
+            rows = conn.execute(
+                f'SELECT bucket, SUM(sum) / SUM(n), MIN(min), MAX(max) FROM rollup_{tier} '
+                "WHERE kind = 'wifi' AND series = ? AND bucket BETWEEN ? AND ? "
+                'GROUP BY bucket ORDER BY bucket', (source, start, end)
+            ).fetchall()
+            times = [datetime.fromtimestamp(b) for b, _, _, _ in rows]
+            ax.fill_between(times, [r[2] for r in rows], [r[3] for r in rows],
+                            color='#4c9aff', alpha=0.25, linewidth=0, label='mín-máx')
+            ax.plot(times, [r[1] for r in rows], color='#4c9aff', linewidth=1, label='media')
+            ax.legend(loc='lower right')
+    ax.set_title(f'RSSI en el tiempo (nivel {tier})')
+    ax.set_ylabel('RSSI (dBm)')
+    ax.grid(alpha=0.3)
+    ax.figure.autofmt_xdate()
+
+
+def _plot_histogram(ax, db_path, start, end, source):
+    with _connect(db_path) as conn:
+        rows = conn.execute(
+            'SELECT rssi, COUNT(*) FROM wifi_samples WHERE source = ? AND ts BETWEEN ? AND ? '
+            'GROUP BY rssi ORDER BY rssi', (source, start, end)
+        ).fetchall()
+    ax.bar([r for r, _ in rows], [c for _, c in rows], width=1.0, color='#51cf66')
+    ax.set_title('Distribución de RSSI')
+    ax.set_xlabel('RSSI (dBm)')
+    ax.set_ylabel('Muestras')
+    ax.grid(alpha=0.3, axis='y')
+
+
+def _plot_weekly_heatmap(fig, ax, db_path, start, end, source):
+    import numpy as np
+    sums = np.zeros((7, 24))
+    counts = np.zeros((7, 24))
+    with _connect(db_path) as conn:
+        for bucket, n, total in conn.execute(
+            "SELECT bucket, n, sum FROM rollup_1h "
+            "WHERE kind = 'wifi' AND series = ? AND bucket BETWEEN ? AND ?",
+            (source, start - 3600, end)
+        ):
+            moment = datetime.fromtimestamp(bucket)
+            sums[moment.weekday(), moment.hour] += total
+            counts[moment.weekday(), moment.hour] += n
+    with np.errstate(invalid='ignore'):
+        mean = np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+    image = ax.imshow(mean, aspect='auto', cmap='RdYlGn', vmin=-90, vmax=-30)
+    ax.set_yticks(range(7), DAYS)
+    ax.set_xticks(range(0, 24, 2))
+    ax.set_xlabel('Hora del día')
+    ax.set_title('RSSI medio por día y hora')
+    fig.colorbar(image, ax=ax, label='dBm')
+
+
+def _plot_map_heatmap(fig, ax, points):
+    import heatmap
+    pts = heatmap.as_points(points)
+    width = max(800.0, float(pts[:, 0].max()) + 50)
+    height = max(600.0, float(pts[:, 1].max()) + 50)
+    rssi, _ = heatmap.interpolate(pts, 0, 0, width, height, step=4)
+    image = ax.imshow(rssi, extent=(0, width, height, 0), cmap='RdYlGn', vmin=-90, vmax=-30)
+    ax.scatter(pts[:, 0], pts[:, 1], c='white', edgecolors='black', s=18)
+    ax.set_title('Mapa de calor de cobertura')
+    ax.set_aspect('equal')
+    fig.colorbar(image, ax=ax, label='dBm')
+
+
+def build_pdf(output_path, title, start, end, summary, figure_paths):
+    """Arma el PDF (reportlab; si no está, PdfPages de matplotlib)"""
+    recommendations = []
+    if summary['count'] and summary['avg'] < -70:
+        recommendations.append('Señal débil. Considera reposicionar el router.')
+    if summary['std'] > 10:
+        recommendations.append('Alta variación. Puede haber interferencias.')
+    period = (f"{datetime.fromtimestamp(start):%Y-%m-%d %H:%M} — "
+              f"{datetime.fromtimestamp(end):%Y-%m-%d %H:%M}")
+    rows = [
+        ('Muestras', f"{summary['count']:,}"),
+        ('Promedio RSSI', f"{summary['avg']:.1f} dBm"),
+        ('Mínimo', f"{summary['min']} dBm"),
+        ('Máximo', f"{summary['max']} dBm"),
+        ('Desviación', f"{summary['std']:.2f} dBm")
+    ]
+
+    try:
+        from reportlab.lib.pagesizes import A4
+        from reportlab.lib.styles import getSampleStyleSheet
+        from reportlab.lib.units import cm
+        from reportlab.platypus import Image, Paragraph, SimpleDocTemplate, Spacer, Table
+    except ImportError:
+        return _build_pdf_matplotlib(output_path, title, period, rows, recommendations, figure_paths)
+
+    styles = getSampleStyleSheet()
+    story = [
+        Paragraph(title, styles['Title']),
+        Paragraph(f'Periodo: {period}', styles['Normal']),
+        Paragraph(f'Generado: {datetime.now():%Y-%m-%d %H:%M:%S}', styles['Normal']),
+        Spacer(1, 0.5 * cm),
+        Paragraph('Estadísticas', styles['Heading2']),
+        Table(rows, hAlign='LEFT'),
+        Spacer(1, 0.5 * cm)
+    ]
+    if recommendations:
+        story.append(Paragraph('Recomendaciones', styles['Heading2']))
+        story.extend(Paragraph(f'• {text}', styles['Normal']) for text in recommendations)
+    for path in figure_paths:
+        story.append(Spacer(1, 0.5 * cm))
+        story.append(Image(path, width=17 * cm, height=17 * cm * 4.5 / 10))
+
+    tmp_path = output_path + '.tmp'
+    SimpleDocTemplate(tmp_path, pagesize=A4, title=title).build(story)
+    os.replace(tmp_path, output_path)
+    return output_path
+
+
+def _build_pdf_matplotlib(output_path, title, period, rows, recommendations, figure_paths):
+    plt = _pyplot()
+    from matplotlib.backends.backend_pdf import PdfPages
+    tmp_path = output_path + '.tmp'
+    with PdfPages(tmp_path) as pdf:
+        fig = plt.figure(figsize=(8.27, 11.69))
+        lines = [title, f'Periodo: {period}', ''] + [f'{k}: {v}' for k, v in rows]
+        if recommendations:
+            lines += ['', 'Recomendaciones'] + [f'• {text}' for text in recommendations]
+        fig.text(0.1, 0.9, '\n'.join(lines), va='top', fontsize=12)
+        pdf.savefig(fig)
+        plt.close(fig)
+        for path in figure_paths:
+            fig = plt.figure(figsize=(11.69, 8.27))
+            fig.figimage(plt.imread(path), resize=True)
+            pdf.savefig(fig)
+            plt.close(fig)
+    os.replace(tmp_path, output_path)
+    return output_path
+
+
+# ===== Orquestación (proceso del servidor) =====
+
+class ReportManager:
+    def __init__(self, store, output_dir, workers=2):
+        self.store = store
+        self.output_dir = output_dir
+        self.cache_dir = os.path.join(output_dir, 'cache')
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.workers = workers
+        self._executor = None
+        self._lock = threading.Lock()
+        self.jobs = {}
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            return self._executor
+
+    def start(self, params, on_progress):
+        """
+        Lanza un reporte en segundo plano y retorna su id.
+        on_progress(job) se invoca en cada etapa; job['status'] termina en
+        'ready' (con job['path']) o 'error' (con job['error']).
+        """
+        job_id = uuid.uuid4().hex[:12]
+        job = {'id': job_id, 'status': 'running', 'progress': 0, 'stage': 'datos',
+               'started': time.time()}
+        self.jobs[job_id] = job
+        threading.Thread(target=self._run, args=(job, params, on_progress), daemon=True).start()
+        return job_id
+
+    def path(self, job_id):
+        job = self.jobs.get(job_id)
+        return job.get('path') if job and job['status'] == 'ready' else None
+
+    def _update(self, job, on_progress, **changes):
+        job.update(changes)
+        try:
+            on_progress(dict(job))
+        except Exception as e:
+            print(f"Error notificando progreso del reporte: {e}")
+
+    def _run(self, job, params, on_progress):
+        try:
+            self.store.flush()
+            source = params.get('source') or 'local'
+            first, last = self.store.time_range('wifi', source)
+            if first is None:
+                raise ValueError('No hay datos en el historial')
+            start = params.get('start') or first
+            end = params.get('end') or last
+            points = params.get('points') or None
+
+            # Cambia si llegan o se purgan muestras dentro del rango
+            fingerprint = self.store.range_info(start, end, series=source)
+            pool = self._pool()
+            summary_future = pool.submit(compute_summary, self.store.path, start, end, source)
+
+            paths = {}
+            pending = {}
+            for kind in FIGURES:
+                extra = points if kind == 'heatmap' else None
+                path = self._cache_path(kind, source, start, end, fingerprint, extra)
+                paths[kind] = path
+                if not os.path.exists(path):
+                    pending[pool.submit(render_figure, kind, self.store.path,
+                                        start, end, path, extra, source)] = kind
+
+            done = len(FIGURES) - len(pending)
+            self._update(job, on_progress, progress=10 + 70 * done // len(FIGURES),
+                         stage='figuras', cached=done)
+            for future in as_completed(pending):
+                future.result()
+                done += 1
+                self._update(job, on_progress, progress=10 + 70 * done // len(FIGURES),
+                             stage=f'figura {pending[future]}')
+
+            summary = summary_future.result()
+            self._update(job, on_progress, progress=85, stage='pdf')
+            output = os.path.join(self.output_dir, f"reporte_{job['id']}.pdf")
+            pool.submit(build_pdf, output, 'Reporte de Análisis WiFi', start, end,
+                        summary, [paths[kind] for kind in FIGURES]).result()
+
+            self._update(job, on_progress, status='ready', progress=100, stage='listo',
+                         path=output, summary=summary,
+                         seconds=time.time() - job['started'])
+        except Exception as e:
+            print(f"Error generando reporte: {e}")
+            self._update(job, on_progress, status='error', error=str(e))
+
+    def _cache_path(self, kind, source, start, end, fingerprint, extra):
+        key = json.dumps([kind, source, start, end, list(fingerprint), extra],
+                         sort_keys=True, default=str)
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()[:20]
+        return os.path.join(self.cache_dir, f'{kind}_{digest}.png')
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
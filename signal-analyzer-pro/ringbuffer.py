@@ -0,0 +1,112 @@
+"""
+Signal Analyzer Pro - Buffer circular columnar
+Historial de muestras en arreglos NumPy tipados de capacidad fija:
+tiempo epoch (float64), RSSI (int16), canal (uint16) y SSID internado (uint16).
+Cada muestra se escribe dos veces (i e i + capacidad) para que cualquier
+ventana de las últimas N muestras sea una vista contigua sin copias.
+"""
+import numpy as np
+
+
+NO_CHANNEL = 0
+NO_SSID = 0
+
+
+class SampleRingBuffer:
+    def __init__(self, capacity=100000):
+        self.capacity = capacity
+        self._time = np.zeros(2 * capacity, dtype=np.float64)
+        self._rssi = np.zeros(2 * capacity, dtype=np.int16)
+        self._channel = np.zeros(2 * capacity, dtype=np.uint16)
+        self._ssid = np.zeros(2 * capacity, dtype=np.uint16)
+        # El id 0 queda reservado para "sin SSID"
+        self._ssid_names = ['N/A']
+        self._ssid_ids = {}
+        self._head = 0
+        self._count = 0
+        self.total = 0
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def nbytes(self):
+        return self._time.nbytes + self._rssi.nbytes + self._channel.nbytes + self._ssid.nbytes
+
+    def intern(self, ssid):
+        """Retorna el id numérico de un SSID (lo registra si es nuevo)"""
+        if not ssid:
+            return NO_SSID
+        ssid_id = self._ssid_ids.get(ssid)
+        if ssid_id is None:
+            ssid_id = len(self._ssid_names)
+            self._ssid_names.append(ssid)
+            self._ssid_ids[ssid] = ssid_id
+        return ssid_id
+
+    def ssid_name(self, ssid_id):
+        return self._ssid_names[int(ssid_id)]
+
+    def append(self, ts, rssi, channel=None, ssid=None):
+        """Agrega una muestra en O(1)"""
+        ssid_id = self.intern(ssid)
+        channel = channel or NO_CHANNEL
+        for i in (self._head, self._head + self.capacity):
+            self._time[i] = ts
+            self._rssi[i] = rssi
+            self._channel[i] = channel
+            self._ssid[i] = ssid_id
+        self._head = (self._head + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+        self.total += 1
+
+    def clear(self):
+        self._head = 0
+        self._count = 0
+
+    def _slice(self, n=None):
+        n = self._count if n is None else max(0, min(n, self._count))
+        end = self._head + self.capacity
+        return slice(end - n, end)
+
+    def window(self, n=None):
+        """Vistas (sin copia) de las últimas `n` muestras, en orden cronológico"""
+        s = self._slice(n)
+        return {
+            'time': self._time[s],
+            'rssi': self._rssi[s],
+            'channel': self._channel[s],
+            'ssid_id': self._ssid[s]
+        }
+
+    def since(self, start, end=None):
+        """Vistas de las muestras con tiempo en [start, end]"""
+        view = self.window()
+        times = view['time']
+        lo = np.searchsorted(times, start, side='left') if start is not None else 0
+        hi = np.searchsorted(times, end, side='right') if end is not None else len(times)
+        return {key: values[lo:hi] for key, values in view.items()}
+
+    def summary(self, n=None):
+        """Estadísticas vectorizadas sobre la ventana"""
+        rssi = self.window(n)['rssi']
+        if len(rssi) == 0:
+            return {'avg': 0, 'min': 0, 'max': 0, 'std': 0, 'count': 0}
+        values = rssi.astype(np.float64)
+        return {
+            'avg': float(values.mean()),
+            'min': int(rssi.min()),
+            'max': int(rssi.max()),
+            'std': float(values.std(ddof=1)) if len(values) > 1 else 0.0,
+            'count': int(len(values))
+        }
+
+    def to_records(self, n=None):
+        """Convierte la ventana a filas dict (solo para respuestas JSON pequeñas)"""
+        view = self.window(n)
+        names = self._ssid_names
+        return [
+            {'ts': t, 'rssi': r, 'channel': c or None, 'ssid': names[s]}
+            for t, r, c, s in zip(view['time'].tolist(), view['rssi'].tolist(),
+                                  view['channel'].tolist(), view['ssid_id'].tolist())
+        ]
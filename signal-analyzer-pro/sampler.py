@@ -0,0 +1,216 @@
+"""
+Signal Analyzer Pro - Motor de muestreo compartido
+Un único motor es dueño de todas las invocaciones a herramientas externas
+(netsh, iwconfig, nmcli, airport, hcitool) y publica la última instantánea
+cacheada a todos los handlers y salas de Socket.IO.
+Las consultas lentas pueden resolverse en un pool acotado de workers
+(get_async) para que ningún handler quede bloqueado esperando una herramienta.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from metrics import REGISTRY
+from scheduler import AdaptiveScheduler
+
+
+# Edad máxima (segundos) de cada instantánea antes de volver a consultar
+DEFAULT_MAX_AGES = {
+    'wifi': 1.0,
+    'bluetooth': 5.0,
+    'channel': 5.0,
+    'networks': 10.0,
+    'interfaces': 30.0,
+    'system': 2.0
+}
+
+
+STREAM_READ_SECONDS = REGISTRY.histogram(
+    'signal_stream_read_seconds', 'Duración de la lectura de cada muestra por stream', ('stream',))
+STREAM_PUBLISH_SECONDS = REGISTRY.histogram(
+    'signal_stream_publish_seconds', 'Duración de la publicación de cada muestra por stream', ('stream',))
+STREAM_ERRORS = REGISTRY.counter(
+    'signal_stream_errors_total', 'Errores en los hilos de muestreo por stream', ('stream',))
+
+
+class SamplingEngine:
+    def __init__(self, max_ages=None, workers=4):
+        self.max_ages = dict(DEFAULT_MAX_AGES)
+        if max_ages:
+            self.max_ages.update(max_ages)
+        self._loaders = {}
+        self._cache = {}
+        self._locks = {}
+        self._streams = {}
+        self._pending = {}
+        self._guard = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='sampler')
+
+    # ===== Instantáneas =====
+
+    def register(self, key, loader, max_age=None):
+        """Registra la función que produce la instantánea `key`"""
+        self._loaders[key] = loader
+        self._locks[key] = threading.Lock()
+        if max_age is not None:
+            self.max_ages[key] = max_age
+
+    def get(self, key, max_age=None):
+        """Retorna la instantánea si es reciente; si no, la refresca una sola vez"""
+        if max_age is None:
+            max_age = self.max_ages.get(key, 1.0)
+
+        cached = self._cache.get(key)
+        if cached and time.monotonic() - cached[1] <= max_age:
+            return cached[0]
+
+        # Single-flight: si otro hilo ya está consultando, esperamos su resultado
+        with self._locks[key]:
+            cached = self._cache.get(key)
+            if cached and time.monotonic() - cached[1] <= max_age:
+                return cached[0]
+            return self._refresh(key)
+
+    def get_async(self, key, callback, on_error=None, max_age=None):
+        """
+        Entrega la instantánea a `callback` sin bloquear al llamador.
+        Si está fresca se entrega de inmediato; si no, se refresca en el pool.
+        Varias peticiones simultáneas de la misma clave comparten una sola
+        consulta, así que el trabajo encolado está acotado por el número de claves.
+        """
+        if max_age is None:
+            max_age = self.max_ages.get(key, 1.0)
+
+        cached = self._cache.get(key)
+        if cached and time.monotonic() - cached[1] <= max_age:
+            callback(cached[0])
+            return
+
+        with self._guard:
+            future = self._pending.get(key)
+            if future is None:
+                future = self._executor.submit(self.get, key, max_age)
+                self._pending[key] = future
+                future.add_done_callback(lambda f, key=key: self._pending.pop(key, None))
+
+        def deliver(f):
+            try:
+                value = f.result()
+            except Exception as e:
+                print(f"Error consultando {key}: {e}")
+                if on_error:
+                    on_error(e)
+                return
+            callback(value)
+
+        future.add_done_callback(deliver)
+
+    def submit(self, fn, *args):
+        """Ejecuta una tarea bloqueante arbitraria en el pool de workers"""
+        return self._executor.submit(fn, *args)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+    def peek(self, key):
+        """Retorna (valor, edad) sin invocar ninguna herramienta"""
+        cached = self._cache.get(key)
+        if not cached:
+            return None, None
+        return cached[0], time.monotonic() - cached[1]
+
+    def _refresh(self, key):
+        value = self._loaders[key]()
+        self._cache[key] = (value, time.monotonic())
+        return value
+
+    # ===== Streams con suscriptores =====
+
+    def add_stream(self, key, publish, on_error=None, default_interval=1.0,
+                   observe=None, adaptive=False):
+        """
+        Declara un stream periódico que publica cada lectura de `key`.
+        `observe` extrae el valor numérico que usa el planificador adaptativo.
+        """
+        self._streams[key] = {
+            'publish': publish,
+            'on_error': on_error,
+            'default_interval': default_interval,
+            'observe': observe,
+            'scheduler': AdaptiveScheduler(default_interval, adaptive=adaptive),
+            'subscribers': {},
+            'thread': None
+        }
+
+    def subscribe(self, key, sid, interval=None):
+        """Suscribe un cliente; retorna True si el hilo de muestreo arrancó"""
+        stream = self._streams[key]
+        with self._guard:
+            stream['subscribers'][sid] = interval or stream['default_interval']
+            if stream['thread'] is None or not stream['thread'].is_alive():
+                stream['thread'] = threading.Thread(
+                    target=self._stream_loop, args=(key,), daemon=True
+                )
+                stream['thread'].start()
+                return True
+        return False
+
+    def unsubscribe(self, key, sid):
+        """Quita un cliente; el hilo se detiene solo cuando no quedan suscriptores"""
+        with self._guard:
+            self._streams[key]['subscribers'].pop(sid, None)
+
+    def unsubscribe_all(self, sid):
+        for key in self._streams:
+            self.unsubscribe(key, sid)
+
+    def is_running(self, key):
+        stream = self._streams[key]
+        return bool(stream['subscribers']) and stream['thread'] is not None \
+            and stream['thread'].is_alive()
+
+    def subscribers(self, key):
+        return len(self._streams[key]['subscribers'])
+
+    def stream_stats(self):
+        """Período efectivo, tasa y plazos perdidos de cada stream"""
+        stats = {}
+        for key, stream in self._streams.items():
+            stats[key] = dict(stream['scheduler'].stats(), running=self.is_running(key),
+                              subscribers=len(stream['subscribers']))
+        return stats
+
+    def _stream_loop(self, key):
+        stream = self._streams[key]
+        scheduler = stream['scheduler']
+        scheduler.reset()
+        read_seconds = STREAM_READ_SECONDS.labels(key)
+        publish_seconds = STREAM_PUBLISH_SECONDS.labels(key)
+        while True:
+            with self._guard:
+                if not stream['subscribers']:
+                    stream['thread'] = None
+                    return
+                # El cliente más exigente define el ritmo de muestreo
+                interval = min(stream['subscribers'].values())
+            if interval != scheduler.base_interval:
+                scheduler.set_interval(interval)
+
+            try:
+                start = time.perf_counter()
+                with self._locks[key]:
+                    value = self._refresh(key)
+                read = time.perf_counter()
+                stream['publish'](value)
+                read_seconds.observe(read - start)
+                publish_seconds.observe(time.perf_counter() - read)
+                if stream['observe']:
+                    scheduler.observe(stream['observe'](value))
+            except Exception as e:
+                STREAM_ERRORS.labels(key).inc()
+                print(f"Error en stream {key}: {e}")
+                if stream['on_error']:
+                    stream['on_error'](e)
+
+            # Plazo absoluto: la duración de la lectura no se acumula
+            scheduler.sleep()
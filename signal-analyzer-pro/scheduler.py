@@ -0,0 +1,134 @@
+"""
+Signal Analyzer Pro - Planificador de muestreo adaptativo
+Plazos sobre el reloj monótono: cada muestra se agenda en t0 + k·período, así
+el tiempo que tarda la lectura no se acumula como deriva. Si una lectura se
+come uno o más plazos, se cuentan como perdidos y se salta al siguiente sin
+ráfagas de recuperación.
+
+En modo adaptativo el período se mueve entre `min_interval` y `max_interval`
+según la actividad de la señal: EWMA de la tasa de cambio (dB/s) y de la
+varianza. Durante un walk-test se muestrea más rápido; con la señal plana el
+período crece de a poco y baja el uso de CPU de las sondas siempre encendidas.
+"""
+import math
+import threading
+import time
+
+
+class AdaptiveScheduler:
+    def __init__(self, interval, adaptive=False, min_interval=None, max_interval=None,
+                 change_threshold=3.0, variance_threshold=4.0, alpha=0.2,
+                 speedup=0.5, backoff=1.1):
+        self.adaptive = adaptive
+        self.change_threshold = change_threshold      # dB/s
+        self.variance_threshold = variance_threshold  # dB²
+        self.alpha = alpha
+        self.speedup = speedup
+        self.backoff = backoff
+        self._lock = threading.Lock()
+        self._bounds = (min_interval, max_interval)
+        self.set_interval(interval)
+        self.reset()
+
+    def set_interval(self, interval):
+        """Período pedido; los límites adaptativos por defecto son /4 y x4"""
+        interval = float(interval)
+        min_interval, max_interval = self._bounds
+        with self._lock:
+            self.base_interval = interval
+            self.min_interval = min_interval or max(0.02, interval / 4)
+            self.max_interval = max_interval or interval * 4
+            if not self.adaptive:
+                self.interval = interval
+            else:
+                self.interval = min(max(getattr(self, 'interval', interval), self.min_interval),
+                                    self.max_interval)
+
+    def reset(self):
+        with self._lock:
+            self._deadline = None
+            self._last_value = None
+            self._last_time = None
+            self._mean = None
+            self._variance = 0.0
+            self._change = 0.0
+            self.ticks = 0
+            self.missed = 0
+            self.started = time.monotonic()
+
+    # ===== Plazos =====
+
+    def wait_time(self, now=None):
+        """
+        Segundos hasta el próximo plazo (0 si ya venció); avanza el plazo. Se
+        llama después de cada lectura: la primera fija t0 = ahora y espera un
+        período completo, así la segunda muestra no sale pegada a la primera.
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self.ticks += 1
+            if self._deadline is None:
+                self._deadline = now + self.interval
+                return self.interval
+            self._deadline += self.interval
+            if now > self._deadline + self.interval:
+                # Plazos perdidos: contar y realinear sin ráfaga
+                skipped = int((now - self._deadline) // self.interval)
+                self.missed += skipped
+                self._deadline += skipped * self.interval
+            return max(0.0, self._deadline - now)
+
+    def sleep(self, stop=None):
+        """Duerme hasta el próximo plazo; con `stop` (Event) se puede interrumpir"""
+        delay = self.wait_time()
+        if stop is not None:
+            return stop.wait(delay)
+        time.sleep(delay)
+        return False
+
+    # ===== Adaptación =====
+
+    def observe(self, value, now=None):
+        """Registra una lectura y ajusta el período si el modo adaptativo está activo"""
+        if value is None:
+            return self.interval
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if self._mean is None:
+                self._mean = float(value)
+            else:
+                delta = value - self._mean
+                self._mean += self.alpha * delta
+                self._variance = (1 - self.alpha) * (self._variance + self.alpha * delta * delta)
+            if self._last_value is not None and now > self._last_time:
+                rate = abs(value - self._last_value) / (now - self._last_time)
+                self._change += self.alpha * (rate - self._change)
+            self._last_value, self._last_time = value, now
+
+            if self.adaptive:
+                activity = self.activity()
+                if activity > 1.0:
+                    self.interval = max(self.min_interval, self.interval * self.speedup)
+                elif activity < 0.25:
+                    self.interval = min(self.max_interval, self.interval * self.backoff)
+            return self.interval
+
+    def activity(self):
+        """>1: señal cambiando (acelerar); <0.25: señal plana (espaciar)"""
+        return max(self._change / self.change_threshold,
+                   self._variance / self.variance_threshold)
+
+    def stats(self):
+        with self._lock:
+            elapsed = time.monotonic() - self.started
+            return {
+                'adaptive': self.adaptive,
+                'interval': round(self.interval, 4),
+                'base_interval': self.base_interval,
+                'rate_hz': round(1.0 / self.interval, 3),
+                'observed_hz': round(self.ticks / elapsed, 3) if elapsed > 0 else 0.0,
+                'ticks': self.ticks,
+                'missed': self.missed,
+                'change_db_s': round(self._change, 3),
+                'std_db': round(math.sqrt(self._variance), 3)
+            }
@@ -2,8 +2,20 @@
 Signal Analyzer Pro - Backend Server MEJORADO v2.0
 Servidor Flask con WebSockets optimizado y nuevas características
 """
-from flask import Flask, render_template, send_from_directory, jsonify, request
-from flask_socketio import SocketIO, emit
+import os
+
+# Modo de ejecución: threading (por defecto), eventlet o gevent.
+# El monkey patching debe hacerse antes de importar cualquier otro módulo.
+ASYNC_MODE = os.environ.get('SIGNAL_ASYNC_MODE', 'threading')
+if ASYNC_MODE == 'eventlet':
+    import eventlet
+    eventlet.monkey_patch()
+elif ASYNC_MODE == 'gevent':
+    from gevent import monkey
+    monkey.patch_all()
+
+from flask import Flask, render_template, send_from_directory, send_file, jsonify, request, Response, stream_with_context
+from flask_socketio import SocketIO, emit, join_room, leave_room
 from flask_cors import CORS
 import subprocess
 import re
@@ -12,27 +24,63 @@ import threading
 import time
 from datetime import datetime
 import json
+import atexit
 import psutil
-from collections import deque
 import statistics
 
+from sampler import SamplingEngine
+from linux_backend import LinuxWirelessBackend
+import parsers
+from store import SampleStore, TIERS
+from stats import RollingStats
+from ringbuffer import SampleRingBuffer
+from emitter import BatchEmitter, EMIT_LATENCY
+from bluetooth import BluetoothProber
+from heatmap import HeatmapService
+import coverage
+import export
+from reports import ReportManager
+from ingest import IngestHub, decode_batch
+import sources
+from delta import SnapshotDiff, device_key, flatten_networks
+from metrics import REGISTRY, SamplingProfiler
+from spectrum import SpectrumAnalyzer
+import downsample
+from alerts import AlertEngine
+
 app = Flask(__name__, static_folder='static', template_folder='templates')
 app.config['SECRET_KEY'] = 'signal_analyzer_secret_key_2024'
 CORS(app)
-# DESPUÉS - Modo threading (NO requiere eventlet):
-socketio = SocketIO(app, cors_allowed_origins="*", ping_timeout=60, ping_interval=25)
+socketio = SocketIO(app, cors_allowed_origins="*", ping_timeout=60, ping_interval=25,
+                    async_mode=ASYNC_MODE)
 
 # Variables globales mejoradas
-wifi_monitoring = False
-bt_monitoring = False
-wifi_thread = None
-bt_thread = None
 sistema = platform.system()
 encoding_cache = None
 
 # Historiales mejorados con límite
-wifi_history = deque(maxlen=1000)  # Últimas 1000 mediciones
-bt_history = deque(maxlen=500)
+# Vista en vivo: buffer columnar NumPy (~28 bytes por muestra)
+wifi_history = SampleRingBuffer(capacity=int(os.environ.get('SIGNAL_BUFFER_SIZE', 100000)))
+wifi_stats = RollingStats(window=1000)  # Se actualiza una vez por muestra
+
+# Almacén persistente (sobrevive reinicios; agregados de 1s/1m/1h)
+STORE_PATH = os.environ.get(
+    'SIGNAL_DB', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'signal_history.db')
+)
+store = SampleStore(STORE_PATH)
+atexit.register(store.close)
+
+# Mapas de calor interpolados en el servidor (caché por conjunto de puntos)
+heatmaps = HeatmapService()
+
+# Reportes PDF (pool de procesos, figuras cacheadas por rango de datos)
+reports = ReportManager(store, os.path.join(os.path.dirname(STORE_PATH), 'reports'),
+                        workers=int(os.environ.get('SIGNAL_REPORT_WORKERS', 2)))
+atexit.register(reports.shutdown)
+
+# Ingesta de sondas remotas (collector.py); token opcional compartido
+ingest_hub = IngestHub(store)
+INGEST_TOKEN = os.environ.get('SIGNAL_INGEST_TOKEN')
 network_stats = {
     'packets_sent': 0,
     'packets_received': 0,
@@ -40,13 +88,58 @@ network_stats = {
     'drops': 0
 }
 
+# ===== Métricas =====
+TOOL_SECONDS = REGISTRY.histogram(
+    'signal_tool_seconds', 'Duración de las herramientas externas', ('tool',))
+TOOL_ERRORS = REGISTRY.counter(
+    'signal_tool_errors_total', 'Herramientas externas que fallaron o expiraron', ('tool',))
+PARSE_SECONDS = REGISTRY.histogram(
+    'signal_parse_seconds', 'Duración de la decodificación y el parseo de salidas', ('parser',))
+JSON_LATENCY = EMIT_LATENCY.labels('json')
+ROOM_EMITS = REGISTRY.counter(
+    'signal_room_emits_total', 'Eventos emitidos a cada sala', ('room', 'event'))
+WIFI_READ_FAILURES = REGISTRY.counter(
+    'signal_wifi_read_failures_total', 'Lecturas WiFi sin RSSI')
+
 class SignalMonitor:
     def __init__(self):
         self.sistema = platform.system()
         self.encoding_cache = None
         self.last_wifi_data = None
         self.wifi_errors = 0
+        # Backend Linux: 'auto' (procfs con respaldo en iwconfig/nmcli),
+        # 'procfs' (solo en proceso) o 'iwconfig' (solo herramientas)
+        self.linux_backend = os.environ.get('SIGNAL_LINUX_BACKEND', 'auto')
+        self._native_backend = None
+        self._bt_prober = None
         
+    def _run_tool(self, args, timeout):
+        """Ejecuta una herramienta una sola vez y decodifica su salida en memoria"""
+        tool = os.path.basename(args[0])
+        start = time.perf_counter()
+        try:
+            raw = subprocess.check_output(args, stderr=subprocess.DEVNULL, timeout=timeout)
+        except (OSError, subprocess.SubprocessError):
+            TOOL_ERRORS.labels(tool).inc()
+            raise
+        finally:
+            TOOL_SECONDS.labels(tool).observe(time.perf_counter() - start)
+        start = time.perf_counter()
+        text, encoding = parsers.decode_output(raw, self.encoding_cache)
+        PARSE_SECONDS.labels('decode_output').observe(time.perf_counter() - start)
+        if encoding:
+            self.encoding_cache = encoding
+        return text
+    
+    @staticmethod
+    def _parse(parser, text):
+        """Aplica un parser de parsers.py midiendo su duración"""
+        start = time.perf_counter()
+        try:
+            return parser(text)
+        finally:
+            PARSE_SECONDS.labels(parser.__name__).observe(time.perf_counter() - start)
+    
     # ===== NUEVAS FUNCIONALIDADES =====
     
     def get_network_interfaces(self):
@@ -84,41 +177,20 @@ class SignalMonitor:
         """Obtiene información detallada del canal WiFi"""
         try:
             if self.sistema == "Windows":
-                result = subprocess.check_output(
-                    ['netsh', 'wlan', 'show', 'interfaces'],
-                    encoding=self.encoding_cache or 'utf-8',
-                    stderr=subprocess.DEVNULL,
-                    timeout=1
+                info = self._parse(parsers.parse_netsh_interfaces,
+                    self._run_tool(['netsh', 'wlan', 'show', 'interfaces'], timeout=1)
                 )
-                channel = None
-                band = None
-                frequency = None
-                
-                for line in result.split('\n'):
-                    line = line.strip()
-                    if 'Canal' in line or 'Channel' in line:
-                        try:
-                            channel = int(re.search(r'\d+', line.split(':')[1]).group())
-                        except:
-                            pass
-                    if 'Radio type' in line or 'Tipo de radio' in line:
-                        band = line.split(':')[1].strip()
-                    if 'Frequency' in line or 'Frecuencia' in line:
-                        try:
-                            frequency = float(re.search(r'[\d.]+', line.split(':')[1]).group())
-                        except:
-                            pass
-                
+                channel = info.get('channel')
                 return {
                     'channel': channel,
-                    'band': band,
-                    'frequency': frequency,
+                    'band': info.get('radio_type') or info.get('band'),
+                    'frequency': info.get('frequency'),
                     'width': self._get_channel_width(channel)
                 }
         except Exception as e:
             print(f"Error obteniendo info de canal: {e}")
             return None
-    
+
     def _get_channel_width(self, channel):
         """Determina el ancho de banda del canal"""
         if channel:
@@ -131,64 +203,16 @@ class SignalMonitor:
     def scan_wifi_networks(self):
         """Escanea todas las redes WiFi disponibles"""
         try:
-            networks = []
             if self.sistema == "Windows":
-                result = subprocess.check_output(
-                    ['netsh', 'wlan', 'show', 'networks', 'mode=bssid'],
-                    encoding=self.encoding_cache or 'utf-8',
-                    stderr=subprocess.DEVNULL,
-                    timeout=3
+                return self._parse(parsers.parse_netsh_networks,
+                    self._run_tool(['netsh', 'wlan', 'show', 'networks', 'mode=bssid'], timeout=3)
                 )
-                current_network = {}
-                for line in result.split('\n'):
-                    line = line.strip()
-                    if 'SSID' in line and 'BSSID' not in line:
-                        if current_network:
-                            networks.append(current_network)
-                        ssid = line.split(':', 1)[1].strip()
-                        current_network = {'ssid': ssid, 'bssids': []}
-                    elif 'BSSID' in line:
-                        bssid = line.split(':', 1)[1].strip()
-                        current_network['bssids'].append({'mac': bssid})
-                    elif 'Señal' in line or 'Signal' in line:
-                        try:
-                            signal = int(re.search(r'\d+', line).group())
-                            if current_network['bssids']:
-                                current_network['bssids'][-1]['signal'] = signal
-                        except:
-                            pass
-                    elif 'Canal' in line or 'Channel' in line:
-                        try:
-                            channel = int(re.search(r'\d+', line.split(':')[1]).group())
-                            if current_network['bssids']:
-                                current_network['bssids'][-1]['channel'] = channel
-                        except:
-                            pass
-                
-                if current_network:
-                    networks.append(current_network)
-                    
             elif self.sistema == "Linux":
-                result = subprocess.check_output(
-                    ['nmcli', '-t', '-f', 'SSID,BSSID,CHAN,SIGNAL', 'dev', 'wifi'],
-                    encoding='utf-8',
-                    stderr=subprocess.DEVNULL,
-                    timeout=3
+                return self._parse(parsers.parse_nmcli_networks,
+                    self._run_tool(['nmcli', '-t', '-f', 'SSID,BSSID,CHAN,SIGNAL', 'dev', 'wifi'],
+                                   timeout=3)
                 )
-                for line in result.split('\n'):
-                    if line:
-                        parts = line.split(':')
-                        if len(parts) >= 4:
-                            networks.append({
-                                'ssid': parts[0],
-                                'bssids': [{
-                                    'mac': parts[1],
-                                    'channel': int(parts[2]) if parts[2] else 0,
-                                    'signal': int(parts[3]) if parts[3] else -100
-                                }]
-                            })
-            
-            return networks
+            return []
         except Exception as e:
             print(f"Error escaneando redes: {e}")
             return []
@@ -230,119 +254,49 @@ class SignalMonitor:
             return None, None, None
 
     def _get_wifi_windows(self):
-        """WiFi para Windows - OPTIMIZADO"""
+        """WiFi para Windows - un solo proceso, decodificación en memoria"""
         try:
-            if self.encoding_cache:
-                resultado = subprocess.check_output(
-                    ['netsh', 'wlan', 'show', 'interfaces'],
-                    encoding=self.encoding_cache,
-                    stderr=subprocess.DEVNULL,
-                    timeout=0.5
-                )
-            else:
-                for enc in ['utf-8', 'cp1252', 'latin-1']:
-                    try:
-                        resultado = subprocess.check_output(
-                            ['netsh', 'wlan', 'show', 'interfaces'],
-                            encoding=enc,
-                            stderr=subprocess.DEVNULL,
-                            timeout=0.5
-                        )
-                        self.encoding_cache = enc
-                        break
-                    except:
-                        continue
-                else:
-                    return None, None, None
-
-            rssi = None
-            ssid = None
-            channel = None
-            
-            for linea in resultado.split('\n'):
-                linea = linea.strip()
-                
-                if not ssid and 'SSID' in linea and 'BSSID' not in linea:
-                    if ':' in linea:
-                        ssid = linea.split(':', 1)[1].strip()
-                
-                if not rssi and ('rssi' in linea.lower() or 'señal' in linea.lower() or 'signal' in linea.lower()):
-                    if ':' in linea:
-                        valor = linea.split(':', 1)[1].strip()
-                        if '%' in valor:
-                            try:
-                                porc = int(re.search(r'(\d+)', valor).group(1))
-                                rssi = int((porc / 2) - 100)
-                            except:
-                                pass
-                        else:
-                            try:
-                                rssi = int(re.search(r'-?\d+', valor).group())
-                            except:
-                                pass
-                
-                if not channel and ('channel' in linea.lower() or 'canal' in linea.lower()):
-                    if ':' in linea:
-                        try:
-                            channel = int(re.search(r'\d+', linea.split(':', 1)[1]).group())
-                        except:
-                            pass
-                
-                if rssi and ssid:
-                    break
-            
-            return rssi, ssid, channel
+            info = self._parse(parsers.parse_netsh_interfaces,
+                self._run_tool(['netsh', 'wlan', 'show', 'interfaces'], timeout=0.5)
+            )
+            return info.get('rssi'), info.get('ssid'), info.get('channel')
         except Exception as e:
             print(f"Error Windows WiFi: {e}")
             return None, None, None
 
     def _get_wifi_linux(self):
-        """WiFi para Linux"""
+        """WiFi para Linux según el backend seleccionado"""
+        if self.linux_backend in ('auto', 'procfs'):
+            reading = self._get_wifi_linux_native()
+            if reading[0] is not None or self.linux_backend == 'procfs':
+                return reading
+        return self._get_wifi_linux_tools()
+
+    def _get_wifi_linux_native(self):
+        """WiFi para Linux leyendo /proc/net/wireless y nl80211 en proceso"""
         try:
-            resultado = subprocess.check_output(['iwconfig'],
-                stderr=subprocess.DEVNULL,
-                encoding='utf-8',
-                timeout=0.5)
-            
-            rssi, ssid, channel = None, None, None
-            
-            for linea in resultado.split('\n'):
-                if 'ESSID' in linea:
-                    match = re.search(r'ESSID:"([^"]+)"', linea)
-                    if match:
-                        ssid = match.group(1)
-                
-                if 'Signal level' in linea:
-                    match = re.search(r'Signal level=(-?\d+)', linea)
-                    if match:
-                        rssi = int(match.group(1))
-                
-                if 'Frequency' in linea:
-                    match = re.search(r'Channel (\d+)', linea)
-                    if match:
-                        channel = int(match.group(1))
-            
+            if self._native_backend is None:
+                self._native_backend = LinuxWirelessBackend(
+                    info_fallback=lambda: self._get_wifi_linux_tools()[1:]
+                )
+            return self._native_backend.read()
+        except OSError as e:
+            print(f"Error backend nativo Linux: {e}")
+            return None, None, None
+
+    def _get_wifi_linux_tools(self):
+        """WiFi para Linux con iwconfig/nmcli"""
+        try:
+            rssi, ssid, channel = self._parse(parsers.parse_iwconfig,
+                self._run_tool(['iwconfig'], timeout=0.5)
+            )
             if rssi:
                 return rssi, ssid, channel
             
-            resultado = subprocess.check_output(
-                ['nmcli', '-t', '-f', 'ACTIVE,SSID,SIGNAL,CHAN', 'dev', 'wifi'],
-                encoding='utf-8',
-                stderr=subprocess.DEVNULL,
-                timeout=0.5
+            return self._parse(parsers.parse_nmcli_active,
+                self._run_tool(['nmcli', '-t', '-f', 'ACTIVE,SSID,SIGNAL,CHAN', 'dev', 'wifi'],
+                               timeout=0.5)
             )
-            
-            for linea in resultado.split('\n'):
-                if linea.startswith('yes') or linea.startswith('sí'):
-                    partes = linea.split(':')
-                    if len(partes) >= 3:
-                        ssid = partes[1]
-                        signal = int(partes[2])
-                        rssi = int((signal / 2) - 100)
-                        channel = int(partes[3]) if len(partes) >= 4 else None
-                        return rssi, ssid, channel
-            
-            return None, None, None
         except Exception as e:
             print(f"Error Linux WiFi: {e}")
             return None, None, None
@@ -350,35 +304,14 @@ class SignalMonitor:
     def _get_wifi_macos(self):
         """WiFi para macOS"""
         try:
-            resultado = subprocess.check_output(
+            return self._parse(parsers.parse_airport, self._run_tool(
                 ['/System/Library/PrivateFrameworks/Apple80211.framework/Versions/Current/Resources/airport', '-I'],
-                encoding='utf-8',
-                stderr=subprocess.DEVNULL,
                 timeout=0.5
-            )
-            
-            rssi, ssid, channel = None, None, None
-            
-            for linea in resultado.split('\n'):
-                if 'agrCtlRSSI' in linea:
-                    rssi = int(linea.split(':')[1].strip())
-                if ' SSID' in linea and 'BSSID' not in linea:
-                    ssid = linea.split(':')[1].strip()
-                if 'channel' in linea.lower():
-                    try:
-                        channel = int(re.search(r'\d+', linea.split(':')[1]).group())
-                    except:
-                        pass
-                if rssi and ssid:
-                    break
-            
-            return rssi, ssid, channel
+            ))
         except Exception as e:
             print(f"Error macOS WiFi: {e}")
             return None, None, None
 
-    # ===== Bluetooth Methods =====
-    
     def scan_bluetooth(self):
         """Escanea dispositivos Bluetooth"""
         try:
@@ -395,41 +328,13 @@ class SignalMonitor:
             return []
 
     def _scan_bluetooth_linux(self):
-        """Escaneo Bluetooth en Linux"""
-        devices = []
-        try:
-            resultado = subprocess.check_output(
-                ['hcitool', 'scan', '--flush'],
-                encoding='utf-8',
-                stderr=subprocess.DEVNULL,
-                timeout=5
+        """Escaneo Bluetooth en Linux (sondeos RSSI/nombre en paralelo)"""
+        if self._bt_prober is None:
+            self._bt_prober = BluetoothProber(
+                self._run_tool, workers=int(os.environ.get('SIGNAL_BT_WORKERS', 8))
             )
-            
-            for linea in resultado.split('\n'):
-                if ':' in linea and len(linea.split()) >= 2:
-                    partes = linea.split()
-                    mac = partes[0]
-                    nombre = ' '.join(partes[1:]) if len(partes) > 1 else 'Desconocido'
-                    
-                    try:
-                        rssi_result = subprocess.check_output(
-                            ['hcitool', 'rssi', mac],
-                            encoding='utf-8',
-                            stderr=subprocess.DEVNULL,
-                            timeout=1
-                        )
-                        rssi_match = re.search(r'RSSI return value:\s*(-?\d+)', rssi_result)
-                        rssi = int(rssi_match.group(1)) if rssi_match else -70
-                    except:
-                        rssi = -70
-                    
-                    devices.append({
-                        'mac': mac,
-                        'name': nombre,
-                        'rssi': rssi
-                    })
-            
-            return devices
+        try:
+            return self._bt_prober.scan()
         except subprocess.TimeoutExpired:
             print("Timeout en escaneo Bluetooth")
             return []
@@ -509,6 +414,226 @@ class SignalMonitor:
 # Instancia del monitor
 monitor = SignalMonitor()
 
+# Origen de las lecturas WiFi: sistema operativo o traza reproducida (SIGNAL_SOURCE)
+wifi_source = sources.from_spec(os.environ.get('SIGNAL_SOURCE'), monitor.get_wifi_signal)
+
+# ===== Motor de muestreo compartido =====
+# Edad máxima configurable de la instantánea WiFi (segundos)
+SNAPSHOT_MAX_AGE = float(os.environ.get('SIGNAL_SNAPSHOT_MAX_AGE', 1.0))
+
+engine = SamplingEngine(max_ages={'wifi': SNAPSHOT_MAX_AGE},
+                        workers=int(os.environ.get('SIGNAL_WORKERS', 4)))
+atexit.register(engine.shutdown)
+engine.register('wifi', wifi_source.read)
+engine.register('bluetooth', monitor.scan_bluetooth)
+engine.register('channel', monitor.get_channel_info)
+engine.register('networks', monitor.scan_wifi_networks)
+engine.register('interfaces', monitor.get_network_interfaces)
+# cpu_percent sin intervalo no bloquea: mide desde la llamada anterior
+psutil.cpu_percent(interval=None)
+engine.register('system', lambda: {
+    'cpu_percent': psutil.cpu_percent(interval=None),
+    'memory_percent': psutil.virtual_memory().percent
+})
+
+# Envío por lotes binarios para clientes que lo solicitan (start_wifi {batch: true})
+FLUSH_INTERVAL = float(os.environ.get('SIGNAL_FLUSH_INTERVAL', 0.25))
+batch_emitter = BatchEmitter(socketio, flush_interval=FLUSH_INTERVAL)
+wifi_meta = {'ssid': 'N/A', 'channel': None}
+
+# Espectro del RSSI (Welch, cruces de nivel, fades, autocorrelación) a la sala
+# 'wifi' como máximo cada SIGNAL_SPECTRUM_INTERVAL segundos
+SPECTRUM_INTERVAL = float(os.environ.get('SIGNAL_SPECTRUM_INTERVAL', 0.5))
+spectrum_analyzer = SpectrumAnalyzer(
+    size=int(os.environ.get('SIGNAL_SPECTRUM_SIZE', 128)),
+    segments=int(os.environ.get('SIGNAL_SPECTRUM_SEGMENTS', 8))
+)
+spectrum_lock = threading.Lock()
+spectrum_state = {'version': 0, 'emitted': 0.0}
+
+def publish_spectrum(now, rssi):
+    """Actualiza el analizador y emite un frame si hay segmentos nuevos y pasó el intervalo"""
+    with spectrum_lock:
+        spectrum_analyzer.update(now, rssi)
+        if (spectrum_analyzer.version == spectrum_state['version']
+                or now - spectrum_state['emitted'] < SPECTRUM_INTERVAL):
+            return
+        frame = spectrum_analyzer.frame()
+        spectrum_state.update(version=spectrum_analyzer.version, emitted=now)
+    if frame:
+        socketio.emit('spectrum', frame, to='wifi')
+        ROOM_EMITS.labels('wifi', 'spectrum').inc()
+
+def publish_wifi(reading):
+    """Publica una lectura WiFi: JSON por muestra a 'wifi_json', lotes binarios al emisor"""
+    rssi, ssid, channel = reading
+    if rssi is not None:
+        now = time.time()
+        stats = wifi_stats.update(rssi)
+        wifi_history.append(now, rssi, channel, ssid)
+        store.append_wifi(now, rssi, ssid, channel)
+        batch_emitter.push(now, rssi, channel, stats)
+        publish_spectrum(now, rssi)
+        evaluate_alerts('wifi', 'wifi', ('local',), (now,), (rssi,),
+                        ssid=(ssid,), channel=(channel,))
+        if (ssid or 'N/A') != wifi_meta['ssid']:
+            # El SSID no viaja en el frame binario: se avisa solo cuando cambia
+            wifi_meta.update(ssid=ssid or 'N/A', channel=channel)
+            socketio.emit('wifi_meta', wifi_meta, to='wifi')
+        socketio.emit('wifi_data', {
+            'rssi': rssi,
+            'ssid': ssid or 'N/A',
+            'channel': channel,
+            'timestamp': datetime.fromtimestamp(now).isoformat(),
+            'quality': get_quality(rssi),
+            'stats': stats
+        }, to='wifi_json')
+        JSON_LATENCY.observe(time.time() - now)
+        ROOM_EMITS.labels('wifi_json', 'wifi_data').inc()
+    else:
+        WIFI_READ_FAILURES.inc()
+        socketio.emit('wifi_error', {
+            'error': 'No se pudo leer WiFi',
+            'timestamp': datetime.now().isoformat()
+        }, to='wifi')
+
+# Deltas de escaneo: variaciones de RSSI menores a SIGNAL_DELTA_TOLERANCE dB
+# no se reenvían (el cliente conserva el último valor enviado)
+DELTA_TOLERANCE = float(os.environ.get('SIGNAL_DELTA_TOLERANCE', 2))
+bt_diff = SnapshotDiff(device_key, ('name', 'rssi'), level_field='rssi',
+                       tolerance=DELTA_TOLERANCE)
+# Escaneos de redes bajo demanda: un estado por cliente
+network_diffs = {}
+network_diffs_lock = threading.Lock()
+
+def publish_bluetooth(devices):
+    """Publica a la sala 'bluetooth' solo los dispositivos agregados, modificados o eliminados"""
+    now = time.time()
+    for device in devices:
+        store.append_bluetooth(now, device['mac'], device.get('name'), device['rssi'])
+    delta = bt_diff.diff(devices)
+    if delta:
+        delta['timestamp'] = datetime.now().isoformat()
+        socketio.emit('bluetooth_delta', delta, to='bluetooth')
+        ROOM_EMITS.labels('bluetooth', 'bluetooth_delta').inc()
+
+# SIGNAL_ADAPTIVE=1: el período WiFi se acorta con la señal cambiando y se
+# alarga con la señal plana (entre /4 y x4 del intervalo pedido)
+ADAPTIVE_SAMPLING = os.environ.get('SIGNAL_ADAPTIVE', '0') == '1'
+engine.add_stream('wifi', publish_wifi,
+                  on_error=lambda e: socketio.emit('wifi_error', {'error': str(e)}, to='wifi'),
+                  default_interval=0.5, observe=lambda reading: reading[0],
+                  adaptive=ADAPTIVE_SAMPLING)
+engine.add_stream('bluetooth', publish_bluetooth,
+                  on_error=lambda e: socketio.emit('bluetooth_error', {'error': str(e)}, to='bluetooth'),
+                  default_interval=2.0)
+
+def publish_probes(changed):
+    """Publica a la sala 'probes' los flujos de sondas que cambiaron, agrupados"""
+    if changed:
+        socketio.emit('probe_update', {
+            'streams': changed,
+            'timestamp': datetime.now().isoformat()
+        }, to='probes')
+        ROOM_EMITS.labels('probes', 'probe_update').inc()
+
+engine.register('probes', ingest_hub.drain_changed)
+engine.add_stream('probes', publish_probes, default_interval=1.0)
+
+# ===== Alertas =====
+
+def load_alert_rules():
+    """Reglas de SIGNAL_ALERT_RULES (archivo JSON) o las de alerts.py"""
+    path = os.environ.get('SIGNAL_ALERT_RULES')
+    if not path:
+        return None
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Error cargando reglas de alerta: {e}")
+        return None
+
+def create_alert_engine():
+    """Motor con las reglas configuradas; si no son válidas, con las de alerts.py"""
+    try:
+        return AlertEngine(load_alert_rules())
+    except ValueError as e:
+        print(f"Error en las reglas de alerta: {e}")
+        return AlertEngine()
+
+alert_engine = create_alert_engine()
+ALERT_EVENTS = REGISTRY.counter(
+    'signal_alert_events_total', 'Transiciones de alertas emitidas', ('rule', 'state'))
+ALERT_EVAL_SECONDS = REGISTRY.histogram(
+    'signal_alert_eval_seconds', 'Duración de la evaluación de reglas por lote', ('origin',))
+
+def evaluate_alerts(origin, room, streams, ts, rssi, **fields):
+    """Evalúa un lote y emite un evento 'alert' por cada transición"""
+    start = time.perf_counter()
+    events = alert_engine.evaluate(streams, ts, rssi, **fields)
+    ALERT_EVAL_SECONDS.labels(origin).observe(time.perf_counter() - start)
+    for event in events:
+        socketio.emit('alert', event, to=room)
+        ALERT_EVENTS.labels(event['rule'], event['state']).inc()
+    if events:
+        ROOM_EMITS.labels(room, 'alert').inc(len(events))
+
+def publish_probe_alerts(rows):
+    """Filas (ts, source, rssi, ssid, channel) de un lote de sonda -> alertas a 'probes'"""
+    if rows:
+        ts, sources, rssi, ssids, channels = zip(*rows)
+        evaluate_alerts('probes', 'probes', sources, ts, rssi, ssid=ssids, channel=channels)
+
+ingest_hub.add_listener(publish_probe_alerts)
+
+# ===== Diagnóstico =====
+
+def collect_runtime_metrics():
+    """Métricas que ya se cuentan en otros componentes, leídas al exportar"""
+    streams = engine.stream_stats()
+    clients = batch_emitter.client_info()
+    yield ('signal_stream_missed_deadlines_total', 'counter',
+           'Plazos de muestreo perdidos (lecturas más lentas que el período)',
+           [({'stream': key}, s['missed']) for key, s in streams.items()])
+    yield ('signal_stream_rate_hz', 'gauge', 'Frecuencia efectiva de cada stream',
+           [({'stream': key}, s['observed_hz']) for key, s in streams.items() if s['running']])
+    yield ('signal_stream_subscribers', 'gauge', 'Clientes suscritos a cada stream',
+           [({'stream': key}, s['subscribers']) for key, s in streams.items()])
+    yield ('signal_emit_queue_depth', 'gauge', 'Muestras en cola en el emisor por lotes',
+           [({}, sum(c['queued'] for c in clients.values()))])
+    yield ('signal_client_frames_sent_total', 'counter', 'Frames enviados a cada cliente por lotes',
+           [({'sid': sid}, c['sent']) for sid, c in clients.items()])
+    yield ('signal_client_queue_depth', 'gauge', 'Muestras en cola de cada cliente por lotes',
+           [({'sid': sid}, c['queued']) for sid, c in clients.items()])
+    yield ('signal_client_in_flight', 'gauge', 'Frames sin ack de cada cliente por lotes',
+           [({'sid': sid}, c['in_flight']) for sid, c in clients.items()])
+    yield ('signal_store_queue_depth', 'gauge', 'Escrituras pendientes del almacén',
+           [({}, store.pending())])
+    yield ('signal_store_written_total', 'counter', 'Filas escritas en el almacén',
+           [({}, store.written)])
+    yield ('signal_wifi_errors_total', 'counter', 'Excepciones al leer WiFi del sistema',
+           [({}, monitor.wifi_errors)])
+    yield ('signal_ingest_batches_total', 'counter', 'Lotes de sondas recibidos',
+           [({'result': 'accepted'}, ingest_hub.accepted),
+            ({'result': 'duplicate'}, ingest_hub.duplicates)])
+
+REGISTRY.add_collector(collect_runtime_metrics)
+
+def publish_diagnostics(snapshot):
+    """Publica las métricas a la sala 'diagnostics' (solo con suscriptores)"""
+    socketio.emit('diagnostics', {
+        'metrics': snapshot,
+        'timestamp': datetime.now().isoformat()
+    }, to='diagnostics')
+
+engine.register('diagnostics', REGISTRY.snapshot)
+engine.add_stream('diagnostics', publish_diagnostics, default_interval=2.0)
+
+# SIGNAL_PROFILING=1 habilita /debug/profile (pilas de todos los hilos en formato folded)
+PROFILING = os.environ.get('SIGNAL_PROFILING', '0') == '1'
+profiler = SamplingProfiler()
+
 # ===== WebSocket Handlers =====
 
 @socketio.on('connect')
@@ -519,120 +644,166 @@ def handle_connect():
         'connected': True,
         'sistema': sistema,
         'timestamp': datetime.now().isoformat(),
-        'interfaces': monitor.get_network_interfaces()
+        'interfaces': engine.get('interfaces')
     })
 
 @socketio.on('disconnect')
 def handle_disconnect():
     """Cliente desconectado"""
+    engine.unsubscribe_all(request.sid)
+    batch_emitter.unregister(request.sid)
+    with network_diffs_lock:
+        network_diffs.pop(request.sid, None)
     print('Cliente desconectado')
 
 @socketio.on('start_wifi')
 def handle_start_wifi(data):
-    """Inicia monitoreo WiFi"""
-    global wifi_monitoring, wifi_thread
-    
-    if not wifi_monitoring:
-        wifi_monitoring = True
-        interval = data.get('interval', 0.5)
-        
-        def wifi_monitor_loop():
-            global wifi_monitoring
-            while wifi_monitoring:
-                try:
-                    rssi, ssid, channel = monitor.get_wifi_signal()
-                    
-                    if rssi is not None:
-                        data = {
-                            'rssi': rssi,
-                            'ssid': ssid or 'N/A',
-                            'channel': channel,
-                            'timestamp': datetime.now().isoformat(),
-                            'quality': get_quality(rssi)
-                        }
-                        
-                        wifi_history.append(data)
-                        socketio.emit('wifi_data', data)
-                    else:
-                        socketio.emit('wifi_error', {
-                            'error': 'No se pudo leer WiFi',
-                            'timestamp': datetime.now().isoformat()
-                        })
-                    
-                    time.sleep(interval)
-                except Exception as e:
-                    print(f"Error en loop WiFi: {e}")
-                    socketio.emit('wifi_error', {'error': str(e)})
-                    break
-        
-        wifi_thread = threading.Thread(target=wifi_monitor_loop, daemon=True)
-        wifi_thread.start()
-        emit('wifi_started', {'status': 'success'})
+    """Suscribe al cliente al stream WiFi compartido"""
+    interval = data.get('interval', 0.5)
+    batch = bool(data.get('batch'))
+    if batch:
+        try:
+            batch_emitter.register(request.sid, data.get('flush_interval'))
+        except ValueError as e:
+            emit('wifi_error', {'error': str(e)})
+            return
+    already_running = engine.is_running('wifi')
+    join_room('wifi')
+    if batch:
+        leave_room('wifi_json')
+        emit('wifi_meta', wifi_meta)
     else:
-        emit('wifi_started', {'status': 'already_running'})
+        batch_emitter.unregister(request.sid)
+        join_room('wifi_json')
+    engine.subscribe('wifi', request.sid, interval)
+    # El cliente siempre queda suscrito; el estado indica si el muestreo ya existía
+    emit('wifi_started', {
+        'status': 'success',
+        'shared': already_running,
+        'subscribers': engine.subscribers('wifi'),
+        'batch': batch
+    })
+    with spectrum_lock:
+        frame = spectrum_analyzer.frame()
+    if frame:
+        emit('spectrum', frame)
 
 @socketio.on('stop_wifi')
 def handle_stop_wifi():
-    """Detiene monitoreo WiFi"""
-    global wifi_monitoring
-    wifi_monitoring = False
+    """Desuscribe al cliente del monitoreo WiFi"""
+    leave_room('wifi')
+    leave_room('wifi_json')
+    batch_emitter.unregister(request.sid)
+    engine.unsubscribe('wifi', request.sid)
+    if not engine.is_running('wifi'):
+        # Un hueco en el muestreo rompería la ventana del espectro: se empieza de cero
+        with spectrum_lock:
+            spectrum_analyzer.reset()
+            spectrum_state.update(version=0, emitted=0.0)
+        alert_engine.forget('local')
     emit('wifi_stopped', {'status': 'success'})
 
 @socketio.on('start_bluetooth')
 def handle_start_bluetooth(data):
-    """Inicia escaneo Bluetooth"""
-    global bt_monitoring, bt_thread
-    
-    if not bt_monitoring:
-        bt_monitoring = True
-        interval = data.get('interval', 2.0)
-        
-        def bt_monitor_loop():
-            global bt_monitoring
-            while bt_monitoring:
-                try:
-                    devices = monitor.scan_bluetooth()
-                    socketio.emit('bluetooth_data', {
-                        'devices': devices,
-                        'timestamp': datetime.now().isoformat(),
-                        'count': len(devices)
-                    })
-                    time.sleep(interval)
-                except Exception as e:
-                    print(f"Error en loop Bluetooth: {e}")
-                    socketio.emit('bluetooth_error', {'error': str(e)})
-                    break
-        
-        bt_thread = threading.Thread(target=bt_monitor_loop, daemon=True)
-        bt_thread.start()
-        emit('bluetooth_started', {'status': 'success'})
-    else:
-        emit('bluetooth_started', {'status': 'already_running'})
+    """Suscribe al cliente al escaneo Bluetooth compartido"""
+    interval = data.get('interval', 2.0)
+    already_running = engine.is_running('bluetooth')
+    join_room('bluetooth')
+    engine.subscribe('bluetooth', request.sid, interval)
+    emit('bluetooth_started', {
+        'status': 'success',
+        'shared': already_running,
+        'subscribers': engine.subscribers('bluetooth')
+    })
+    # Los deltas siguientes se aplican sobre esta instantánea
+    emit('bluetooth_delta', bt_diff.snapshot())
+
+@socketio.on('bluetooth_resync')
+def handle_bluetooth_resync():
+    """El cliente perdió un delta: instantánea completa con el seq vigente"""
+    emit('bluetooth_delta', bt_diff.snapshot())
 
 @socketio.on('stop_bluetooth')
 def handle_stop_bluetooth():
-    """Detiene escaneo Bluetooth"""
-    global bt_monitoring
-    bt_monitoring = False
+    """Desuscribe al cliente del escaneo Bluetooth"""
+    leave_room('bluetooth')
+    engine.unsubscribe('bluetooth', request.sid)
+    if not engine.is_running('bluetooth'):
+        # Sin suscriptores el escaneo se detiene: el próximo arranca de cero
+        bt_diff.reset()
     emit('bluetooth_stopped', {'status': 'success'})
 
+@socketio.on('start_probes')
+def handle_start_probes(data=None):
+    """Suscribe al cliente a las actualizaciones agrupadas de las sondas remotas"""
+    join_room('probes')
+    engine.subscribe('probes', request.sid, (data or {}).get('interval'))
+    emit('probe_snapshot', {'streams': ingest_hub.streams()})
+
+@socketio.on('stop_probes')
+def handle_stop_probes():
+    leave_room('probes')
+    engine.unsubscribe('probes', request.sid)
+
+@socketio.on('start_diagnostics')
+def handle_start_diagnostics(data=None):
+    """Suscribe al cliente al stream de métricas internas"""
+    join_room('diagnostics')
+    engine.subscribe('diagnostics', request.sid, (data or {}).get('interval'))
+    emit('diagnostics', {'metrics': REGISTRY.snapshot(), 'timestamp': datetime.now().isoformat()})
+
+@socketio.on('stop_diagnostics')
+def handle_stop_diagnostics():
+    leave_room('diagnostics')
+    engine.unsubscribe('diagnostics', request.sid)
+
 # ===== NUEVOS HANDLERS =====
 
+def emit_later(key, sid, build, error_event=None):
+    """Resuelve `key` en el pool y emite el resultado al cliente cuando esté listo"""
+    def deliver(value):
+        event, payload = build(value)
+        socketio.emit(event, payload, to=sid)
+
+    def fail(e):
+        if error_event:
+            socketio.emit(error_event, {'error': str(e)}, to=sid)
+
+    engine.get_async(key, deliver, on_error=fail)
+
 @socketio.on('scan_networks')
-def handle_scan_networks():
-    """Escanea todas las redes WiFi disponibles"""
-    networks = monitor.scan_wifi_networks()
-    emit('networks_found', {
-        'networks': networks,
-        'count': len(networks),
-        'timestamp': datetime.now().isoformat()
-    })
+def handle_scan_networks(data=None):
+    """
+    Escanea las redes WiFi (responde con networks_found). Si `since` coincide
+    con el seq del último escaneo enviado a este cliente llega solo el delta
+    por BSSID; si no, el estado completo.
+    """
+    sid = request.sid
+    since = (data or {}).get('since')
+    with network_diffs_lock:
+        diff = network_diffs.get(sid)
+        if diff is None:
+            diff = network_diffs[sid] = SnapshotDiff(
+                lambda row: row['bssid'], ('ssid', 'auth', 'channel', 'signal'),
+                level_field='signal', tolerance=DELTA_TOLERANCE)
+
+    def build(networks):
+        in_sync = since is not None and since == diff.seq
+        delta = diff.diff(flatten_networks(networks))
+        if not in_sync:
+            delta = diff.snapshot()
+        elif delta is None:
+            delta = {'seq': diff.seq, 'full': False, 'added': [], 'changed': [],
+                     'removed': [], 'count': len(diff.items)}
+        delta['timestamp'] = datetime.now().isoformat()
+        return 'networks_found', delta
+
+    emit_later('networks', sid, build, error_event='wifi_error')
 
 @socketio.on('get_channel_info')
 def handle_get_channel_info():
-    """Obtiene información del canal actual"""
-    channel_info = monitor.get_channel_info()
-    emit('channel_info', channel_info or {})
+    """Obtiene información del canal actual (responde con channel_info)"""
+    emit_later('channel', request.sid, lambda info: ('channel_info', info or {}))
 
 @socketio.on('get_network_stats')
 def handle_get_network_stats():
@@ -642,12 +813,30 @@ def handle_get_network_stats():
 
 @socketio.on('get_wifi_history')
 def handle_get_wifi_history(data):
-    """Retorna el historial de WiFi"""
-    limit = data.get('limit', 100)
-    history = list(wifi_history)[-limit:]
+    """Retorna el historial de WiFi (la consulta al almacén corre en el pool)"""
+    sid = request.sid
+    future = engine.submit(wifi_history_payload, data)
+
+    def deliver(f):
+        try:
+            socketio.emit('wifi_history', f.result(), to=sid)
+        except Exception as e:
+            print(f"Error consultando historial: {e}")
+            socketio.emit('wifi_error', {'error': str(e)}, to=sid)
+
+    future.add_done_callback(deliver)
+
+def wifi_history_payload(data):
+    if data.get('width'):
+        # Vista de rango largo: serie reducida al ancho del gráfico
+        return dict(downsampled_history(data), request=data.get('request'))
+    history = query_history(data)
     
-    if history:
-        rssi_values = [d['rssi'] for d in history]
+    if not data.get('start') and not data.get('end') and (data.get('source') or 'local') == 'local':
+        # Sin rango: las estadísticas en vivo ya están calculadas (O(1))
+        stats = wifi_stats.snapshot()
+    elif history:
+        rssi_values = [d['rssi'] if 'rssi' in d else d['mean'] for d in history]
         stats = {
             'avg': statistics.mean(rssi_values),
             'min': min(rssi_values),
@@ -657,32 +846,164 @@ def handle_get_wifi_history(data):
     else:
         stats = {'avg': 0, 'min': 0, 'max': 0, 'std': 0}
     
-    emit('wifi_history', {
+    return {
         'history': history,
         'stats': stats
-    })
+    }
 
 @socketio.on('test_wifi')
 def handle_test_wifi():
-    """Prueba la conexión WiFi"""
-    rssi, ssid, channel = monitor.get_wifi_signal()
-    
+    """Prueba la conexión WiFi (responde con wifi_test_result)"""
+    emit_later('wifi', request.sid, wifi_test_result)
+
+def wifi_test_result(reading):
+    rssi, ssid, channel = reading
     if rssi is not None:
-        emit('wifi_test_result', {
+        return 'wifi_test_result', {
             'success': True,
             'rssi': rssi,
             'ssid': ssid,
             'channel': channel,
             'quality': get_quality(rssi)
-        })
-    else:
-        emit('wifi_test_result', {
-            'success': False,
-            'error': 'No se pudo detectar WiFi'
-        })
+        }
+    return 'wifi_test_result', {
+        'success': False,
+        'error': 'No se pudo detectar WiFi'
+    }
+
+@socketio.on('generate_report')
+def handle_generate_report(data):
+    """Genera un reporte PDF en segundo plano; el progreso llega como eventos"""
+    sid = request.sid
+    data = data or {}
+    try:
+        params = {
+            'source': data.get('source') or 'local',
+            'start': parse_time(data.get('start')),
+            'end': parse_time(data.get('end')),
+            'points': [{'x': p['x'], 'y': p['y'], 'rssi': p['rssi']}
+                       for p in data.get('points') or []]
+        }
+    except (ValueError, KeyError, TypeError) as e:
+        emit('report_error', {'error': str(e)})
+        return
+
+    def on_progress(job):
+        if job['status'] == 'ready':
+            socketio.emit('report_ready', {
+                'job_id': job['id'],
+                'url': f"/api/reports/{job['id']}.pdf",
+                'summary': job['summary'],
+                'seconds': job['seconds']
+            }, to=sid)
+        elif job['status'] == 'error':
+            socketio.emit('report_error', {'job_id': job['id'], 'error': job['error']}, to=sid)
+        else:
+            socketio.emit('report_progress', {
+                'job_id': job['id'],
+                'progress': job['progress'],
+                'stage': job['stage']
+            }, to=sid)
+
+    job_id = reports.start(params, on_progress)
+    emit('report_started', {'job_id': job_id})
 
 # ===== Helper Functions =====
 
+def parse_time(value):
+    """Acepta epoch en segundos o fecha ISO; retorna epoch o None"""
+    if value in (None, ''):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return datetime.fromisoformat(str(value)).timestamp()
+
+def query_history(params):
+    """
+    Consulta el historial WiFi del almacén con start/end/tier/limit de una
+    fuente (`source`, por defecto la local; las sondas son "<sonda>/<interfaz>")
+    """
+    source = params.get('source') or 'local'
+    start = parse_time(params.get('start'))
+    end = parse_time(params.get('end'))
+    tier = params.get('tier') or 'raw'
+    limit = params.get('limit')
+    if limit is None and start is None and end is None:
+        limit = 100
+    
+    if source == 'local' and tier == 'raw' and start is None and end is None \
+            and int(limit) <= len(wifi_history):
+        # Últimas N muestras: vista directa del buffer en memoria
+        rows = wifi_history.to_records(int(limit))
+    else:
+        rows = store.query_wifi(start, end, tier=tier, limit=int(limit) if limit else None,
+                                source=source)
+    for row in rows:
+        row['timestamp'] = datetime.fromtimestamp(row['ts']).isoformat()
+        if tier == 'raw':
+            row['ssid'] = row['ssid'] or 'N/A'
+            row['quality'] = get_quality(row['rssi'])
+    return rows
+
+def downsampled_history(params):
+    """
+    Historial reducido a ~`width` puntos (LTTB o min/max por bucket) en
+    [start, end]. Sin rango se usa toda la sesión. La fuente es el buffer en
+    memoria si lo cubre; si no, el nivel del almacén más grueso cuyo bucket
+    no supera un píxel (cada agregado trae su mín/máx, la envolvente se
+    conserva), así las filas leídas quedan acotadas por el ancho y no por el
+    largo del rango.
+    """
+    width = min(max(int(params.get('width')), 3), downsample.MAX_WIDTH)
+    method = params.get('method') or 'lttb'
+    if method not in downsample.METHODS:
+        raise ValueError(f"Método desconocido: {method}")
+    source = params.get('source') or 'local'
+    start = parse_time(params.get('start'))
+    end = parse_time(params.get('end'))
+
+    # Extensión total de la serie (el cliente la usa para el zoom)
+    memory = wifi_history.window()['time']
+    first, last = store.time_range('wifi', source)
+    if len(memory):
+        first = float(memory[0]) if first is None else min(first, float(memory[0]))
+        last = float(memory[-1]) if last is None else max(last, float(memory[-1]))
+    payload = {'method': method, 'width': width, 'ts': [], 'rssi': [],
+               'extent': [first, last], 'tier': None, 'input_count': 0, 'count': 0}
+    if first is None:
+        payload.update(start=start, end=end)
+        return payload
+    start = first if start is None else start
+    end = last if end is None else end
+    payload.update(start=start, end=end)
+
+    low = high = None
+    if source == 'local' and len(memory) and start >= memory[0]:
+        view = wifi_history.since(start, end)
+        ts, values, tier = view['time'], view['rssi'], 'memory'
+    else:
+        pixel = (end - start) / width
+        tier = 'raw'
+        for name, size in sorted(TIERS.items(), key=lambda item: item[1]):
+            if size <= pixel:
+                tier = name
+        columns = store.wifi_arrays(start, end, tier=tier, source=source)
+        if tier == 'raw':
+            ts, values = columns['ts'], columns['rssi']
+        else:
+            ts, values, low, high = columns['ts'], columns['mean'], columns['min'], columns['max']
+
+    reduced = downsample.downsample(ts, values, width, method, start, end, low, high)
+    payload.update(
+        tier=tier,
+        input_count=int(len(ts)),
+        count=int(len(reduced['ts'])),
+        ts=reduced['ts'].tolist(),
+        rssi=[round(value, 2) for value in reduced['rssi'].tolist()]
+    )
+    return payload
+
 def get_quality(rssi):
     """Retorna la calidad de la señal"""
     if rssi >= -30:
@@ -704,21 +1025,217 @@ def index():
 @app.route('/api/system-info')
 def system_info():
     """Información del sistema"""
+    system = engine.get('system')
     return jsonify({
         'sistema': sistema,
-        'interfaces': monitor.get_network_interfaces(),
-        'cpu_percent': psutil.cpu_percent(interval=1),
-        'memory_percent': psutil.virtual_memory().percent,
+        'interfaces': engine.get('interfaces'),
+        'cpu_percent': system['cpu_percent'],
+        'memory_percent': system['memory_percent'],
         'timestamp': datetime.now().isoformat()
     })
 
 @app.route('/api/wifi-history')
 def get_wifi_history_api():
-    """API REST para historial WiFi"""
-    limit = request.args.get('limit', 100, type=int)
-    history = list(wifi_history)[-limit:]
+    """
+    API REST para historial WiFi (?start=&end=&tier=raw|1s|1m|1h&limit=&source=,
+    por defecto la fuente local).
+    Con ?width= retorna la serie reducida para un gráfico de ese ancho
+    (&method=lttb|minmax)
+    """
+    try:
+        if request.args.get('width'):
+            return jsonify(downsampled_history(request.args))
+        history = query_history(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     return jsonify({'history': history, 'count': len(history)})
 
+def heatmap_options(params):
+    """Opciones de kernel/formato comunes a los endpoints de mapa de calor"""
+    return {
+        'kernel': params.get('kernel', 'exp'),
+        'scale': float(params['scale']) if params.get('scale') else None,
+        'power': float(params['power']) if params.get('power') else None,
+        'fmt': params.get('format', 'png')
+    }
+
+def heatmap_response(result, fmt):
+    body, (height, width) = result
+    mimetype = 'image/png' if fmt == 'png' else 'application/octet-stream'
+    response = Response(body, mimetype=mimetype)
+    response.headers['X-Heatmap-Width'] = str(width)
+    response.headers['X-Heatmap-Height'] = str(height)
+    response.headers['Cache-Control'] = 'private, max-age=3600'
+    return response
+
+@app.route('/api/heatmap', methods=['POST'])
+def render_heatmap_api():
+    """Mapa de calor de toda la región: {points, width, height, step, kernel, format}"""
+    data = request.get_json(silent=True) or {}
+    try:
+        options = heatmap_options(data)
+        result = heatmaps.render(
+            data.get('points', []), 0, 0,
+            int(data.get('width', 800)), int(data.get('height', 600)),
+            step=float(data.get('step', 2)), **options
+        )
+    except (ValueError, KeyError, TypeError) as e:
+        return jsonify({'error': str(e)}), 400
+    return heatmap_response(result, options['fmt'])
+
+@app.route('/api/heatmap/sets', methods=['POST'])
+def register_heatmap_points():
+    """Registra un conjunto de puntos y retorna la clave para pedir teselas"""
+    data = request.get_json(silent=True) or {}
+    try:
+        key = heatmaps.register(data.get('points', []))
+    except (ValueError, KeyError, TypeError) as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'key': key})
+
+@app.route('/api/heatmap/<key>/<int:z>/<int:x>/<int:y>')
+def heatmap_tile(key, z, x, y):
+    """Tesela del mapa de calor, z de 0 a heatmap.MAX_ZOOM (?kernel=exp|gaussian|idw&format=png|raw)"""
+    try:
+        options = heatmap_options(request.args)
+        result = heatmaps.tile(key, z, x, y, **options)
+    except KeyError:
+        return jsonify({'error': 'Conjunto de puntos desconocido'}), 404
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return heatmap_response(result, options['fmt'])
+
+@app.route('/api/coverage', methods=['POST'])
+def predict_coverage_api():
+    """Raster de cobertura predicha: {router, walls, points, width, height, step}"""
+    data = request.get_json(silent=True) or {}
+    if not data.get('router'):
+        return jsonify({'error': 'Falta la posición del router'}), 400
+    try:
+        step = max(2, int(data.get('step', 10)))
+        rssi, crossings, model = coverage.predict(
+            data['router'], data.get('walls', []), data.get('points', []),
+            int(data.get('width', 1200)), int(data.get('height', 800)), step
+        )
+    except (ValueError, KeyError, TypeError) as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({
+        'cols': rssi.shape[1],
+        'rows': rssi.shape[0],
+        'step': step,
+        'rssi': rssi.round().astype(int).ravel().tolist(),
+        'walls': crossings.ravel().tolist(),
+        'model': model
+    })
+
+@app.route('/api/export/<kind>.<fmt>')
+def export_history(kind, fmt):
+    """
+    Exporta el historial completo en streaming (sin pasar por el WebSocket):
+    /api/export/wifi.csv|ndjson|parquet|arrow?start=&end=&tier=&source=
+    """
+    if kind not in ('wifi', 'bluetooth') or fmt not in export.FORMATS:
+        return jsonify({'error': 'Exportación no soportada'}), 404
+    if fmt in export.COLUMNAR_FORMATS and not export.columnar_available():
+        return jsonify({'error': 'Instala pyarrow para exportar a Parquet/Arrow'}), 501
+    try:
+        start = parse_time(request.args.get('start'))
+        end = parse_time(request.args.get('end'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    tier = request.args.get('tier', 'raw')
+    if tier != 'raw' and tier not in TIERS:
+        return jsonify({'error': f"Nivel desconocido: {tier}"}), 400
+
+    if kind == 'wifi':
+        chunks = store.iter_wifi(start, end, tier=tier, source=request.args.get('source'))
+        columns = store.columns('wifi', tier)
+    else:
+        chunks = store.iter_bluetooth(start, end, tier=tier, mac=request.args.get('mac'))
+        columns = store.columns('bt', tier)
+
+    filename = f"{kind}_{tier}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{fmt}"
+    # Sin Content-Length: Werkzeug/eventlet envían la respuesta con chunked encoding
+    return Response(
+        stream_with_context(export.stream(chunks, columns, fmt)),
+        mimetype=export.FORMATS[fmt],
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+    )
+
+@app.route('/api/ingest', methods=['POST'])
+def ingest_batch():
+    """Recibe un lote de un colector remoto (ver ingest.py)"""
+    if INGEST_TOKEN and request.headers.get('X-Probe-Token') != INGEST_TOKEN:
+        return jsonify({'error': 'Token de sonda inválido'}), 401
+    try:
+        batch = decode_batch(request.get_data(), request.headers.get('Content-Encoding'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    accepted, duplicate = ingest_hub.ingest(batch)
+    return jsonify({'accepted': accepted, 'duplicate': duplicate})
+
+@app.route('/api/alerts')
+def alerts_state():
+    """Reglas vigentes y alertas de umbral activas en este momento"""
+    return jsonify({'rules': alert_engine.rule_specs(), 'active': alert_engine.active()})
+
+@app.route('/api/alerts/rules', methods=['PUT'])
+def replace_alert_rules():
+    """Reemplaza las reglas (lista JSON, ver alerts.py); el estado de los flujos se reinicia"""
+    rules = request.get_json(silent=True)
+    if not isinstance(rules, list):
+        return jsonify({'error': 'Se esperaba una lista de reglas'}), 400
+    try:
+        alert_engine.set_rules(rules)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'rules': alert_engine.rule_specs()})
+
+@app.route('/api/sampling')
+def sampling_stats():
+    """Período efectivo, tasa y plazos perdidos de cada stream de muestreo"""
+    return jsonify(engine.stream_stats())
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """Métricas en formato de texto de Prometheus"""
+    return Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+@app.route('/debug/profile')
+def profile_endpoint():
+    """
+    Perfil por muestreo de todos los hilos: /debug/profile?seconds=10&hz=100.
+    Responde pilas en formato folded (flamegraph.pl, speedscope).
+    """
+    if not PROFILING:
+        return jsonify({'error': 'Perfilador deshabilitado (SIGNAL_PROFILING=1)'}), 404
+    try:
+        seconds = float(request.args.get('seconds', 10))
+        hz = float(request.args.get('hz', 100))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    folded = profiler.profile(seconds, hz)
+    if folded is None:
+        return jsonify({'error': 'Ya hay una captura en curso'}), 409
+    filename = f"profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}.folded"
+    return Response(folded, mimetype='text/plain',
+                    headers={'Content-Disposition': f'attachment; filename="{filename}"'})
+
+@app.route('/api/probes')
+def list_probes():
+    """Último estado de cada flujo (sonda, interfaz) ingerido"""
+    streams = ingest_hub.streams(request.args.get('probe'))
+    return jsonify({'streams': streams, 'count': len(streams)})
+
+@app.route('/api/reports/<job_id>.pdf')
+def download_report(job_id):
+    """Descarga un reporte ya generado"""
+    path = reports.path(job_id)
+    if not path:
+        return jsonify({'error': 'Reporte no disponible'}), 404
+    return send_file(path, mimetype='application/pdf',
+                     download_name=f'reporte_wifi_{job_id}.pdf')
+
 @app.route('/static/<path:path>')
 def send_static(path):
     """Archivos estáticos"""
@@ -727,26 +1244,33 @@ def send_static(path):
 # ===== Main =====
 
 if __name__ == '__main__':
+    PORT = int(os.environ.get('SIGNAL_PORT', 5000))
     print("=" * 60)
     print("📡 Signal Analyzer Pro - Server MEJORADO v2.0")
     print("=" * 60)
     print(f"Sistema: {sistema}")
-    print(f"Puerto: 5000")
-    print(f"URL: http://localhost:5000")
+    print(f"Modo: {socketio.async_mode}")
+    print(f"Fuente WiFi: {wifi_source.describe()}")
+    print(f"Puerto: {PORT}")
+    print(f"URL: http://localhost:{PORT}")
     print("=" * 60)
     print("\n🚀 Servidor iniciado. Presiona Ctrl+C para detener.\n")
     
     # Verificar capacidades
-    rssi, ssid, channel = monitor.get_wifi_signal()
+    rssi, ssid, channel = engine.get('wifi')
     if rssi:
         print(f"✓ WiFi detectado: {ssid} ({rssi} dBm)")
     else:
         print("⚠ No se detectó WiFi")
     
-    interfaces = monitor.get_network_interfaces()
+    interfaces = engine.get('interfaces')
     if interfaces:
         print(f"✓ Interfaces de red: {', '.join(interfaces)}")
     
     print()
     
-    socketio.run(app, host='0.0.0.0', port=5000, debug=False, allow_unsafe_werkzeug=True)
\ No newline at end of file
+    if socketio.async_mode == 'threading':
+        # Servidor de desarrollo de Werkzeug; para producción usar eventlet o gevent
+        socketio.run(app, host='0.0.0.0', port=PORT, debug=False, allow_unsafe_werkzeug=True)
+    else:
+        socketio.run(app, host='0.0.0.0', port=PORT, debug=False)
\ No newline at end of file
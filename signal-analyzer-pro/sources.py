@@ -0,0 +1,185 @@
+"""
+Signal Analyzer Pro - Fuentes de señal
+Interfaz común para el origen de las lecturas WiFi (rssi, ssid, canal).
+'system' consulta el sistema operativo (SignalMonitor); 'replay' reproduce
+una traza grabada (CSV/NDJSON exportados por la app, el servidor o
+WiFiMonitor) y 'synthetic' una traza generada, a la velocidad pedida: x1 es
+tiempo real, x100 cien veces más rápido y x0 entrega una muestra por lectura.
+Así las pruebas y benchmarks corren en máquinas sin radio.
+
+SIGNAL_SOURCE = system | synthetic[@velocidad] | replay:<ruta>[@velocidad]
+"""
+import bisect
+import csv
+import json
+import math
+import random
+import time
+from datetime import datetime
+
+
+# Nombres de columna aceptados en las trazas (exportaciones de cada herramienta)
+TIME_COLUMNS = ('ts', 'tiempo', 'Tiempo(s)', 'Tiempo_Transcurrido(s)', 'time', 'timestamp', 'Timestamp')
+RSSI_COLUMNS = ('rssi', 'RSSI(dBm)', 'RSSI')
+SSID_COLUMNS = ('ssid', 'SSID')
+CHANNEL_COLUMNS = ('channel', 'Canal', 'canal')
+
+
+class SignalSource:
+    """Origen de lecturas WiFi: read() -> (rssi, ssid, channel)"""
+    name = 'base'
+
+    def read(self):
+        raise NotImplementedError
+
+    def describe(self):
+        return self.name
+
+    def close(self):
+        pass
+
+
+class SystemSource(SignalSource):
+    """Lecturas reales del sistema operativo"""
+    name = 'system'
+
+    def __init__(self, reader):
+        self.reader = reader
+
+    def read(self):
+        return self.reader()
+
+
+class ReplaySource(SignalSource):
+    """
+    Reproduce una traza [(t, rssi, ssid, channel)] con t en segundos.
+    Con speed > 0 cada lectura retorna la muestra vigente en el tiempo de
+    traza transcurrido; con speed == 0 avanza una muestra por lectura.
+    """
+    name = 'replay'
+
+    def __init__(self, trace, speed=1.0, loop=True, label=None):
+        if not trace:
+            raise ValueError('Traza vacía')
+        t0 = trace[0][0]
+        self.times = [row[0] - t0 for row in trace]
+        self.samples = [tuple(row[1:4]) for row in trace]
+        self.speed = float(speed)
+        self.loop = loop
+        self.label = label
+        # Duración de un ciclo: la última muestra dura un período medio más
+        period = self.times[-1] / (len(self.times) - 1) if len(self.times) > 1 else 1.0
+        self.duration = self.times[-1] + period
+        self.reset()
+
+    def __len__(self):
+        return len(self.samples)
+
+    def reset(self):
+        self._start = time.monotonic()
+        self._cursor = 0
+
+    def describe(self):
+        speed = 'máx' if self.speed == 0 else f"x{self.speed:g}"
+        return f"{self.name}:{self.label or len(self)} ({speed})"
+
+    def read(self):
+        if self.speed == 0:
+            i = self._cursor
+            self._cursor += 1
+            if i >= len(self.samples):
+                if not self.loop:
+                    return None, None, None
+                i %= len(self.samples)
+            return self.samples[i]
+
+        t = (time.monotonic() - self._start) * self.speed
+        if t >= self.duration:
+            if not self.loop:
+                return None, None, None
+            t %= self.duration
+        return self.samples[bisect.bisect_right(self.times, t) - 1]
+
+
+# ===== Trazas =====
+
+def _pick(row, names):
+    for name in names:
+        value = row.get(name)
+        if value not in (None, ''):
+            return value
+    return None
+
+
+def _seconds(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return datetime.fromisoformat(str(value)).timestamp()
+
+
+def _row_to_sample(row):
+    rssi = _pick(row, RSSI_COLUMNS)
+    if rssi is None:
+        return None
+    t = _pick(row, TIME_COLUMNS)
+    channel = _pick(row, CHANNEL_COLUMNS)
+    ssid = _pick(row, SSID_COLUMNS)
+    try:
+        channel = int(channel) if channel not in (None, 'N/A') else None
+    except (TypeError, ValueError):
+        channel = None
+    return (_seconds(t) if t is not None else None, int(float(rssi)),
+            ssid if ssid not in (None, 'N/A') else None, channel)
+
+
+def load_trace(path):
+    """Lee una traza CSV o NDJSON; sin columna de tiempo se asume 1 muestra/s"""
+    with open(path, newline='', encoding='utf-8') as f:
+        if path.endswith(('.ndjson', '.jsonl')):
+            rows = (json.loads(line) for line in f if line.strip())
+        else:
+            rows = csv.DictReader(f)
+        samples = [s for s in map(_row_to_sample, rows) if s is not None]
+
+    if any(s[0] is None for s in samples):
+        samples = [(float(i),) + s[1:] for i, s in enumerate(samples)]
+    samples.sort(key=lambda s: s[0])
+    return samples
+
+
+def synthetic_trace(count=36000, hz=10.0, seed=0, ssid='Sintética', channel=6,
+                    base=-60.0, drift=8.0, fading=0.9):
+    """
+    Traza sintética: deriva lenta (persona caminando) más desvanecimiento
+    Rayleigh con correlación AR(1), cuantizada a dBm enteros.
+    """
+    rng = random.Random(seed)
+    trace = []
+    hr, hi = 1.0, 0.0
+    noise = math.sqrt((1 - fading ** 2) / 2)
+    for i in range(count):
+        t = i / hz
+        hr = fading * hr + noise * rng.gauss(0, 1)
+        hi = fading * hi + noise * rng.gauss(0, 1)
+        level = base + drift * math.sin(2 * math.pi * t / 120.0) \
+            + 10 * math.log10(max(hr * hr + hi * hi, 1e-4))
+        trace.append((t, int(round(min(-20.0, max(-100.0, level)))), ssid, channel))
+    return trace
+
+
+def from_spec(spec, system_reader=None):
+    """Construye la fuente descrita por SIGNAL_SOURCE"""
+    spec = (spec or 'system').strip()
+    kind, _, speed = spec.partition('@')
+    speed = float(speed) if speed else 1.0
+    if kind == 'system':
+        if system_reader is None:
+            raise ValueError('La fuente system necesita un lector')
+        return SystemSource(system_reader)
+    if kind == 'synthetic':
+        return ReplaySource(synthetic_trace(), speed=speed, label='synthetic')
+    if kind.startswith('replay:'):
+        path = kind[len('replay:'):]
+        return ReplaySource(load_trace(path), speed=speed, label=path)
+    raise ValueError(f"Fuente desconocida: {spec}")
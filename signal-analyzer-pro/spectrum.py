@@ -0,0 +1,238 @@
+"""
+Signal Analyzer Pro - Análisis espectral del RSSI
+Espectro de potencia de Welch, tasa de cruces de nivel, duración media de
+los desvanecimientos y autocorrelación de la señal, actualizados muestra a
+muestra con costo fijo:
+    - DFT deslizante (SDFT) de `size` puntos: cada muestra actualiza los
+      size/2 + 1 bins con una resta y una rotación; la ventana de Hann se
+      aplica en frecuencia (convolución de 3 coeficientes) y se re-ancla con
+      una FFT exacta cada `size` muestras para que no acumule error.
+    - Welch: cada `size/2` muestras (50% de solapamiento) el periodograma
+      entra a un promedio de los últimos `segments` segmentos (suma móvil).
+    - Cruces de nivel y desvanecimientos sobre la media de la ventana, con
+      colas de eventos; autocorrelación por sumas móviles de productos
+      desfasados para lags 1..`max_lag`.
+El costo por muestra depende de `size` y `max_lag`, no del largo del
+historial ni de la ventana de promediado.
+"""
+from collections import deque
+
+import numpy as np
+
+
+class SpectrumAnalyzer:
+    def __init__(self, size=128, segments=8, window=512, max_lag=32):
+        if size % 2:
+            raise ValueError('size debe ser par')
+        self.size = size
+        self.segments = segments
+        self.window = window
+        self.max_lag = max_lag
+        self.hop = size // 2
+        self.bins = size // 2 + 1
+        k = np.arange(self.bins)
+        self._twiddle = np.exp(2j * np.pi * k / size)
+        # Potencia de la ventana de Hann para normalizar la densidad
+        self._hann_power = float(np.sum(np.hanning(size + 1)[:-1] ** 2))
+        self._capacity = max(size, window + max_lag) + 1
+        self.reset()
+
+    def reset(self):
+        self._values = np.zeros(2 * self._capacity)
+        self._head = 0
+        self.count = 0
+        self._dft = np.zeros(self.bins, dtype=np.complex128)
+        self._psd_sum = np.zeros(self.bins)
+        self._psd_segments = deque()
+        self._dt = None
+        self._last_ts = None
+        # Sumas móviles de la ventana de fading/autocorrelación
+        self._sum = 0.0
+        # Por lag: suma de productos y de cada miembro del par (covarianza exacta
+        # aunque la media de la ventana se mueva)
+        self._lag_sums = np.zeros(self.max_lag + 1)
+        self._lag_new = np.zeros(self.max_lag + 1)
+        self._lag_old = np.zeros(self.max_lag + 1)
+        self._lag_counts = np.zeros(self.max_lag + 1)
+        self._abs_diff_sum = 0.0
+        self._crossings = deque()  # índices de cruces descendentes
+        self._fades = deque()      # (índice de inicio, duración en muestras)
+        self._fade_start = None
+        self.version = 0
+
+    def _at(self, back):
+        """Valor de hace `back` muestras (0 = el último)"""
+        return self._values[self._head - 1 - back + self._capacity]
+
+    def _window_values(self, n):
+        end = self._head + self._capacity
+        return self._values[end - n:end]
+
+    # ===== Actualización por muestra =====
+
+    def update(self, ts, rssi):
+        """Agrega una muestra (epoch en segundos, dBm)"""
+        x = float(rssi)
+        if self._last_ts is not None and ts > self._last_ts:
+            dt = ts - self._last_ts
+            self._dt = dt if self._dt is None else self._dt + 0.05 * (dt - self._dt)
+        self._last_ts = ts
+
+        n = self.count
+        old = self._at(self.size - 1) if n >= self.size else 0.0
+        prev = self._at(0) if n else x
+
+        i = self._head
+        self._values[i] = x
+        self._values[i + self._capacity] = x
+        self._head = (i + 1) % self._capacity
+        self.count += 1
+
+        # DFT deslizante: X_k <- (X_k + x_nuevo - x_saliente) * e^(j2πk/N)
+        self._dft += x - old
+        self._dft *= self._twiddle
+        if self.count % self.size == 0:
+            self._dft = np.fft.rfft(self._window_values(self.size))
+
+        # Sumas móviles de la ventana de análisis
+        w = min(self.count, self.window)
+        lags = min(self.count - 1, self.max_lag)
+        recent = self._window_values(lags + 1)[::-1]
+        self._lag_sums[:lags + 1] += x * recent
+        self._lag_new[:lags + 1] += x
+        self._lag_old[:lags + 1] += recent
+        self._lag_counts[:lags + 1] += 1
+        self._sum += x
+        self._abs_diff_sum += abs(x - prev)
+        if self.count > self.window:
+            leaving = self._at(self.window)
+            self._sum -= leaving
+            self._abs_diff_sum -= abs(self._at(self.window - 1) - leaving)
+            older = self._window_values(self.window + self.max_lag + 1)[:self.max_lag + 1][::-1]
+            # Solo los lags cuyo par entró a las sumas (todos, pasado el arranque)
+            paired = min(self.count - self.window, self.max_lag + 1)
+            self._lag_sums[:paired] -= leaving * older[:paired]
+            self._lag_new[:paired] -= leaving
+            self._lag_old[:paired] -= older[:paired]
+            self._lag_counts[:paired] -= 1
+
+        self._track_fades(x, prev, w)
+
+        if self.count >= self.size and self.count % self.hop == 0:
+            self._add_segment()
+        return self
+
+    def _track_fades(self, x, prev, w):
+        """Cruces descendentes de la media de la ventana y duración de cada fade"""
+        level = self._sum / w
+        index = self.count
+        if prev >= level > x:
+            self._crossings.append(index)
+            self._fade_start = index
+        elif self._fade_start is not None and x >= level:
+            self._fades.append((self._fade_start, index - self._fade_start))
+            self._fade_start = None
+        horizon = index - self.window
+        while self._crossings and self._crossings[0] <= horizon:
+            self._crossings.popleft()
+        while self._fades and self._fades[0][0] <= horizon:
+            self._fades.popleft()
+
+    def _add_segment(self):
+        """Periodograma de Hann del segmento actual al promedio de Welch"""
+        dft = self._dft.copy()
+        dft[0] = 0.0  # Sin componente continua: la media no se filtra a los bins bajos
+        # Hann en frecuencia: 0.5·X[k] - 0.25·(X[k-1] + X[k+1]), simetría conjugada en los bordes
+        lower = np.concatenate(([np.conj(dft[1])], dft[:-1]))
+        upper = np.concatenate((dft[1:], [np.conj(dft[-2])]))
+        windowed = 0.5 * dft - 0.25 * (lower + upper)
+        psd = np.abs(windowed) ** 2 / self._hann_power
+        psd[1:-1] *= 2  # Espectro de un lado
+        self._psd_segments.append(psd)
+        self._psd_sum += psd
+        if len(self._psd_segments) > self.segments:
+            self._psd_sum -= self._psd_segments.popleft()
+        self.version += 1
+
+    # ===== Consultas =====
+
+    @property
+    def sample_rate(self):
+        return 1.0 / self._dt if self._dt else 1.0
+
+    def psd(self):
+        """(frecuencias Hz, PSD dB²/Hz) promediada de Welch"""
+        if not self._psd_segments:
+            return None, None
+        fs = self.sample_rate
+        psd = self._psd_sum / len(self._psd_segments) / fs
+        return np.arange(self.bins) * fs / self.size, psd
+
+    def autocorrelation(self):
+        """Autocorrelación normalizada para lags 0..max_lag de la ventana"""
+        w = min(self.count, self.window)
+        lags = min(self.count - 1, self.max_lag)
+        if w < 2 or lags < 1:
+            return np.ones(1)
+        counts = self._lag_counts[:lags + 1]
+        covariance = (self._lag_sums[:lags + 1] / counts
+                      - self._lag_new[:lags + 1] * self._lag_old[:lags + 1] / (counts * counts))
+        if covariance[0] <= 1e-9:
+            return np.ones(lags + 1)
+        return covariance / covariance[0]
+
+    def fading(self):
+        """Tasa de cruces de nivel, duración media de fades, coherencia y tasa de cambio"""
+        w = min(self.count, self.window)
+        dt = self._dt or 1.0
+        span = w * dt
+        acf = self.autocorrelation()
+        below = np.flatnonzero(acf < 0.5)
+        coherence = float(below[0]) * dt if len(below) else None
+        durations = [d for _, d in self._fades]
+        return {
+            'lcr_hz': len(self._crossings) / span if span else 0.0,
+            'afd_s': (sum(durations) / len(durations)) * dt if durations else None,
+            'coherence_s': coherence,
+            'rate_db_s': self._abs_diff_sum / max(w - 1, 1) / dt
+        }
+
+    def frame(self):
+        """Frame compacto para el dashboard (arrays float32 como bytes) o None"""
+        freqs, psd = self.psd()
+        if psd is None:
+            return None
+        fs = self.sample_rate
+        acf = self.autocorrelation()
+        fading = self.fading()
+        return {
+            'fs': fs,
+            'df': fs / self.size,
+            'segments': len(self._psd_segments),
+            'psd_db': (10 * np.log10(np.maximum(psd, 1e-12))).astype('<f4').tobytes(),
+            'acf': acf.astype('<f4').tobytes(),
+            'acf_dt': 1.0 / fs,
+            'lcr_hz': round(fading['lcr_hz'], 4),
+            'afd_s': None if fading['afd_s'] is None else round(fading['afd_s'], 4),
+            'coherence_s': None if fading['coherence_s'] is None else round(fading['coherence_s'], 4),
+            'rate_db_s': round(float(fading['rate_db_s']), 3),
+            'count': self.count
+        }
+
+
+def welch_reference(values, fs, size=128, segments=None):
+    """Welch directo con FFT (referencia para verificar el analizador incremental)"""
+    values = np.asarray(values, dtype=np.float64)
+    hop = size // 2
+    window = np.hanning(size + 1)[:-1]
+    starts = list(range(0, len(values) - size + 1, hop))
+    if segments:
+        starts = starts[-segments:]
+    psds = []
+    for start in starts:
+        segment = values[start:start + size]
+        spectrum = np.fft.rfft((segment - segment.mean()) * window)
+        psd = np.abs(spectrum) ** 2 / np.sum(window ** 2)
+        psd[1:-1] *= 2
+        psds.append(psd)
+    return np.arange(size // 2 + 1) * fs / size, np.mean(psds, axis=0) / fs if psds else None
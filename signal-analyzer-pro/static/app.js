@@ -5,17 +5,130 @@ let wifiMonitoring = false;
 let btMonitoring = false;
 let wifiStartTime = null;
 let sessionStartTime = Date.now();
-let wifiData = [];
+const WIFI_CAPACITY = 300;
+const HIST_BINS = 15;
 let wifiInterval = 500;
 let btInterval = 2000;
 let ultraFastMode = false;
-let bluetoothDevices = new Map();
 let markers = [];
 let btChart;
 let btDeviceHistory = [];
+let wifiMeta = { ssid: 'N/A', channel: null };
 
 let wifiChart, waveChart, histChart;
 
+// ============================================
+// BUFFER CIRCULAR WIFI
+// ============================================
+
+// Historial de capacidad fija sobre arrays tipados. Mantiene en O(1) por
+// muestra la suma y un conteo por dBm (-128..0), de donde salen promedio,
+// mínimo, máximo e histograma sin recorrer las muestras.
+class WiFiRing {
+    constructor(capacity) {
+        this.capacity = capacity;
+        this.time = new Float64Array(capacity);
+        this.ts = new Float64Array(capacity);
+        this.rssi = new Int8Array(capacity);
+        this.channel = new Uint8Array(capacity);
+        this.ssid = new Array(capacity);
+        this.labels = new Array(capacity);
+        this.counts = new Uint32Array(129);
+        this.clear();
+    }
+
+    clear() {
+        this.head = 0;
+        this.length = 0;
+        this.sum = 0;
+        this.version = 0;
+        this.counts.fill(0);
+    }
+
+    static bin(rssi) {
+        return Math.min(128, Math.max(0, -rssi));
+    }
+
+    push(time, rssi, channel, ssid, ts) {
+        const i = this.head;
+        if (this.length === this.capacity) {
+            this.sum -= this.rssi[i];
+            this.counts[WiFiRing.bin(this.rssi[i])]--;
+        } else {
+            this.length++;
+        }
+        this.time[i] = time;
+        this.ts[i] = ts;
+        this.rssi[i] = rssi;
+        this.channel[i] = channel || 0;
+        this.ssid[i] = ssid;
+        this.labels[i] = time.toFixed(1);
+        this.sum += this.rssi[i];
+        this.counts[WiFiRing.bin(this.rssi[i])]++;
+        this.head = (i + 1) % this.capacity;
+        this.version++;
+    }
+
+    index(i) {
+        if (i < 0) i += this.length;
+        return (this.head - this.length + i + this.capacity) % this.capacity;
+    }
+
+    at(i) {
+        if (this.length === 0) return undefined;
+        const j = this.index(i);
+        return {
+            time: this.time[j],
+            rssi: this.rssi[j],
+            ssid: this.ssid[j],
+            channel: this.channel[j] || null,
+            timestamp: new Date(this.ts[j]).toISOString()
+        };
+    }
+
+    last() {
+        return this.at(-1);
+    }
+
+    forEach(fn) {
+        for (let i = 0; i < this.length; i++) fn(this.at(i), i);
+    }
+
+    stats() {
+        if (this.length === 0) return null;
+        let max = 0;
+        while (this.counts[max] === 0) max++;
+        let min = 128;
+        while (this.counts[min] === 0) min--;
+        return { avg: this.sum / this.length, max: -max, min: -min, count: this.length };
+    }
+
+    // Copia la ventana en orden cronológico sobre arrays existentes (sin asignar)
+    copyInto(labels, values) {
+        labels.length = this.length;
+        values.length = this.length;
+        for (let i = 0; i < this.length; i++) {
+            const j = this.index(i);
+            labels[i] = this.labels[j];
+            values[i] = this.rssi[j];
+        }
+    }
+}
+
+let wifiData = new WiFiRing(WIFI_CAPACITY);
+
+// Repintado agrupado: las muestras se acumulan en el buffer y la interfaz se
+// actualiza como máximo una vez por requestAnimationFrame
+let wifiFramePending = false;
+let wifiLatest = null;
+let wifiLatestStats = null;
+let wifiRendered = { version: -1, histKey: null };
+
+// Espectro del RSSI calculado en el servidor (evento 'spectrum'); se pinta en
+// el mismo requestAnimationFrame que el resto del panel WiFi
+let spectrumLatest = null;
+let spectrumFramePending = false;
+
 // Sistema de Temas
 let currentTheme = localStorage.getItem('theme') || 'dark';
 
@@ -192,6 +305,19 @@ function initWebSocket() {
         handleWiFiData(data);
     });
     
+    // Lotes binarios: el ack libera la contrapresión del servidor
+    socket.on('wifi_batch', (buffer, ack) => {
+        handleWiFiBatch(buffer);
+        if (typeof ack === 'function') ack();
+    });
+    
+    socket.on('spectrum', handleSpectrum);
+    socket.on('alert', handleAlert);
+    
+    socket.on('wifi_meta', (meta) => {
+        wifiMeta = meta;
+    });
+    
     socket.on('wifi_error', (data) => {
         console.error('Error WiFi:', data.error);
         showNotification('❌ Error WiFi', data.error, 'error');
@@ -216,9 +342,10 @@ function initWebSocket() {
         showNotification('📡 WiFi Monitor', 'Monitoreo detenido', 'info');
     });
     
-    socket.on('bluetooth_data', (data) => {
-        handleBluetoothData(data);
-    });
+    socket.on('bluetooth_delta', handleBluetoothDelta);
+    socket.on('networks_found', handleNetworksFound);
+    socket.on('channel_info', handleChannelInfo);
+    socket.on('network_stats', handleNetworkStats);
     
     socket.on('bluetooth_error', (data) => {
         console.error('Error Bluetooth:', data.error);
@@ -339,19 +466,20 @@ function initCharts() {
         }
     });
 
-    // Gráfica de Onda
+    // Gráfica del espectro (PSD de Welch del RSSI)
     const waveCtx = document.getElementById('waveChart').getContext('2d');
     waveChart = new Chart(waveCtx, {
         type: 'line',
         data: {
             labels: [],
             datasets: [{
-                label: 'Onda Simulada',
+                label: 'PSD (dB²/Hz)',
                 data: [],
                 borderColor: '#9775fa',
                 backgroundColor: 'rgba(151, 117, 250, 0.2)',
                 borderWidth: 2,
-                tension: 0.4,
+                pointRadius: 0,
+                tension: 0,
                 fill: true
             }]
         },
@@ -361,7 +489,7 @@ function initCharts() {
                 ...chartOptions.plugins,
                 title: {
                     display: true,
-                    text: 'Visualización de Onda',
+                    text: 'Espectro del RSSI',
                     color: '#e1e8f0',
                     font: { size: 14, weight: 'bold' }
                 }
@@ -506,47 +634,160 @@ function toggleWiFi() {
     }
     
     if (!wifiMonitoring) {
-        socket.emit('start_wifi', { interval: wifiInterval / 1000 });
+        socket.emit('start_wifi', { interval: wifiInterval / 1000, batch: true });
     } else {
         socket.emit('stop_wifi');
     }
 }
 
-function handleWiFiData(data) {
-    const time = (Date.now() - wifiStartTime) / 1000;
-    
-    wifiData.push({
-        time: time,
-        rssi: data.rssi,
-        ssid: data.ssid,
-        channel: data.channel,
-        timestamp: data.timestamp
-    });
-    
-    if (wifiData.length > 300) {
-        wifiData.shift();
+function pushWiFiSample(data, ts = Date.now()) {
+    wifiData.push((ts - wifiStartTime) / 1000, data.rssi, data.channel, data.ssid, ts);
+}
+
+function scheduleWiFiRender(latest, stats) {
+    wifiLatest = latest;
+    wifiLatestStats = stats;
+    if (!wifiFramePending) {
+        wifiFramePending = true;
+        requestAnimationFrame(renderWiFiFrame);
     }
+}
+
+function renderWiFiFrame() {
+    wifiFramePending = false;
+    if (!wifiLatest) return;
     
-    updateWiFiDisplay(data);
-    updateWiFiStats();
+    updateWiFiDisplay(wifiLatest);
+    updateWiFiStats(wifiLatestStats);
     updateCharts();
     
-    // Alertas inteligentes
-    checkWiFiAlerts(data.rssi);
-    
     document.getElementById('lastUpdate').textContent = new Date().toLocaleTimeString();
     document.getElementById('totalWifiData').textContent = wifiData.length;
 }
 
-function checkWiFiAlerts(rssi) {
-    // Alerta si la señal es muy débil
-    if (rssi < -85 && wifiData.length % 20 === 0) {
-        showNotification('⚠️ Señal Débil', `RSSI: ${rssi} dBm - Considera acercarte al router`, 'warning');
+function handleSpectrum(frame) {
+    spectrumLatest = frame;
+    if (!spectrumFramePending) {
+        spectrumFramePending = true;
+        requestAnimationFrame(renderSpectrum);
+    }
+}
+
+// PSD en dB por bin (k·df Hz) y resumen de fading en el título
+function renderSpectrum() {
+    spectrumFramePending = false;
+    const frame = spectrumLatest;
+    if (!frame || !waveChart) return;
+
+    const psd = new Float32Array(frame.psd_db);
+    const labels = waveChart.data.labels;
+    const data = waveChart.data.datasets[0].data;
+    if (labels.length !== psd.length || waveChart.spectrumDf !== frame.df) {
+        waveChart.spectrumDf = frame.df;
+        labels.length = psd.length;
+        for (let k = 0; k < psd.length; k++) {
+            labels[k] = (k * frame.df).toFixed(2) + ' Hz';
+        }
+    }
+    data.length = psd.length;
+    for (let k = 0; k < psd.length; k++) {
+        data[k] = psd[k];
+    }
+
+    const afd = frame.afd_s === null ? '--' : (frame.afd_s * 1000).toFixed(0) + ' ms';
+    const coherence = frame.coherence_s === null ? '--' : (frame.coherence_s * 1000).toFixed(0) + ' ms';
+    waveChart.options.plugins.title.text =
+        `Espectro del RSSI · LCR ${frame.lcr_hz.toFixed(2)} Hz · AFD ${afd} · Tc ${coherence}`;
+    waveChart.update('none');
+}
+
+function handleWiFiData(data) {
+    pushWiFiSample(data);
+    scheduleWiFiRender(data, data.stats);
+}
+
+// Frame binario (ver emitter.py): cabecera de 26 bytes, deltas uint16 en ms,
+// RSSI int8 y canal uint8, todo little-endian
+function decodeWiFiBatch(buffer) {
+    const view = new DataView(buffer);
+    if (view.getUint8(0) !== 0x53 || view.getUint8(1) !== 0x41 || view.getUint8(2) !== 1) {
+        throw new Error('Frame WiFi desconocido');
+    }
+    const count = view.getUint16(4, true);
+    const dropped = view.getUint16(6, true);
+    let ts = view.getFloat64(8, true);
+    const stats = {
+        avg: view.getFloat32(16, true),
+        std: view.getFloat32(20, true),
+        min: view.getInt8(24),
+        max: view.getInt8(25),
+        count: count
+    };
+    
+    const deltasOffset = 26;
+    const rssiOffset = deltasOffset + 2 * count;
+    const channelOffset = rssiOffset + count;
+    const samples = new Array(count);
+    for (let i = 0; i < count; i++) {
+        ts += view.getUint16(deltasOffset + 2 * i, true) / 1000;
+        samples[i] = {
+            ts: ts,
+            rssi: view.getInt8(rssiOffset + i),
+            channel: view.getUint8(channelOffset + i) || null
+        };
+    }
+    return { samples, stats, dropped };
+}
+
+function handleWiFiBatch(buffer) {
+    let batch;
+    try {
+        batch = decodeWiFiBatch(buffer);
+    } catch (e) {
+        console.error('Error decodificando lote WiFi:', e);
+        return;
+    }
+    if (batch.samples.length === 0) return;
+    if (batch.dropped > 0) {
+        console.warn(`Servidor descartó ${batch.dropped} muestras (cliente lento)`);
     }
     
-    // Alerta si la señal es excelente
-    if (rssi > -50 && wifiData.length === 1) {
-        showNotification('🎉 Señal Excelente', `RSSI: ${rssi} dBm - Ubicación óptima`, 'success');
+    for (const sample of batch.samples) {
+        pushWiFiSample({
+            rssi: sample.rssi,
+            ssid: wifiMeta.ssid,
+            channel: sample.channel
+        }, sample.ts * 1000);
+    }
+    
+    const last = batch.samples[batch.samples.length - 1];
+    scheduleWiFiRender({
+        rssi: last.rssi,
+        ssid: wifiMeta.ssid,
+        channel: last.channel,
+        quality: getWiFiQuality(last.rssi)
+    }, batch.stats);
+}
+
+// Misma escala que get_quality() del servidor
+function getWiFiQuality(rssi) {
+    if (rssi >= -30) return { level: 'Excelente', percentage: 100, color: '#51cf66' };
+    if (rssi >= -67) return { level: 'Buena', percentage: 75, color: '#ffd43b' };
+    if (rssi >= -80) return { level: 'Regular', percentage: 50, color: '#ff9f43' };
+    return { level: 'Débil', percentage: 25, color: '#ff6b6b' };
+}
+
+// Alertas evaluadas en el servidor (alerts.py): llega un evento por transición,
+// no por muestra, y es el mismo para todos los navegadores abiertos
+function handleAlert(alert) {
+    const origin = alert.stream === 'local' ? '' : ` · ${alert.stream}`;
+    if (alert.state === 'firing') {
+        showNotification('⚠️ Alerta', alert.message + origin,
+            alert.severity === 'critical' ? 'error' : 'warning');
+    } else if (alert.state === 'resolved') {
+        showNotification('✅ Alerta Resuelta', alert.message + origin, 'success');
+    } else {
+        showNotification('🔄 Cambio Detectado', alert.message + origin, 'info');
     }
 }
 
@@ -578,13 +819,11 @@ function updateWiFiDisplay(data) {
     document.getElementById('wifiCount').textContent = wifiData.length;
 }
 
-function updateWiFiStats() {
+function updateWiFiStats(stats) {
     if (wifiData.length === 0) return;
 
-    const rssis = wifiData.map(d => d.rssi);
-    const avg = rssis.reduce((a, b) => a + b) / rssis.length;
-    const max = Math.max(...rssis);
-    const min = Math.min(...rssis);
+    // Estadísticas del servidor si vienen; si no, las incrementales del buffer
+    const { avg, max, min } = (stats && stats.count > 0) ? stats : wifiData.stats();
     const variance = max - min;
 
     document.getElementById('wifiAvg').textContent = avg.toFixed(1) + ' dBm';
@@ -594,51 +833,40 @@ function updateWiFiStats() {
 }
 
 function updateCharts() {
-    if (wifiData.length === 0) return;
+    if (wifiData.length === 0 || wifiRendered.version === wifiData.version) return;
+    wifiRendered.version = wifiData.version;
 
-    const times = wifiData.map(d => d.time.toFixed(1));
-    const rssis = wifiData.map(d => d.rssi);
-
-    wifiChart.data.labels = times;
-    wifiChart.data.datasets[0].data = rssis;
+    // Los arrays del gráfico se reutilizan; las etiquetas se formatean al insertar
+    const dataset = wifiChart.data.datasets[0];
+    wifiData.copyInto(wifiChart.data.labels, dataset.data);
     wifiChart.update('none');
 
-    const waveData = [];
-    const waveLabels = [];
-    for (let i = 0; i < 50; i++) {
-        const t = i / 10;
-        const lastRssi = rssis[rssis.length - 1];
-        const amplitude = Math.abs(lastRssi / 10);
-        const wave = lastRssi + amplitude * Math.sin(2 * Math.PI * t / 5);
-        waveData.push(wave);
-        waveLabels.push(t.toFixed(1));
+    if (wifiData.length > 10) {
+        updateHistogram();
     }
-    waveChart.data.labels = waveLabels;
-    waveChart.data.datasets[0].data = waveData;
-    waveChart.update('none');
+}
 
-    if (wifiData.length > 10) {
-        const bins = 15;
-        const min = Math.min(...rssis);
-        const max = Math.max(...rssis);
-        const binSize = (max - min) / bins;
-        
-        const histogram = new Array(bins).fill(0);
-        const binLabels = [];
-        
-        rssis.forEach(rssi => {
-            const binIndex = Math.min(Math.floor((rssi - min) / binSize), bins - 1);
-            histogram[binIndex]++;
-        });
-        
-        for (let i = 0; i < bins; i++) {
-            binLabels.push((min + i * binSize).toFixed(0));
-        }
-        
-        histChart.data.labels = binLabels;
-        histChart.data.datasets[0].data = histogram;
-        histChart.update('none');
+// Agrupa los conteos por dBm del buffer en HIST_BINS barras entre mín y máx
+function updateHistogram() {
+    const { min, max } = wifiData.stats();
+    const binSize = (max - min) / HIST_BINS;
+    const histogram = histChart.data.datasets[0].data;
+    histogram.length = HIST_BINS;
+    histogram.fill(0);
+    for (let rssi = min; rssi <= max; rssi++) {
+        const count = wifiData.counts[WiFiRing.bin(rssi)];
+        if (count === 0) continue;
+        const binIndex = binSize > 0 ? Math.min(Math.floor((rssi - min) / binSize), HIST_BINS - 1) : 0;
+        histogram[binIndex] += count;
+    }
+
+    const histKey = `${min}:${max}`;
+    if (histKey !== wifiRendered.histKey) {
+        wifiRendered.histKey = histKey;
+        histChart.data.labels = Array.from({ length: HIST_BINS },
+            (_, i) => (min + i * binSize).toFixed(0));
     }
+    histChart.update('none');
 }
 
 function testWiFi() {
@@ -653,14 +881,14 @@ function addMarker() {
     if (wifiData.length > 0) {
         const note = prompt('Nota para este marcador:');
         if (note) {
+            const last = wifiData.last();
             const marker = {
-                time: wifiData[wifiData.length - 1].time,
-                rssi: wifiData[wifiData.length - 1].rssi,
+                time: last.time,
+                rssi: last.rssi,
                 note: note
             };
             markers.push(marker);
             showNotification('🔖 Marcador', `Agregado: ${note}`, 'success');
-            updateCharts();
         }
     } else {
         showNotification('⚠️ Atención', 'Inicia el monitoreo WiFi primero', 'warning');
@@ -669,13 +897,17 @@ function addMarker() {
 
 function clearWiFi() {
     if (confirm('¿Limpiar todos los datos de WiFi?')) {
-        wifiData = [];
+        wifiData.clear();
+        wifiLatest = null;
+        spectrumLatest = null;
+        wifiRendered = { version: -1, histKey: null };
         markers = [];
         wifiChart.data.labels = [];
         wifiChart.data.datasets[0].data = [];
         wifiChart.update();
         waveChart.data.labels = [];
         waveChart.data.datasets[0].data = [];
+        waveChart.options.plugins.title.text = 'Espectro del RSSI';
         waveChart.update();
         histChart.data.labels = [];
         histChart.data.datasets[0].data = [];
@@ -727,83 +959,221 @@ function toggleBluetooth() {
     }
 }
 
-socket.on('bluetooth_data', function(data) {
-    bluetoothDevices.clear();
-    
-    if (data.devices && data.devices.length > 0) {
-        data.devices.forEach(device => {
-            bluetoothDevices.set(device.mac, device);
+// ============================================
+// DELTAS DE ESCANEO
+// ============================================
+
+// Estado indexado de un escaneo que el servidor actualiza por deltas
+// {seq, full, added, changed, removed} (ver delta.py). Cada delta toca solo
+// las filas afectadas, así el costo de render sigue a la rotación.
+class KeyedScan {
+    constructor(keyOf, view) {
+        this.keyOf = keyOf;
+        this.view = view;
+        this.items = new Map();
+        this.seq = null;
+    }
+
+    // Retorna false si falta un delta intermedio (hay que resincronizar)
+    apply(delta) {
+        if (delta.full) {
+            this.items.clear();
+            this.view.clear();
+        } else if (this.seq === null || delta.seq <= this.seq) {
+            // Sin instantánea todavía (ya viene en camino) o delta repetido
+            return true;
+        } else if (delta.seq !== this.seq + 1) {
+            return false;
+        }
+        this.seq = delta.seq;
+
+        delta.removed.forEach(key => {
+            if (this.items.delete(key)) this.view.remove(key);
         });
-        
-        // Actualizar gráfica
-        const labels = data.devices.map(d => d.name.substring(0, 15));
-        const rssiData = data.devices.map(d => d.rssi);
-        
-        btChart.data.labels = labels;
-        btChart.data.datasets[0].data = rssiData;
-        btChart.update('none');
-        
-        // Actualizar lista de dispositivos
-        updateBluetoothList();
+        delta.added.concat(delta.changed).forEach(item => {
+            const key = this.keyOf(item);
+            const isNew = !this.items.has(key);
+            this.items.set(key, item);
+            if (isNew) {
+                this.view.add(key, item);
+            } else {
+                this.view.update(key, item);
+            }
+        });
+        this.view.done(this.items);
+        return true;
     }
-    
-    document.getElementById('btCount').textContent = data.count;
-    document.getElementById('btStatus').textContent = 'Escaneando';
-});
+}
 
-// Nueva función para actualizar lista de dispositivos BT
-function updateBluetoothList() {
-    const deviceList = document.getElementById('deviceList');
-    deviceList.innerHTML = '';
-    
-    if (bluetoothDevices.size === 0) {
-        deviceList.innerHTML = `
-            <div style="text-align: center; color: #8b92a7; padding: 20px;">
-                No se encontraron dispositivos
-            </div>
-        `;
+// Lista de nodos DOM por clave con un mensaje cuando está vacía
+class KeyedList {
+    constructor(container, create, render, emptyText) {
+        this.container = container;
+        this.create = create;
+        this.render = render;
+        this.emptyText = emptyText;
+        this.nodes = new Map();
+        this.empty = null;
+    }
+
+    clear() {
+        this.nodes.forEach(node => node.remove());
+        this.nodes.clear();
+    }
+
+    add(key, item) {
+        const node = this.create();
+        this.render(node, item, key);
+        this.nodes.set(key, node);
+        this.container().appendChild(node);
+    }
+
+    update(key, item) {
+        this.render(this.nodes.get(key), item, key);
+    }
+
+    remove(key) {
+        const node = this.nodes.get(key);
+        if (node) node.remove();
+        this.nodes.delete(key);
+    }
+
+    done() {
+        const showEmpty = this.nodes.size === 0;
+        if (showEmpty && !this.empty) {
+            this.empty = document.createElement('div');
+            this.empty.style.cssText = 'text-align: center; color: #8b92a7; padding: 20px;';
+            this.empty.textContent = this.emptyText;
+            this.container().appendChild(this.empty);
+        } else if (!showEmpty && this.empty) {
+            this.empty.remove();
+            this.empty = null;
+        }
+    }
+}
+
+function createDeviceItem() {
+    const item = document.createElement('div');
+    item.className = 'device-item';
+    item.innerHTML = `
+        <div>
+            <div class="device-name"></div>
+            <div class="device-mac"></div>
+        </div>
+        <div class="device-rssi"></div>
+    `;
+    return item;
+}
+
+// ============================================
+// BLUETOOTH (deltas)
+// ============================================
+
+const deviceListView = new KeyedList(
+    () => document.getElementById('deviceList'),
+    createDeviceItem,
+    (node, device) => {
+        node.querySelector('.device-name').textContent = `📱 ${device.name}`;
+        node.querySelector('.device-mac').textContent = device.mac;
+        const rssi = node.querySelector('.device-rssi');
+        rssi.textContent = `${device.rssi} dBm`;
+        rssi.style.background = getRssiColor(device.rssi);
+    },
+    'No se encontraron dispositivos'
+);
+
+const bluetoothScan = new KeyedScan(
+    device => (device.mac && device.mac !== 'N/A') ? device.mac : `name:${device.name}`,
+    {
+        clear: () => deviceListView.clear(),
+        add: (key, device) => deviceListView.add(key, device),
+        update: (key, device) => deviceListView.update(key, device),
+        remove: key => deviceListView.remove(key),
+        done: devices => {
+            deviceListView.done();
+            // La gráfica se arma desde el Map: sin recrear nodos del DOM
+            const labels = [];
+            const rssiData = [];
+            devices.forEach(device => {
+                labels.push((device.name || '').substring(0, 15));
+                rssiData.push(device.rssi);
+            });
+            btChart.data.labels = labels;
+            btChart.data.datasets[0].data = rssiData;
+            btChart.update('none');
+        }
+    }
+);
+
+function handleBluetoothDelta(delta) {
+    if (!bluetoothScan.apply(delta)) {
+        socket.emit('bluetooth_resync');
         return;
     }
-    
-    bluetoothDevices.forEach((device, mac) => {
-        const deviceItem = document.createElement('div');
-        deviceItem.className = 'device-item';
-        
-        const rssiColor = getRssiColor(device.rssi);
-        
-        deviceItem.innerHTML = `
-            <div>
-                <div class="device-name">📱 ${device.name}</div>
-                <div class="device-mac">${mac}</div>
-            </div>
-            <div class="device-rssi" style="background: ${rssiColor};">
-                ${device.rssi} dBm
-            </div>
+    document.getElementById('btCount').textContent = bluetoothScan.items.size;
+    if (btMonitoring) {
+        document.getElementById('btStatus').textContent = 'Escaneando';
+    }
+}
+
+// ============================================
+// ESCANEO DE REDES (deltas)
+// ============================================
+// Una fila por BSSID; cada escaneo envía `since` y el servidor responde solo
+// con el delta si el cliente está al día
+function networksContainer() {
+    let list = document.getElementById('nearbyNetworks');
+    if (!list) {
+        // Crear sección si no existe
+        const panel = document.querySelector('.panel-right');
+        const networksCard = document.createElement('div');
+        networksCard.className = 'card';
+        networksCard.innerHTML = `
+            <div class="card-title">📡 Redes Cercanas (<span id="nearbyNetworksCount">0</span>)</div>
+            <div id="nearbyNetworks" style="max-height: 300px; overflow-y: auto;"></div>
         `;
-        
-        deviceList.appendChild(deviceItem);
-    });
+        panel.appendChild(networksCard);
+        list = document.getElementById('nearbyNetworks');
+    }
+    return list;
 }
 
-// Función para escanear todas las redes WiFi
+const networkListView = new KeyedList(
+    networksContainer,
+    createDeviceItem,
+    (node, network) => {
+        node.style.borderLeftColor = getRssiColorBySignal(network.signal || 0);
+        node.querySelector('.device-name').textContent = network.ssid || 'Oculta';
+        node.querySelector('.device-mac').textContent =
+            `Canal: ${network.channel || 'N/A'} · ${network.bssid}`;
+        node.querySelector('.device-rssi').textContent = `${network.signal || 0}%`;
+    },
+    'No se encontraron redes'
+);
+
+const networkScan = new KeyedScan(network => network.bssid, {
+    clear: () => networkListView.clear(),
+    add: (key, network) => networkListView.add(key, network),
+    update: (key, network) => networkListView.update(key, network),
+    remove: key => networkListView.remove(key),
+    done: () => networkListView.done()
+});
+
 function scanAllNetworks() {
-    socket.emit('scan_networks');
-    showNotification('🔍 Escaneando', 'Buscando todas las redes disponibles...', 'info');
+    socket.emit('scan_networks', { since: networkScan.seq });
+    showNotification('🔍 Escaneando', 'Buscando redes WiFi...', 'info');
 }
 
-socket.on('networks_found', function(data) {
-    console.log('Redes encontradas:', data.networks);
-    showNotification(
-        '📡 Redes Encontradas', 
-        `${data.count} redes WiFi detectadas`, 
-        'success'
-    );
-    
-    // Mostrar en consola o crear modal con las redes
-    data.networks.forEach(network => {
-        console.log(`SSID: ${network.ssid}, BSSIDs: ${network.bssids.length}`);
-    });
-});
+function handleNetworksFound(delta) {
+    if (!networkScan.apply(delta)) {
+        // Respuestas desordenadas: el próximo escaneo trae el estado completo
+        networkScan.seq = null;
+        return;
+    }
+    networksContainer();
+    document.getElementById('nearbyNetworksCount').textContent = networkScan.items.size;
+    showNotification('✅ Escaneo Completo', `${delta.count} BSSIDs encontrados`, 'success');
+}
 
 // Función para analizar canal
 function analyzeChannel() {
@@ -811,56 +1181,14 @@ function analyzeChannel() {
     showNotification('📊 Analizando', 'Obteniendo información del canal...', 'info');
 }
 
-socket.on('channel_info', function(info) {
+function handleChannelInfo(info) {
     if (info && info.channel) {
         showNotification(
             '📡 Info del Canal',
-            `Canal: ${info.channel}, Banda: ${info.band}, ${info.width}`,
+            `Canal: ${info.channel}, Banda: ${info.band || 'N/A'}, ${info.width}`,
             'success'
         );
     }
-});
-
-// Exportar a JSON
-function exportToJSON() {
-    const data = {
-        wifi: Array.from(wifiData),
-        bluetooth: Array.from(bluetoothDevices.values()),
-        timestamp: new Date().toISOString()
-    };
-    
-    const blob = new Blob([JSON.stringify(data, null, 2)], { type: 'application/json' });
-    const url = URL.createObjectURL(blob);
-    const link = document.createElement('a');
-    link.download = `signal_data_${Date.now()}.json`;
-    link.href = url;
-    link.click();
-    URL.revokeObjectURL(url);
-    
-    showNotification('💾 Exportado', 'Datos guardados en JSON', 'success');
-}
-
-// Exportar a CSV
-function exportToCSV() {
-    let csv = 'Tipo,Timestamp,SSID/Nombre,MAC,RSSI,Canal\n';
-    
-    wifiData.forEach(d => {
-        csv += `WiFi,${d.timestamp},${d.ssid},N/A,${d.rssi},${d.channel || 'N/A'}\n`;
-    });
-    
-    bluetoothDevices.forEach(d => {
-        csv += `Bluetooth,${new Date().toISOString()},${d.name},${d.mac},${d.rssi},N/A\n`;
-    });
-    
-    const blob = new Blob([csv], { type: 'text/csv' });
-    const url = URL.createObjectURL(blob);
-    const link = document.createElement('a');
-    link.download = `signal_data_${Date.now()}.csv`;
-    link.href = url;
-    link.click();
-    URL.revokeObjectURL(url);
-    
-    showNotification('💾 Exportado', 'Datos guardados en CSV', 'success');
 }
 
 // ============================================
@@ -906,70 +1234,19 @@ document.head.appendChild(style);
 
 // AGREGAR AL FINAL DE app.js:
 
-// ===== ESCANEO DE REDES =====
-function scanAllNetworks() {
-    socket.emit('scan_networks');
-    showNotification('🔍 Escaneando', 'Buscando redes WiFi...', 'info');
-}
-
-socket.on('networks_found', function(data) {
-    const networksList = document.getElementById('nearbyNetworks');
-    if (!networksList) {
-        // Crear sección si no existe
-        const panel = document.querySelector('.panel-right');
-        const networksCard = document.createElement('div');
-        networksCard.className = 'card';
-        networksCard.innerHTML = `
-            <div class="card-title">📡 Redes Cercanas (${data.count})</div>
-            <div id="nearbyNetworks" style="max-height: 300px; overflow-y: auto;"></div>
-        `;
-        panel.appendChild(networksCard);
-    }
-    
-    const list = document.getElementById('nearbyNetworks');
-    list.innerHTML = '';
-    
-    data.networks.forEach(network => {
-        const netDiv = document.createElement('div');
-        netDiv.className = 'device-item';
-        netDiv.style.borderLeftColor = getRssiColorBySignal(network.bssids[0]?.signal || 0);
-        netDiv.innerHTML = `
-            <div>
-                <div class="device-name">${network.ssid || 'Oculta'}</div>
-                <div class="device-mac">Canal: ${network.bssids[0]?.channel || 'N/A'}</div>
-            </div>
-            <div class="device-rssi">${network.bssids[0]?.signal || 0}%</div>
-        `;
-        list.appendChild(netDiv);
-    });
-    
-    showNotification('✅ Escaneo Completo', `${data.count} redes encontradas`, 'success');
-});
-
-// ===== ANÁLISIS DE CANAL =====
-function analyzeChannel() {
-    socket.emit('get_channel_info');
-}
-
-socket.on('channel_info', function(data) {
-    if (data && data.channel) {
-        showNotification('📊 Info de Canal', 
-            `Canal ${data.channel} - ${data.band || 'N/A'} - ${data.frequency || 'N/A'} MHz`,
-            'info');
-    }
-});
-
 // ===== ESTADÍSTICAS DE RED =====
 function updateNetworkStats() {
-    socket.emit('get_network_stats');
+    if (socket && socket.connected) socket.emit('get_network_stats');
 }
 
-socket.on('network_stats', function(data) {
-    // Actualizar estadísticas en el footer
-    document.getElementById('stat-packets-sent').textContent = formatBytes(data.packets_sent);
+function handleNetworkStats(data) {
+    // Actualizar estadísticas en el footer (si la página las muestra)
+    const sent = document.getElementById('stat-packets-sent');
+    if (!sent || !data || data.packets_sent === undefined) return;
+    sent.textContent = formatBytes(data.packets_sent);
     document.getElementById('stat-packets-recv').textContent = formatBytes(data.packets_recv);
     document.getElementById('stat-errors').textContent = data.errin + data.errout;
-});
+}
 
 function formatBytes(bytes) {
     if (bytes < 1024) return bytes + ' B';
@@ -982,45 +1259,27 @@ function formatBytes(bytes) {
 setInterval(updateNetworkStats, 5000);
 
 // ===== EXPORTAR DATOS =====
+// El historial completo se descarga en streaming por HTTP desde el almacén
+// (/api/export), sin pasar por el WebSocket ni armar el archivo en memoria
+function exportHistory(format, params = {}) {
+    const query = new URLSearchParams(params).toString();
+    const link = document.createElement('a');
+    link.href = `/api/export/wifi.${format}${query ? '?' + query : ''}`;
+    link.download = '';
+    link.click();
+    showNotification('💾 Exportando', `Descargando historial en ${format.toUpperCase()}`, 'success');
+}
+
 function exportToJSON() {
-    socket.emit('get_wifi_history', {limit: 1000});
-    socket.once('wifi_history', function(data) {
-        const blob = new Blob([JSON.stringify(data, null, 2)], {type: 'application/json'});
-        const url = URL.createObjectURL(blob);
-        const a = document.createElement('a');
-        a.href = url;
-        a.download = `wifi_data_${Date.now()}.json`;
-        a.click();
-        URL.revokeObjectURL(url);
-        showNotification('💾 Exportado', 'Datos guardados en JSON', 'success');
-    });
+    exportHistory('ndjson');
 }
 
 function exportToCSV() {
-    socket.emit('get_wifi_history', {limit: 1000});
-    socket.once('wifi_history', function(data) {
-        let csv = 'Timestamp,RSSI,SSID,Channel,Quality\\n';
-        data.history.forEach(row => {
-            csv += `${row.timestamp},${row.rssi},${row.ssid},${row.channel || 'N/A'},${row.quality.level}\\n`;
-        });
-        
-        const blob = new Blob([csv], {type: 'text/csv'});
-        const url = URL.createObjectURL(blob);
-        const a = document.createElement('a');
-        a.href = url;
-        a.download = `wifi_data_${Date.now()}.csv`;
-        a.click();
-        URL.revokeObjectURL(url);
-        showNotification('💾 Exportado', 'Datos guardados en CSV', 'success');
-    });
+    exportHistory('csv');
 }
 
-// ===== ALERTAS PERSONALIZADAS =====
-let alertThreshold = -75;
-function checkSignalAlerts(rssi) {
-    if (rssi < alertThreshold) {
-        showNotification('⚠️ Señal Baja', `RSSI: ${rssi} dBm está por debajo del umbral`, 'warning');
-    }
+function exportToParquet() {
+    exportHistory('parquet');
 }
 
 // Función auxiliar para getRssiColor (si no existe)
@@ -0,0 +1,195 @@
+// Historial de rango largo: el servidor reduce la serie al ancho del gráfico
+// (LTTB o mín/máx por bucket) y cada zoom pide el detalle del rango visible,
+// así los puntos dibujados no dependen del largo de la sesión
+let historyChart = null;
+let historyView = { start: null, end: null };   // null = toda la sesión
+let historyExtent = null;                        // [primero, último] epoch s
+let historyRequestId = 0;
+let historyTimer = null;
+const HISTORY_DEBOUNCE_MS = 150;
+const HISTORY_MIN_SPAN = 5;                      // segundos
+const HISTORY_REFRESH_MS = 10000;                // refresco de la vista completa en vivo
+
+function initHistoryChart() {
+    const ctx = document.getElementById('historyChart').getContext('2d');
+    historyChart = new Chart(ctx, {
+        type: 'line',
+        data: {
+            datasets: [{
+                label: 'Historial WiFi (dBm)',
+                data: [],
+                borderColor: '#4c9aff',
+                backgroundColor: 'rgba(76, 154, 255, 0.1)',
+                borderWidth: 1.5,
+                pointRadius: 0,
+                tension: 0,
+                fill: true
+            }]
+        },
+        options: {
+            responsive: true,
+            maintainAspectRatio: false,
+            animation: false,
+            parsing: false,
+            normalized: true,
+            plugins: {
+                legend: { labels: { color: '#e1e8f0', font: { size: 12, weight: 'bold' } } },
+                title: {
+                    display: true,
+                    text: 'Historial de la Sesión',
+                    color: '#e1e8f0',
+                    font: { size: 14, weight: 'bold' }
+                }
+            },
+            scales: {
+                x: {
+                    type: 'linear',
+                    ticks: {
+                        color: '#8b92a7',
+                        maxTicksLimit: 8,
+                        callback: (value) => formatHistoryTime(value)
+                    },
+                    grid: { color: 'rgba(76, 154, 255, 0.1)' }
+                },
+                y: {
+                    ticks: { color: '#8b92a7' },
+                    grid: { color: 'rgba(76, 154, 255, 0.1)' }
+                }
+            }
+        }
+    });
+    bindHistoryZoom(ctx.canvas);
+}
+
+function formatHistoryTime(epoch) {
+    const span = historyChart ? historyChart.scales.x.max - historyChart.scales.x.min : 0;
+    const date = new Date(epoch * 1000);
+    if (span > 86400) {
+        return date.toLocaleDateString([], { month: 'short', day: 'numeric' }) + ' ' +
+            date.toLocaleTimeString([], { hour: '2-digit', minute: '2-digit' });
+    }
+    return date.toLocaleTimeString();
+}
+
+// ===== Consultas =====
+
+function requestHistory() {
+    if (!socket || !socket.connected || !historyChart) return;
+    historyRequestId += 1;
+    socket.emit('get_wifi_history', {
+        request: historyRequestId,
+        width: Math.max(100, Math.round(historyChart.chartArea.right - historyChart.chartArea.left)),
+        method: document.getElementById('historyMethod').value,
+        start: historyView.start,
+        end: historyView.end
+    });
+}
+
+function scheduleHistoryRequest() {
+    clearTimeout(historyTimer);
+    historyTimer = setTimeout(requestHistory, HISTORY_DEBOUNCE_MS);
+}
+
+function handleWiFiHistory(data) {
+    // Respuestas viejas (zoom ya cambiado) o de otras consultas se ignoran
+    if (data.request !== historyRequestId || !data.ts) return;
+    historyExtent = data.extent;
+
+    const points = historyChart.data.datasets[0].data;
+    points.length = data.ts.length;
+    for (let i = 0; i < data.ts.length; i++) {
+        points[i] = { x: data.ts[i], y: data.rssi[i] };
+    }
+    if (data.start !== null && data.end !== null) {
+        historyChart.options.scales.x.min = data.start;
+        historyChart.options.scales.x.max = data.end;
+    }
+    const tier = data.tier === 'memory' ? 'memoria' : data.tier;
+    historyChart.options.plugins.title.text = data.tier
+        ? `Historial de la Sesión · ${data.count} de ${data.input_count} puntos (${tier})`
+        : 'Historial de la Sesión · sin datos';
+    historyChart.update('none');
+}
+
+function selectHistoryRange(seconds) {
+    document.querySelectorAll('.history-controls .view-tab').forEach(btn => {
+        btn.classList.toggle('active', btn.dataset.range === String(seconds || 'all'));
+    });
+    if (seconds && historyExtent) {
+        historyView = { start: historyExtent[1] - seconds, end: historyExtent[1] };
+    } else if (seconds) {
+        const now = Date.now() / 1000;
+        historyView = { start: now - seconds, end: now };
+    } else {
+        historyView = { start: null, end: null };
+    }
+    requestHistory();
+}
+
+// ===== Zoom y desplazamiento =====
+
+function setHistoryView(start, end) {
+    if (historyExtent) {
+        // No salir de la sesión ni acercarse más que HISTORY_MIN_SPAN
+        const [first, last] = historyExtent;
+        const span = Math.min(Math.max(end - start, HISTORY_MIN_SPAN), last - first || HISTORY_MIN_SPAN);
+        start = Math.min(Math.max(start, first), last - span);
+        end = start + span;
+    }
+    historyView = { start, end };
+    // La vista se mueve en el acto con los puntos que hay; el detalle llega después
+    historyChart.options.scales.x.min = start;
+    historyChart.options.scales.x.max = end;
+    historyChart.update('none');
+    scheduleHistoryRequest();
+}
+
+function bindHistoryZoom(canvas) {
+    let drag = null;
+
+    canvas.addEventListener('wheel', (event) => {
+        if (!historyChart.data.datasets[0].data.length) return;
+        event.preventDefault();
+        const scale = historyChart.scales.x;
+        const anchor = scale.getValueForPixel(event.offsetX);
+        const factor = event.deltaY < 0 ? 0.8 : 1.25;
+        setHistoryView(anchor - (anchor - scale.min) * factor,
+                       anchor + (scale.max - anchor) * factor);
+    }, { passive: false });
+
+    canvas.addEventListener('mousedown', (event) => {
+        const scale = historyChart.scales.x;
+        drag = { x: event.offsetX, min: scale.min, max: scale.max };
+        canvas.style.cursor = 'grabbing';
+    });
+
+    canvas.addEventListener('mousemove', (event) => {
+        if (!drag) return;
+        const scale = historyChart.scales.x;
+        const perPixel = (drag.max - drag.min) / (scale.right - scale.left);
+        const shift = (drag.x - event.offsetX) * perPixel;
+        setHistoryView(drag.min + shift, drag.max + shift);
+    });
+
+    window.addEventListener('mouseup', () => {
+        if (!drag) return;
+        drag = null;
+        canvas.style.cursor = '';
+    });
+
+    canvas.addEventListener('dblclick', () => selectHistoryRange(null));
+}
+
+document.addEventListener('DOMContentLoaded', function() {
+    // app.js crea el socket en su propio DOMContentLoaded
+    initHistoryChart();
+    if (socket) {
+        socket.on('wifi_history', handleWiFiHistory);
+        socket.on('connect', requestHistory);
+        if (socket.connected) requestHistory();
+    }
+    // Con la vista completa y el monitoreo activo, la sesión crece: se vuelve a pedir
+    setInterval(() => {
+        if (wifiMonitoring && historyView.start === null) requestHistory();
+    }, HISTORY_REFRESH_MS);
+});
@@ -141,10 +141,84 @@ function initMap() {
     mapCanvas.addEventListener('mousemove', handleMapMouseMove);
     mapCanvas.addEventListener('contextmenu', (e) => e.preventDefault());
     
+    initMapWorker();
+    
     // Dibujar grid inicial
     drawMap();
 }
 
+// ============================================
+// WORKER DE CÁLCULO
+// ============================================
+
+// Interpolación, coloreado y estadísticas corren en static/worker.js; sin
+// soporte de workers se usan los cálculos locales
+let mapWorker = null;
+let mapWorkerSeq = 0;
+let mapStatsRequest = 0;
+
+function initMapWorker() {
+    if (typeof Worker === 'undefined' || typeof createImageBitmap === 'undefined') return;
+    try {
+        mapWorker = new Worker('/static/worker.js');
+    } catch (error) {
+        console.warn('Worker del mapa no disponible:', error);
+        return;
+    }
+    mapWorker.onmessage = handleWorkerMessage;
+    mapWorker.onerror = (error) => {
+        console.warn('Worker del mapa falló, usando cálculo local:', error);
+        mapWorker.terminate();
+        mapWorker = null;
+        heatmapPreview = { key: null, bitmap: null, step: null, pending: null };
+        drawMap();
+    };
+}
+
+function postToWorker(type, payload, transfer = []) {
+    const id = ++mapWorkerSeq;
+    mapWorker.postMessage(Object.assign({ id, type }, payload), transfer);
+    return id;
+}
+
+// Puntos del mapa como Float32Array [x, y, rssi, ...] transferible
+function packMapPoints() {
+    const packed = new Float32Array(mapPoints.length * 3);
+    mapPoints.forEach((p, i) => {
+        packed[3 * i] = p.x;
+        packed[3 * i + 1] = p.y;
+        packed[3 * i + 2] = p.rssi;
+    });
+    return packed;
+}
+
+function handleWorkerMessage(event) {
+    const msg = event.data;
+    if (msg.type === 'heatmap') {
+        if (msg.key !== heatmapPreview.pending) {
+            msg.bitmap.close();
+            return;
+        }
+        if (heatmapPreview.bitmap) heatmapPreview.bitmap.close();
+        heatmapPreview.key = msg.key;
+        heatmapPreview.bitmap = msg.bitmap;
+        heatmapPreview.step = msg.step;
+        if (msg.final) heatmapPreview.pending = null;
+        drawMap();
+    } else if (msg.type === 'coverage') {
+        if (!coverageRaster || coverageRaster.key !== msg.key) {
+            msg.bitmap.close();
+            return;
+        }
+        coverageRaster.bitmap = msg.bitmap;
+        drawMap();
+    } else if (msg.type === 'stats') {
+        if (msg.id === mapStatsRequest) renderMapStats(msg);
+    } else if (msg.type === 'error') {
+        console.error('Error en worker del mapa:', msg.error);
+    }
+}
+
 // ============================================
 // CAMBIO DE TABS
 // ============================================
@@ -186,7 +260,7 @@ function handleMapClick(event) {
     if (mapMode === 'point') {
         // Obtener RSSI actual
         const currentRssi = wifiMonitoring && wifiData.length > 0 ? 
-                           wifiData[wifiData.length - 1].rssi : -70;
+                           wifiData.last().rssi : -70;
         
         addMapPoint(x, y, currentRssi);
         showNotification('📍 Punto Agregado', `RSSI: ${currentRssi} dBm`, 'success');
@@ -251,7 +325,7 @@ function addMapPoint(x, y, rssi) {
         y, 
         rssi, 
         timestamp: Date.now(),
-        ssid: wifiData.length > 0 ? wifiData[0].ssid : 'N/A'
+        ssid: wifiData.length > 0 ? wifiData.at(0).ssid : 'N/A'
     });
     updateMapStats();
     drawMap();
@@ -276,6 +350,9 @@ function drawMap() {
         drawPoints2D();
     }
     
+    // Predicción de cobertura (si está activa)
+    drawCoverage();
+    
     // Dibujar paredes
     drawWalls();
     
@@ -391,9 +468,100 @@ function drawPoints2D() {
     });
 }
 
+// Mapa de calor interpolado en el servidor (/api/heatmap); la imagen se
+// cachea por conjunto de puntos y el cálculo local queda como respaldo
+let heatmapImage = null;
+let heatmapKey = null;
+let heatmapPending = null;
+let heatmapServerAvailable = true;
+
+// Vista previa progresiva del worker (gruesa y luego refinada)
+let heatmapPreview = { key: null, bitmap: null, step: null, pending: null };
+
+function heatmapPointsKey() {
+    return `${mapCanvas.width}x${mapCanvas.height}|` +
+        mapPoints.map(p => `${p.x},${p.y},${p.rssi}`).join(';');
+}
+
+function requestHeatmap(key) {
+    heatmapPending = key;
+    fetch('/api/heatmap', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({
+            points: mapPoints.map(p => ({ x: p.x, y: p.y, rssi: p.rssi })),
+            width: mapCanvas.width,
+            height: mapCanvas.height,
+            step: 2,
+            kernel: 'exp'
+        })
+    })
+        .then(response => {
+            if (!response.ok) throw new Error(`HTTP ${response.status}`);
+            return response.blob();
+        })
+        .then(blob => createImageBitmap(blob))
+        .then(bitmap => {
+            if (heatmapPending !== key) return;  // Llegó una respuesta obsoleta
+            heatmapImage = bitmap;
+            heatmapKey = key;
+            heatmapPending = null;
+            drawMap();
+        })
+        .catch(error => {
+            console.warn('Mapa de calor del servidor no disponible, usando cálculo local:', error);
+            heatmapServerAvailable = false;
+            heatmapPending = null;
+            // La vista previa gruesa ya no será reemplazada: pedir la refinada
+            heatmapPreview.key = null;
+            heatmapPreview.pending = null;
+            drawMap();
+        });
+}
+
+function requestHeatmapPreview(key) {
+    heatmapPreview.pending = key;
+    const points = packMapPoints();
+    // Si el servidor responde, el worker solo hace la pasada gruesa
+    postToWorker('heatmap', {
+        key,
+        points,
+        width: mapCanvas.width,
+        height: mapCanvas.height,
+        final: !heatmapServerAvailable
+    }, [points.buffer]);
+}
+
+function drawHeatmapPreview() {
+    const { bitmap, step } = heatmapPreview;
+    mapCtx.drawImage(bitmap, 0, 0, bitmap.width * step, bitmap.height * step);
+}
+
 function drawHeatmap() {
     if (mapPoints.length === 0) return;
     
+    const key = heatmapPointsKey();
+    if (heatmapServerAvailable && heatmapKey === key && heatmapImage) {
+        mapCtx.drawImage(heatmapImage, 0, 0, mapCanvas.width, mapCanvas.height);
+    } else if (heatmapServerAvailable || mapWorker) {
+        if (heatmapServerAvailable && heatmapPending !== key) requestHeatmap(key);
+        if (mapWorker && heatmapPreview.key !== key && heatmapPreview.pending !== key) {
+            requestHeatmapPreview(key);
+        }
+        // Mientras llega la imagen nueva se muestra la vista previa o la anterior
+        if (heatmapPreview.bitmap && (heatmapPreview.key === key || !heatmapImage)) {
+            drawHeatmapPreview();
+        } else if (heatmapImage) {
+            mapCtx.drawImage(heatmapImage, 0, 0, mapCanvas.width, mapCanvas.height);
+        }
+    } else {
+        drawHeatmapLocal();
+    }
+    
+    drawHeatmapPoints();
+}
+
+function drawHeatmapLocal() {
     const imageData = mapCtx.createImageData(mapCanvas.width, mapCanvas.height);
     const data = imageData.data;
     
@@ -437,8 +605,9 @@ function drawHeatmap() {
     }
     
     mapCtx.putImageData(imageData, 0, 0);
-    
-    // Dibujar puntos encima
+}
+
+function drawHeatmapPoints() {
     mapPoints.forEach(point => {
         mapCtx.save();
         
@@ -852,6 +1021,8 @@ function clearMap() {
         mapPoints = [];
         mapWalls = [];
         mapRouter = null;
+        coverageEnabled = false;
+        coverageRaster = null;
         updateMapStats();
         drawMap();
         showNotification('🗑️ Mapa Limpiado', 'Todos los datos del mapa eliminados', 'info');
@@ -871,7 +1042,7 @@ function exportMap() {
         walls: mapWalls,
         router: mapRouter,
         timestamp: new Date().toISOString(),
-        ssid: wifiData.length > 0 ? wifiData[0].ssid : 'N/A',
+        ssid: wifiData.length > 0 ? wifiData.at(0).ssid : 'N/A',
         stats: {
             totalPoints: mapPoints.length,
             avgRssi: mapPoints.length > 0 ? 
@@ -894,18 +1065,31 @@ function updateMapStats() {
     document.getElementById('mapPoints').textContent = mapPoints.length;
     document.getElementById('totalMapPoints').textContent = mapPoints.length;
     
-    if (mapPoints.length > 0) {
-        const avgRssi = mapPoints.reduce((sum, p) => sum + p.rssi, 0) / mapPoints.length;
-        document.getElementById('mapAvgRssi').textContent = avgRssi.toFixed(1) + ' dBm';
+    if (mapWorker && mapPoints.length > 0) {
+        const points = packMapPoints();
+        mapStatsRequest = postToWorker('stats', { points }, [points.buffer]);
+        return;
+    }
+    
+    const avg = mapPoints.length > 0 ?
+        mapPoints.reduce((sum, p) => sum + p.rssi, 0) / mapPoints.length : null;
+    const best = mapPoints.length > 0 ?
+        mapPoints.reduce((best, p) => p.rssi > best.rssi ? p : best) : null;
+    mapStatsRequest = 0;
+    renderMapStats({ count: mapPoints.length, avg, best });
+}
+
+function renderMapStats({ count, avg, best: bestPoint }) {
+    if (count > 0) {
+        document.getElementById('mapAvgRssi').textContent = avg.toFixed(1) + ' dBm';
         
-        const bestPoint = mapPoints.reduce((best, p) => p.rssi > best.rssi ? p : best);
         const metersX = (bestPoint.x / GRID_SIZE * 5).toFixed(1);
         const metersY = (bestPoint.y / GRID_SIZE * 5).toFixed(1);
         document.getElementById('mapBestZone').textContent = 
             `(${metersX}m, ${metersY}m) - ${bestPoint.rssi} dBm`;
         
         // Calcular área aproximada (cada punto cubre ~25m²)
-        const area = mapPoints.length * 25;
+        const area = count * 25;
         document.getElementById('mapArea').textContent = area + ' m²';
     } else {
         document.getElementById('mapAvgRssi').textContent = '-- dBm';
@@ -933,62 +1117,97 @@ function getRssiColorRGB(rssi) {
 }
 
 // ===== PREDICCIÓN DE COBERTURA =====
+// El raster se calcula en el servidor (/api/coverage) con el modelo de
+// pérdida ajustado a los puntos medidos; se recalcula al editar el mapa
+let coverageEnabled = false;
+let coverageRaster = null;
+let coveragePending = null;
+
 function predictCoverage() {
-    if (!mapRouter || mapPoints.length === 0) {
-        showNotification('⚠️ Configurar', 'Primero ubica el router y marca algunos puntos', 'warning');
+    if (!mapRouter) {
+        showNotification('⚠️ Configurar', 'Primero ubica el router', 'warning');
         return;
     }
+    coverageEnabled = true;
+    requestCoverage(coverageKey(), true);
+}
+
+function coverageKey() {
+    return JSON.stringify([mapRouter, mapWalls, mapPoints.map(p => [p.x, p.y, p.rssi]),
+                           mapCanvas.width, mapCanvas.height]);
+}
+
+function requestCoverage(key, notify) {
+    coveragePending = key;
+    fetch('/api/coverage', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({
+            router: mapRouter,
+            walls: mapWalls,
+            points: mapPoints.map(p => ({ x: p.x, y: p.y, rssi: p.rssi })),
+            width: mapCanvas.width,
+            height: mapCanvas.height,
+            step: 10
+        })
+    })
+        .then(response => response.json())
+        .then(data => {
+            if (data.error) throw new Error(data.error);
+            if (coveragePending !== key) return;  // El mapa cambió mientras tanto
+            coveragePending = null;
+            coverageRaster = Object.assign(data, { key, bitmap: null });
+            if (mapWorker) {
+                const rssi = Float32Array.from(data.rssi);
+                postToWorker('coverage', { key, cols: data.cols, rows: data.rows, rssi },
+                             [rssi.buffer]);
+            }
+            drawMap();
+            if (notify) {
+                const model = data.model;
+                const detail = model.fitted
+                    ? `n=${model.n.toFixed(2)}, pared=${model.wall_loss.toFixed(1)} dB, error=${model.rmse.toFixed(1)} dB`
+                    : 'modelo por defecto (marca al menos 3 puntos para ajustarlo)';
+                showNotification('🎯 Predicción Calculada', detail, 'success');
+            }
+        })
+        .catch(error => {
+            coveragePending = null;
+            console.error('Error en predicción de cobertura:', error);
+            showNotification('❌ Error', 'No se pudo calcular la cobertura', 'error');
+        });
+}
+
+function drawCoverage() {
+    if (!coverageEnabled || !mapRouter) return;
     
-    // Algoritmo de predicción simple
-    const predictions = [];
-    for (let x = 0; x < mapCanvas.width; x += 30) {
-        for (let y = 0; y < mapCanvas.height; y += 30) {
-            const distance = Math.sqrt(
-                Math.pow(x - mapRouter.x, 2) + 
-                Math.pow(y - mapRouter.y, 2)
-            );
-            
-            // RSSI base menos pérdida por distancia
-            let predictedRssi = -30 - (distance / 10);
-            
-            // Penalización por paredes
-            mapWalls.forEach(wall => {
-                if (lineIntersectsWall(mapRouter.x, mapRouter.y, x, y, wall)) {
-                    predictedRssi -= 15; // -15 dBm por cada pared
-                }
-            });
-            
-            predictions.push({
-                x, 
-                y, 
-                rssi: Math.max(predictedRssi, -100)
-            });
-        }
+    const key = coverageKey();
+    if ((!coverageRaster || coverageRaster.key !== key) && coveragePending !== key) {
+        requestCoverage(key, false);
     }
+    if (!coverageRaster) return;
     
-    // Dibujar predicciones con transparencia
+    const { cols, rows, step, rssi, bitmap } = coverageRaster;
     mapCtx.save();
-    predictions.forEach(pred => {
-        const color = getRssiColor(pred.rssi);
-        mapCtx.fillStyle = color + '40'; // 40 = 25% opacity
-        mapCtx.fillRect(pred.x - 15, pred.y - 15, 30, 30);
-    });
+    if (bitmap) {
+        // Una celda por píxel del bitmap, escalada sin suavizado
+        mapCtx.imageSmoothingEnabled = false;
+        mapCtx.drawImage(bitmap, 0, 0, cols * step, rows * step);
+        mapCtx.restore();
+        return;
+    }
+    if (mapWorker) {
+        // El worker aún está coloreando el raster
+        mapCtx.restore();
+        return;
+    }
+    for (let row = 0; row < rows; row++) {
+        for (let col = 0; col < cols; col++) {
+            mapCtx.fillStyle = getRssiColor(rssi[row * cols + col]) + '40'; // 25% opacidad
+            mapCtx.fillRect(col * step, row * step, step, step);
+        }
+    }
     mapCtx.restore();
-    
-    showNotification('🎯 Predicción Calculada', 
-        `${predictions.length} puntos predichos`, 
-        'success');
-}
-
-function lineIntersectsWall(x1, y1, x2, y2, wall) {
-    // Algoritmo de intersección de segmentos de línea
-    const denom = ((wall.y2 - wall.y1) * (x2 - x1)) - ((wall.x2 - wall.x1) * (y2 - y1));
-    if (denom === 0) return false;
-    
-    const ua = (((wall.x2 - wall.x1) * (y1 - wall.y1)) - ((wall.y2 - wall.y1) * (x1 - wall.x1))) / denom;
-    const ub = (((x2 - x1) * (y1 - wall.y1)) - ((y2 - y1) * (x1 - wall.x1))) / denom;
-    
-    return (ua >= 0 && ua <= 1 && ub >= 0 && ub <= 1);
 }
 
 // Agregar botón de predicción si no existe
@@ -1004,54 +1223,3 @@ document.addEventListener('DOMContentLoaded', function() {
 });
 
 console.log('✅ Funcionalidad de predicción de cobertura cargada');
-
-// AGREGAR a map.js:
-function predictCoverage() {
-    if (!mapRouter || mapWalls.length === 0) {
-        showNotification('⚠️ Configurar', 'Ubica el router y agrega paredes primero', 'warning');
-        return;
-    }
-    
-    // Algoritmo simple de predicción
-    const predictions = [];
-    for (let x = 0; x < mapCanvas.width; x += 20) {
-        for (let y = 0; y < mapCanvas.height; y += 20) {
-            const distance = Math.sqrt(
-                Math.pow(x - mapRouter.x, 2) + 
-                Math.pow(y - mapRouter.y, 2)
-            );
-            
-            // RSSI base - pérdida por distancia
-            let predictedRssi = -30 - (distance / 10);
-            
-            // Penalización por paredes
-            mapWalls.forEach(wall => {
-                if (lineIntersectsWall(mapRouter.x, mapRouter.y, x, y, wall)) {
-                    predictedRssi -= 15; // -15 dBm por pared
-                }
-            });
-            
-            predictions.push({x, y, rssi: Math.max(predictedRssi, -100)});
-        }
-    }
-    
-    // Dibujar predicciones
-    predictions.forEach(pred => {
-        const color = getRssiColor(pred.rssi);
-        mapCtx.fillStyle = color + '33';
-        mapCtx.fillRect(pred.x - 10, pred.y - 10, 20, 20);
-    });
-    
-    showNotification('🎯 Predicción', 'Cobertura estimada calculada', 'success');
-}
-
-function lineIntersectsWall(x1, y1, x2, y2, wall) {
-    // Algoritmo de intersección de líneas
-    const denom = ((wall.y2 - wall.y1) * (x2 - x1)) - ((wall.x2 - wall.x1) * (y2 - y1));
-    if (denom === 0) return false;
-    
-    const ua = (((wall.x2 - wall.x1) * (y1 - wall.y1)) - ((wall.y2 - wall.y1) * (x1 - wall.x1))) / denom;
-    const ub = (((x2 - x1) * (y1 - wall.y1)) - ((y2 - y1) * (x1 - wall.x1))) / denom;
-    
-    return (ua >= 0 && ua <= 1 && ub >= 0 && ub <= 1);
-}
@@ -1,28 +1,45 @@
-function generatePDFReport() {
-    // Recolectar datos
-    socket.emit('get_wifi_history', {limit: 1000});
-    socket.once('wifi_history', function(data) {
-        // Crear reporte HTML
-        const reportHTML = `
-            <html>
-            <head><title>Reporte WiFi - ${new Date().toLocaleString()}</title></head>
-            <body>
-                <h1>📊 Reporte de Análisis WiFi</h1>
-                <h2>Estadísticas</h2>
-                <p>Promedio RSSI: ${data.stats.avg.toFixed(1)} dBm</p>
-                <p>Mínimo: ${data.stats.min} dBm</p>
-                <p>Máximo: ${data.stats.max} dBm</p>
-                <p>Desviación: ${data.stats.std.toFixed(2)} dBm</p>
-                <h2>Recomendaciones</h2>
-                ${data.stats.avg < -70 ? '<p>⚠️ Señal débil. Considera reposicionar el router.</p>' : ''}
-                ${data.stats.std > 10 ? '<p>⚠️ Alta variación. Puede haber interferencias.</p>' : ''}
-            </body>
-            </html>
-        `;
-        
-        // Abrir en nueva ventana para imprimir
-        const win = window.open('', '_blank');
-        win.document.write(reportHTML);
-        win.print();
+// Reportes PDF generados en el servidor (historial completo, figuras con matplotlib)
+let reportJobId = null;
+
+function generatePDFReport(range = {}) {
+    if (!socket || !socket.connected) {
+        showNotification('❌ Error', 'No hay conexión con el servidor', 'error');
+        return;
+    }
+    
+    socket.emit('generate_report', {
+        start: range.start,
+        end: range.end,
+        points: typeof mapPoints !== 'undefined' ? mapPoints : []
     });
 }
+
+function initReportEvents() {
+    socket.on('report_started', (data) => {
+        reportJobId = data.job_id;
+        showNotification('📊 Reporte', 'Generando reporte en el servidor...', 'info');
+    });
+    
+    socket.on('report_progress', (data) => {
+        if (data.job_id !== reportJobId) return;
+        console.log(`Reporte ${data.job_id}: ${data.progress}% (${data.stage})`);
+    });
+    
+    socket.on('report_ready', (data) => {
+        if (data.job_id !== reportJobId) return;
+        reportJobId = null;
+        showNotification('📊 Reporte Listo',
+            `${data.summary.count} muestras en ${data.seconds.toFixed(1)} s`, 'success');
+        window.open(data.url, '_blank');
+    });
+    
+    socket.on('report_error', (data) => {
+        reportJobId = null;
+        showNotification('❌ Error en Reporte', data.error, 'error');
+    });
+}
+
+document.addEventListener('DOMContentLoaded', function() {
+    // app.js crea el socket en su propio DOMContentLoaded
+    if (socket) initReportEvents();
+});
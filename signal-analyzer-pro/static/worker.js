@@ -0,0 +1,134 @@
+// Signal Analyzer Pro - Worker de cálculo del mapa
+// Interpolación del mapa de calor, coloreado del raster de cobertura y
+// estadísticas de puntos fuera del hilo de la interfaz. Los datos llegan como
+// Float32Array transferibles y las imágenes vuelven como ImageBitmap, así el
+// hilo principal solo compone.
+
+const HEATMAP_SCALE = 100;          // exp(-d/100), igual que el servidor
+const MIN_WEIGHT = 0.01;
+const HEATMAP_CUTOFF = HEATMAP_SCALE * Math.log(1 / MIN_WEIGHT);
+const HEATMAP_PASSES = [8, 2];      // Pasada gruesa primero, luego refinada
+
+// Escala de colores de getRssiColorRGB
+const COLOR_LEVELS = [-67, -80, -90];
+const COLORS = [
+    [81, 207, 102],
+    [255, 212, 59],
+    [255, 159, 67],
+    [255, 107, 107]
+];
+
+// Último mapa de calor pedido: las pasadas de pedidos obsoletos se abandonan
+let latestHeatmap = 0;
+
+function rssiColor(rssi) {
+    let level = 0;
+    while (level < COLOR_LEVELS.length && rssi < COLOR_LEVELS[level]) level++;
+    return COLORS[level];
+}
+
+// Acumula cada punto solo en las celdas dentro del radio de corte del kernel
+function interpolate(points, width, height, step) {
+    const cols = Math.ceil(width / step);
+    const rows = Math.ceil(height / step);
+    const total = new Float32Array(cols * rows);
+    const weighted = new Float32Array(cols * rows);
+
+    for (let p = 0; p < points.length; p += 3) {
+        const px = points[p], py = points[p + 1], rssi = points[p + 2];
+        const c0 = Math.max(0, Math.ceil((px - HEATMAP_CUTOFF) / step));
+        const c1 = Math.min(cols - 1, Math.floor((px + HEATMAP_CUTOFF) / step));
+        const r0 = Math.max(0, Math.ceil((py - HEATMAP_CUTOFF) / step));
+        const r1 = Math.min(rows - 1, Math.floor((py + HEATMAP_CUTOFF) / step));
+        for (let row = r0; row <= r1; row++) {
+            const dy = row * step - py;
+            for (let col = c0; col <= c1; col++) {
+                const dx = col * step - px;
+                const weight = Math.exp(-Math.sqrt(dx * dx + dy * dy) / HEATMAP_SCALE);
+                if (weight > MIN_WEIGHT) {
+                    const i = row * cols + col;
+                    total[i] += weight;
+                    weighted[i] += rssi * weight;
+                }
+            }
+        }
+    }
+    return { cols, rows, total, weighted };
+}
+
+async function heatmapBitmap(points, width, height, step) {
+    const { cols, rows, total, weighted } = interpolate(points, width, height, step);
+    const rgba = new Uint8ClampedArray(cols * rows * 4);
+    for (let i = 0; i < total.length; i++) {
+        if (total[i] > 0) {
+            const color = rssiColor(weighted[i] / total[i]);
+            rgba[4 * i] = color[0];
+            rgba[4 * i + 1] = color[1];
+            rgba[4 * i + 2] = color[2];
+            rgba[4 * i + 3] = Math.min(255, total[i] * 180);
+        }
+    }
+    return createImageBitmap(new ImageData(rgba, cols, rows));
+}
+
+const yieldToQueue = () => new Promise(resolve => setTimeout(resolve, 0));
+
+async function renderHeatmap(msg) {
+    latestHeatmap = msg.id;
+    const passes = msg.final ? HEATMAP_PASSES : HEATMAP_PASSES.slice(0, 1);
+    for (let i = 0; i < passes.length; i++) {
+        // Dejar entrar mensajes nuevos entre pasadas
+        if (i > 0) await yieldToQueue();
+        if (latestHeatmap !== msg.id) return;
+        const step = passes[i];
+        const bitmap = await heatmapBitmap(msg.points, msg.width, msg.height, step);
+        self.postMessage({
+            id: msg.id, type: 'heatmap', key: msg.key, bitmap, step,
+            final: i === passes.length - 1
+        }, [bitmap]);
+    }
+}
+
+// Raster de cobertura: una celda por píxel, con la opacidad del dibujo original
+async function renderCoverage(msg) {
+    const { cols, rows, rssi } = msg;
+    const rgba = new Uint8ClampedArray(cols * rows * 4);
+    for (let i = 0; i < rssi.length; i++) {
+        const color = rssiColor(rssi[i]);
+        rgba[4 * i] = color[0];
+        rgba[4 * i + 1] = color[1];
+        rgba[4 * i + 2] = color[2];
+        rgba[4 * i + 3] = 0x40;
+    }
+    const bitmap = await createImageBitmap(new ImageData(rgba, cols, rows));
+    self.postMessage({ id: msg.id, type: 'coverage', key: msg.key, bitmap }, [bitmap]);
+}
+
+function mapStats(msg) {
+    const points = msg.points;
+    let sum = 0;
+    let best = -1;
+    for (let p = 0; p < points.length; p += 3) {
+        sum += points[p + 2];
+        if (best < 0 || points[p + 2] > points[best + 2]) best = p;
+    }
+    const count = points.length / 3;
+    self.postMessage({
+        id: msg.id, type: 'stats', count,
+        avg: count ? sum / count : null,
+        best: best >= 0 ? { x: points[best], y: points[best + 1], rssi: points[best + 2] } : null
+    });
+}
+
+self.onmessage = (event) => {
+    const msg = event.data;
+    const handlers = { heatmap: renderHeatmap, coverage: renderCoverage, stats: mapStats };
+    const handler = handlers[msg.type];
+    if (!handler) {
+        self.postMessage({ id: msg.id, type: 'error', error: `Tarea desconocida: ${msg.type}` });
+        return;
+    }
+    Promise.resolve()
+        .then(() => handler(msg))
+        .catch(error => self.postMessage({ id: msg.id, type: 'error', error: String(error) }));
+};
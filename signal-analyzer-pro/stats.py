@@ -0,0 +1,133 @@
+"""
+Signal Analyzer Pro - Estadísticas incrementales
+Media/varianza de Welford, mín/máx con deques monótonas y percentiles por
+histograma de dBm enteros. Cada muestra cuesta O(1) y consultar las
+estadísticas no depende del tamaño del historial ni del número de clientes.
+"""
+import math
+from collections import deque
+
+
+class RollingStats:
+    def __init__(self, window=1000, rssi_min=-120, rssi_max=0):
+        self.window = window
+        self.rssi_min = rssi_min
+        self.rssi_max = rssi_max
+        self.reset()
+
+    def reset(self):
+        self._values = deque()
+        self._mins = deque()
+        self._maxs = deque()
+        self._index = 0
+        # Ventana deslizante (Welford con altas y bajas)
+        self.n = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        # Histograma de dBm enteros para percentiles
+        self._hist = [0] * (self.rssi_max - self.rssi_min + 1)
+        # Totales de la sesión completa
+        self.total = 0
+        self.session_mean = 0.0
+        self._session_m2 = 0.0
+        self.session_min = None
+        self.session_max = None
+        self._snapshot = self._empty()
+
+    def _bin(self, value):
+        return min(max(int(round(value)), self.rssi_min), self.rssi_max) - self.rssi_min
+
+    def update(self, value):
+        """Agrega una muestra y recalcula la instantánea en O(1) amortizado"""
+        index = self._index
+        self._index += 1
+        self._values.append(value)
+
+        self.n += 1
+        delta = value - self.mean
+        self.mean += delta / self.n
+        self._m2 += delta * (value - self.mean)
+        self._hist[self._bin(value)] += 1
+
+        while self._mins and self._mins[-1][1] >= value:
+            self._mins.pop()
+        self._mins.append((index, value))
+        while self._maxs and self._maxs[-1][1] <= value:
+            self._maxs.pop()
+        self._maxs.append((index, value))
+
+        if len(self._values) > self.window:
+            self._evict(index - self.window)
+
+        self.total += 1
+        delta = value - self.session_mean
+        self.session_mean += delta / self.total
+        self._session_m2 += delta * (value - self.session_mean)
+        self.session_min = value if self.session_min is None else min(self.session_min, value)
+        self.session_max = value if self.session_max is None else max(self.session_max, value)
+
+        self._snapshot = self._compute()
+        return self._snapshot
+
+    def _evict(self, index):
+        old = self._values.popleft()
+        self.n -= 1
+        delta = old - self.mean
+        self.mean -= delta / self.n
+        self._m2 -= delta * (old - self.mean)
+        self._hist[self._bin(old)] -= 1
+        if self._mins[0][0] <= index:
+            self._mins.popleft()
+        if self._maxs[0][0] <= index:
+            self._maxs.popleft()
+
+    def percentiles(self, qs=(10, 50, 90)):
+        """Percentiles aproximados (resolución de 1 dB) en una sola pasada"""
+        if self.n == 0:
+            return [None] * len(qs)
+        targets = [q / 100.0 * (self.n - 1) for q in qs]
+        results = [self.rssi_max] * len(qs)
+        pending = 0
+        seen = 0
+        for i, count in enumerate(self._hist):
+            if not count:
+                continue
+            seen += count
+            while pending < len(targets) and seen > targets[pending]:
+                results[pending] = i + self.rssi_min
+                pending += 1
+            if pending == len(targets):
+                break
+        return results
+
+    def snapshot(self):
+        """Última instantánea calculada (sin recorrer el historial)"""
+        return self._snapshot
+
+    def _compute(self):
+        variance = self._m2 / (self.n - 1) if self.n > 1 else 0.0
+        session_var = self._session_m2 / (self.total - 1) if self.total > 1 else 0.0
+        p10, p50, p90 = self.percentiles()
+        return {
+            'avg': self.mean,
+            'min': self._mins[0][1],
+            'max': self._maxs[0][1],
+            'std': math.sqrt(max(variance, 0.0)),
+            'count': self.n,
+            'p10': p10,
+            'p50': p50,
+            'p90': p90,
+            'session': {
+                'count': self.total,
+                'avg': self.session_mean,
+                'min': self.session_min,
+                'max': self.session_max,
+                'std': math.sqrt(max(session_var, 0.0))
+            }
+        }
+
+    @staticmethod
+    def _empty():
+        return {'avg': 0, 'min': 0, 'max': 0, 'std': 0, 'count': 0,
+                'p10': None, 'p50': None, 'p90': None,
+                'session': {'count': 0, 'avg': 0, 'min': None, 'max': None, 'std': 0}}
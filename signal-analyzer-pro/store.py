@@ -0,0 +1,421 @@
+"""
+Signal Analyzer Pro - Almacén persistente de series temporales
+Guarda muestras WiFi/Bluetooth en SQLite (append-only, escrituras por lotes)
+y mantiene agregados min/max/media en niveles de 1 s, 1 min y 1 h.
+Las consultas por rango usan índices sobre el tiempo: O(log n) + tamaño del rango.
+"""
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+
+# Niveles de agregación: nombre -> tamaño del bucket en segundos
+TIERS = {'1s': 1, '1m': 60, '1h': 3600}
+
+# Retención por nivel en segundos (None = para siempre)
+DEFAULT_RETENTION = {
+    'raw': 30 * 86400,
+    '1s': 30 * 86400,
+    '1m': None,
+    '1h': None
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS wifi_samples (
+    ts REAL NOT NULL,
+    source TEXT NOT NULL,
+    rssi INTEGER NOT NULL,
+    ssid TEXT,
+    channel INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_wifi_ts ON wifi_samples (ts);
+CREATE INDEX IF NOT EXISTS idx_wifi_source_ts ON wifi_samples (source, ts);
+
+CREATE TABLE IF NOT EXISTS bt_samples (
+    ts REAL NOT NULL,
+    mac TEXT NOT NULL,
+    name TEXT,
+    rssi INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_bt_ts ON bt_samples (ts);
+CREATE INDEX IF NOT EXISTS idx_bt_mac_ts ON bt_samples (mac, ts);
+"""
+
+ROLLUP_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rollup_{tier} (
+    kind TEXT NOT NULL,
+    series TEXT NOT NULL,
+    bucket INTEGER NOT NULL,
+    n INTEGER NOT NULL,
+    sum REAL NOT NULL,
+    min INTEGER NOT NULL,
+    max INTEGER NOT NULL,
+    PRIMARY KEY (kind, series, bucket)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_rollup_{tier}_bucket ON rollup_{tier} (kind, bucket);
+"""
+
+ROLLUP_UPSERT = """
+INSERT INTO rollup_{tier} (kind, series, bucket, n, sum, min, max)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (kind, series, bucket) DO UPDATE SET
+    n = n + excluded.n,
+    sum = sum + excluded.sum,
+    min = MIN(min, excluded.min),
+    max = MAX(max, excluded.max)
+"""
+
+
+class SampleStore:
+    def __init__(self, path, batch_size=500, flush_interval=1.0, retention=None):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retention = dict(DEFAULT_RETENTION)
+        if retention:
+            self.retention.update(retention)
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._queue = queue.Queue()
+        self._local = threading.local()
+        self._closed = False
+        self.written = 0
+
+        conn = self._connect()
+        conn.executescript(SCHEMA)
+        for tier in TIERS:
+            conn.executescript(ROLLUP_SCHEMA.format(tier=tier))
+        conn.commit()
+
+        self._writer = threading.Thread(target=self._writer_loop, daemon=True)
+        self._writer.start()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    def _reader(self):
+        """Conexión de lectura propia de cada hilo"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._connect()
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    # ===== Escritura =====
+
+    def append_wifi(self, ts, rssi, ssid=None, channel=None, source='local'):
+        """Encola una muestra WiFi (no bloquea)"""
+        self._queue.put(('wifi', (ts, source, rssi, ssid, channel)))
+
+    def append_wifi_many(self, rows):
+        """Encola varias muestras WiFi (ts, source, rssi, ssid, channel) de una vez"""
+        if rows:
+            self._queue.put(('wifi_many', rows))
+
+    def append_bluetooth(self, ts, mac, name, rssi):
+        """Encola una muestra Bluetooth (no bloquea)"""
+        self._queue.put(('bt', (ts, mac, name, rssi)))
+
+    def pending(self):
+        """Escrituras encoladas que el escritor todavía no procesó"""
+        return self._queue.qsize()
+
+    def flush(self, timeout=10):
+        """Bloquea hasta que todo lo encolado hasta ahora esté escrito"""
+        if self._closed:
+            return
+        done = threading.Event()
+        self._queue.put(('flush', done))
+        done.wait(timeout)
+
+    def close(self):
+        """Vacía la cola pendiente y detiene el escritor"""
+        if not self._closed:
+            self._closed = True
+            self._queue.put(None)
+            self._writer.join(timeout=5)
+
+    def _writer_loop(self):
+        conn = self._connect()
+        last_purge = 0.0
+        running = True
+        while running:
+            batch = []
+            waiters = []
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is None:
+                    running = False
+                    break
+                if item[0] == 'flush':
+                    waiters.append(item[1])
+                    break
+                if item[0] == 'wifi_many':
+                    batch.extend(('wifi', row) for row in item[1])
+                    continue
+                batch.append(item)
+
+            if batch:
+                try:
+                    self._write_batch(conn, batch)
+                except sqlite3.Error as e:
+                    print(f"Error escribiendo lote: {e}")
+            for done in waiters:
+                done.set()
+
+            if time.monotonic() - last_purge > 3600:
+                last_purge = time.monotonic()
+                try:
+                    self._purge(conn)
+                except sqlite3.Error as e:
+                    print(f"Error aplicando retención: {e}")
+        conn.close()
+
+    def _write_batch(self, conn, batch):
+        wifi_rows = [row for kind, row in batch if kind == 'wifi']
+        bt_rows = [row for kind, row in batch if kind == 'bt']
+
+        # Agregar el lote en memoria antes de tocar las tablas de rollup
+        rollups = {tier: {} for tier in TIERS}
+        for kind, series, ts, rssi in (
+            [('wifi', r[1], r[0], r[2]) for r in wifi_rows] +
+            [('bt', r[1], r[0], r[3]) for r in bt_rows]
+        ):
+            for tier, size in TIERS.items():
+                key = (kind, series, int(ts // size) * size)
+                agg = rollups[tier].get(key)
+                if agg is None:
+                    rollups[tier][key] = [1, rssi, rssi, rssi]
+                else:
+                    agg[0] += 1
+                    agg[1] += rssi
+                    agg[2] = min(agg[2], rssi)
+                    agg[3] = max(agg[3], rssi)
+
+        with conn:
+            if wifi_rows:
+                conn.executemany(
+                    'INSERT INTO wifi_samples (ts, source, rssi, ssid, channel) VALUES (?, ?, ?, ?, ?)',
+                    wifi_rows
+                )
+            if bt_rows:
+                conn.executemany(
+                    'INSERT INTO bt_samples (ts, mac, name, rssi) VALUES (?, ?, ?, ?)',
+                    bt_rows
+                )
+            for tier, groups in rollups.items():
+                conn.executemany(
+                    ROLLUP_UPSERT.format(tier=tier),
+                    [key + tuple(agg) for key, agg in groups.items()]
+                )
+        self.written += len(batch)
+
+    def _purge(self, conn):
+        now = time.time()
+        with conn:
+            if self.retention['raw']:
+                cutoff = now - self.retention['raw']
+                conn.execute('DELETE FROM wifi_samples WHERE ts < ?', (cutoff,))
+                conn.execute('DELETE FROM bt_samples WHERE ts < ?', (cutoff,))
+            for tier in TIERS:
+                if self.retention.get(tier):
+                    conn.execute(f'DELETE FROM rollup_{tier} WHERE bucket < ?',
+                                 (now - self.retention[tier],))
+
+    # ===== Lectura =====
+
+    def query_wifi(self, start=None, end=None, tier='raw', limit=None, source=None):
+        """
+        Consulta muestras WiFi en [start, end] (epoch en segundos).
+        tier='raw' retorna muestras; '1s', '1m' o '1h' retorna buckets
+        con count/min/max/mean. Sin rango, retorna las `limit` más recientes.
+        """
+        return self._query('wifi', start, end, tier, limit, source)
+
+    def query_bluetooth(self, start=None, end=None, tier='raw', limit=None, mac=None):
+        """Consulta muestras Bluetooth (igual que query_wifi, serie = MAC)"""
+        return self._query('bt', start, end, tier, limit, mac)
+
+    def _query(self, kind, start, end, tier, limit, series):
+        conn = self._reader()
+        clauses, params = [], []
+
+        if tier == 'raw':
+            table = 'wifi_samples' if kind == 'wifi' else 'bt_samples'
+            columns = 'ts, source, rssi, ssid, channel' if kind == 'wifi' else 'ts, mac, name, rssi'
+            series_col, time_col = ('source' if kind == 'wifi' else 'mac'), 'ts'
+        elif tier in TIERS:
+            table = f'rollup_{tier}'
+            columns = 'bucket AS ts, series, n AS count, min, max, sum * 1.0 / n AS mean'
+            series_col, time_col = 'series', 'bucket'
+            clauses.append('kind = ?')
+            params.append(kind)
+        else:
+            raise ValueError(f"Nivel desconocido: {tier}")
+
+        if series is not None:
+            clauses.append(f'{series_col} = ?')
+            params.append(series)
+        if start is not None:
+            clauses.append(f'{time_col} >= ?')
+            params.append(start)
+        if end is not None:
+            clauses.append(f'{time_col} <= ?')
+            params.append(end)
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        if start is None and end is None and limit:
+            # Últimas N: recorrer el índice al revés y reordenar
+            sql = f'SELECT {columns} FROM {table} {where} ORDER BY {time_col} DESC LIMIT ?'
+            rows = conn.execute(sql, params + [limit]).fetchall()
+            rows.reverse()
+        else:
+            sql = f'SELECT {columns} FROM {table} {where} ORDER BY {time_col}'
+            if limit:
+                sql += ' LIMIT ?'
+                params.append(limit)
+            rows = conn.execute(sql, params).fetchall()
+        return [dict(row) for row in rows]
+
+    def wifi_arrays(self, start=None, end=None, tier='raw', source=None):
+        """
+        Columnas NumPy de las muestras WiFi en [start, end] (para reducir
+        series largas sin crear un dict por fila). raw: ts, rssi; niveles
+        agregados: ts, mean, min, max.
+        """
+        if tier == 'raw':
+            table, time_col = 'wifi_samples', 'ts'
+            columns, names = 'ts, rssi', ('ts', 'rssi')
+            series_col, clauses, params = 'source', [], []
+        elif tier in TIERS:
+            table, time_col = f'rollup_{tier}', 'bucket'
+            columns, names = 'bucket, sum * 1.0 / n, min, max', ('ts', 'mean', 'min', 'max')
+            series_col, clauses, params = 'series', ['kind = ?'], ['wifi']
+        else:
+            raise ValueError(f"Nivel desconocido: {tier}")
+
+        if source is not None:
+            clauses.append(f'{series_col} = ?')
+            params.append(source)
+        if start is not None:
+            clauses.append(f'{time_col} >= ?')
+            params.append(start)
+        if end is not None:
+            clauses.append(f'{time_col} <= ?')
+            params.append(end)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        cursor = self._reader().cursor()
+        cursor.row_factory = None  # Tuplas: se convierten en bloque a un arreglo
+        rows = cursor.execute(
+            f'SELECT {columns} FROM {table} {where} ORDER BY {time_col}', params
+        ).fetchall()
+        data = np.array(rows, dtype=np.float64).reshape(-1, len(names))
+        return {name: data[:, i] for i, name in enumerate(names)}
+
+    def iter_wifi(self, start=None, end=None, tier='raw', source=None, chunk_size=5000):
+        """Recorre muestras WiFi en bloques de `chunk_size` filas (memoria constante)"""
+        return self._iter('wifi', start, end, tier, source, chunk_size)
+
+    def iter_bluetooth(self, start=None, end=None, tier='raw', mac=None, chunk_size=5000):
+        """Recorre muestras Bluetooth en bloques (igual que iter_wifi)"""
+        return self._iter('bt', start, end, tier, mac, chunk_size)
+
+    def _iter(self, kind, start, end, tier, series, chunk_size):
+        """
+        Paginación por clave (tiempo, desempate): cada bloque retoma justo después
+        de la última fila del anterior usando el índice, sin OFFSET.
+        Genera listas de tuplas en el orden de columns(kind, tier).
+        """
+        conn = self._reader()
+        if tier == 'raw':
+            table = 'wifi_samples' if kind == 'wifi' else 'bt_samples'
+            select = ', '.join(self.columns(kind, tier)) + ', rowid'
+            series_col, time_col, tie_col = ('source' if kind == 'wifi' else 'mac'), 'ts', 'rowid'
+            clauses, params = [], []
+        elif tier in TIERS:
+            table = f'rollup_{tier}'
+            select = 'bucket, series, n, min, max, sum * 1.0 / n, series'
+            series_col, time_col, tie_col = 'series', 'bucket', 'series'
+            clauses, params = ['kind = ?'], [kind]
+        else:
+            raise ValueError(f"Nivel desconocido: {tier}")
+
+        if series is not None:
+            clauses.append(f'{series_col} = ?')
+            params.append(series)
+        if end is not None:
+            clauses.append(f'{time_col} <= ?')
+            params.append(end)
+
+        last_time, last_tie = start, None
+        while True:
+            page_clauses = list(clauses)
+            page_params = list(params)
+            if last_tie is not None:
+                page_clauses.append(f'{time_col} >= ? AND ({time_col} > ? OR {tie_col} > ?)')
+                page_params += [last_time, last_time, last_tie]
+            elif last_time is not None:
+                page_clauses.append(f'{time_col} >= ?')
+                page_params.append(last_time)
+            where = f"WHERE {' AND '.join(page_clauses)}" if page_clauses else ''
+            rows = conn.execute(
+                f'SELECT {select} FROM {table} {where} '
+                f'ORDER BY {time_col}, {tie_col} LIMIT ?',
+                page_params + [chunk_size]
+            ).fetchall()
+            if not rows:
+                return
+            last_time, last_tie = rows[-1][0], rows[-1][-1]
+            yield [tuple(row)[:-1] for row in rows]
+            if len(rows) < chunk_size:
+                return
+
+    @staticmethod
+    def columns(kind, tier='raw'):
+        """Nombres de columnas de las filas que genera iter_wifi/iter_bluetooth"""
+        if tier != 'raw':
+            return ('ts', 'series', 'count', 'min', 'max', 'mean')
+        if kind == 'wifi':
+            return ('ts', 'source', 'rssi', 'ssid', 'channel')
+        return ('ts', 'mac', 'name', 'rssi')
+
+    def range_info(self, start, end, kind='wifi', series=None):
+        """(cantidad, último timestamp) de las muestras en [start, end], opcionalmente de una serie"""
+        table = 'wifi_samples' if kind == 'wifi' else 'bt_samples'
+        where, params = 'ts BETWEEN ? AND ?', [start, end]
+        if series is not None:
+            where += f" AND {'source' if kind == 'wifi' else 'mac'} = ?"
+            params.append(series)
+        row = self._reader().execute(
+            f'SELECT COUNT(*), MAX(ts) FROM {table} WHERE {where}', params
+        ).fetchone()
+        return row[0], row[1]
+
+    def time_range(self, kind='wifi', series=None):
+        """Retorna (primer, último) timestamp almacenado, opcionalmente de una serie"""
+        table = 'wifi_samples' if kind == 'wifi' else 'bt_samples'
+        where, params = '', []
+        if series is not None:
+            where = f"WHERE {'source' if kind == 'wifi' else 'mac'} = ?"
+            params = [series, series]
+        # MIN y MAX por separado: cada uno es un solo salto en el índice, juntos
+        # en un mismo SELECT SQLite recorre la tabla completa
+        row = self._reader().execute(
+            f'SELECT (SELECT MIN(ts) FROM {table} {where}), (SELECT MAX(ts) FROM {table} {where})',
+            params
+        ).fetchone()
+        return row[0], row[1]
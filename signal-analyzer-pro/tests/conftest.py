@@ -0,0 +1,38 @@
+"""
+Signal Analyzer Pro - Configuración de pytest
+Los módulos del servidor se importan por nombre (como en server.py), así que
+el directorio del proyecto va primero en sys.path. Las salidas grabadas de
+las herramientas están en tests/fixtures.
+"""
+import os
+import sys
+
+import pytest
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES = os.path.join(ROOT, 'tests', 'fixtures')
+
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+@pytest.fixture
+def fixture_path():
+    """Ruta de un archivo de tests/fixtures (para lectores que abren el archivo)"""
+    return lambda name: os.path.join(FIXTURES, name)
+
+
+@pytest.fixture
+def fixture_bytes(fixture_path):
+    """Lee un archivo de tests/fixtures como bytes (tal como lo entrega la herramienta)"""
+    def read(name):
+        with open(fixture_path(name), 'rb') as f:
+            return f.read()
+    return read
+
+
+@pytest.fixture
+def fixture_text(fixture_bytes):
+    """Lee un archivo de tests/fixtures como texto UTF-8"""
+    return lambda name: fixture_bytes(name).decode('utf-8')
@@ -0,0 +1,58 @@
+"""
+Signal Analyzer Pro - Pruebas de la validación de reglas de alerta
+Las reglas llegan por PUT /api/alerts/rules: cualquier error tiene que salir
+como ValueError al compilarlas y no en la primera transición del flujo.
+"""
+import pytest
+
+from alerts import DEFAULT_RULES, AlertEngine, compile_rule
+
+
+@pytest.mark.parametrize('spec', DEFAULT_RULES, ids=[spec['id'] for spec in DEFAULT_RULES])
+def test_default_rules_compile(spec):
+    assert compile_rule(spec).id == spec['id']
+
+
+@pytest.mark.parametrize('spec', [
+    'senal_debil',
+    None,
+    ['id', 'x'],
+    {'id': 'c', 'type': 'change', 'field': 'channel', 'message': '{value}'},
+    {'id': 't', 'value': -80, 'message': '{previous} → {current}'},
+    {'id': 't', 'value': -80, 'message': '{value:d} dBm'},
+    {'id': 't', 'value': -80, 'message': '{0}'},
+    {'id': 't', 'value': -80, 'message': 42},
+    {'id': 't', 'value': -80, 'severity': 'grave'},
+    {'id': 't', 'value': 'nan'},
+    {'id': 't', 'value': float('nan')},
+    {'id': 't', 'value': '-inf'},
+    {'id': 't', 'value': -80, 'clear': float('inf')},
+    {'id': 't', 'value': -80, 'clear': 'nan'},
+    {'id': 't', 'value': -80, 'for': 'inf'},
+    {'id': 't', 'value': -80, 'for': float('nan')},
+    {'id': 't', 'value': -80, 'for': -1},
+    {'id': 't', 'value': 10, 'metric': 'rate', 'op': 'above', 'window': float('nan')},
+    {'id': 't', 'value': 10, 'metric': 'rate', 'op': 'above', 'window': 'inf'},
+    {'id': 'c', 'type': 'change', 'field': 'frecuencia'},
+    {'id': 'x', 'type': 'desconocido'},
+    {'type': 'threshold', 'value': -80}
+])
+def test_invalid_rules_are_rejected(spec):
+    with pytest.raises(ValueError):
+        compile_rule(spec)
+
+
+def test_invalid_rule_keeps_current_rules():
+    engine = AlertEngine()
+    before = engine.rule_specs()
+    with pytest.raises(ValueError):
+        engine.set_rules([{'id': 'ok', 'value': -70}, {'id': 'c', 'type': 'change',
+                                                         'field': 'ssid', 'message': '{value}'}])
+    assert engine.rule_specs() == before
+
+
+def test_change_message_is_formatted():
+    engine = AlertEngine([{'id': 'canal', 'type': 'change', 'field': 'channel',
+                           'message': 'Canal {previous:d} → {current:d}'}])
+    events = engine.evaluate(['local', 'local'], [1.0, 2.0], [-50, -50], channel=[1, 6])
+    assert [event['message'] for event in events] == ['Canal 1 → 6']
@@ -0,0 +1,92 @@
+"""
+Signal Analyzer Pro - Pruebas de la predicción de cobertura
+Conteo de paredes por índice angular contra la fuerza bruta (_naive_count),
+ajuste del modelo y límites del raster que llega por POST /api/coverage.
+"""
+import numpy as np
+import pytest
+
+import coverage
+
+
+def _walls(n, seed, width=1200, height=800):
+    rng = np.random.default_rng(seed)
+    starts = rng.uniform([0, 0], [width, height], (n, 2))
+    return np.column_stack([starts, starts + rng.normal(0, 40, (n, 2))])
+
+
+def _cells(width=1200, height=800, step=10):
+    gx, gy = np.meshgrid(np.arange(0, width, step) + step / 2, np.arange(0, height, step) + step / 2)
+    return np.column_stack([gx.ravel(), gy.ravel()])
+
+
+# ===== Conteo de paredes =====
+
+@pytest.mark.parametrize('n_walls', [1, 10, 1000])
+def test_count_walls_matches_naive(n_walls):
+    router = (600.0, 400.0)
+    walls = _walls(n_walls, seed=n_walls)
+    cells = _cells()
+    np.testing.assert_array_equal(coverage.count_walls(router, walls, cells),
+                                  coverage._naive_count(router, walls, cells))
+
+
+def test_count_walls_across_the_branch_cut():
+    # Paredes a la izquierda del router: su intervalo angular cruza ±π
+    router = (600.0, 400.0)
+    walls = np.array([[100.0, 300.0, 100.0, 500.0], [50.0, 391.0, 150.0, 409.0],
+                      [300.0, 100.0, 300.0, 700.0]])
+    cells = _cells()
+    np.testing.assert_array_equal(coverage.count_walls(router, walls, cells),
+                                  coverage._naive_count(router, walls, cells))
+
+
+def test_count_walls_accepts_dicts():
+    walls = [{'x1': 10, 'y1': -10, 'x2': 10, 'y2': 10}]
+    assert coverage.count_walls((0, 0), walls, [(20, 0), (5, 0)]).tolist() == [1, 0]
+
+
+# ===== Modelo =====
+
+def test_fit_recovers_model():
+    router = (600.0, 400.0)
+    walls = _walls(30, seed=3)
+    rng = np.random.default_rng(4)
+    targets = rng.uniform([0, 0], [1200, 800], (200, 2))
+    crossings = coverage._naive_count(router, walls, targets)
+    distance = np.maximum(np.hypot(targets[:, 0] - 600, targets[:, 1] - 400)
+                          / coverage.PIXELS_PER_METER, 1.0)
+    rssi = -35 - 10 * 2.5 * np.log10(distance) - 6 * crossings
+    points = [{'x': x, 'y': y, 'rssi': r} for (x, y), r in zip(targets.tolist(), rssi.tolist())]
+    model = coverage.fit_model(router, walls, points)
+    assert model['fitted']
+    assert model['n'] == pytest.approx(2.5, abs=0.05)
+    assert model['wall_loss'] == pytest.approx(6, abs=0.2)
+    assert model['rmse'] < 0.5
+
+
+def test_predict_crossings_match_naive():
+    router = (600.0, 400.0)
+    walls = _walls(200, seed=5)
+    rssi, crossings, model = coverage.predict(router, walls, [], 1200, 800, step=10)
+    assert crossings.ravel().tolist() == coverage._naive_count(router, walls, _cells()).tolist()
+    assert not model.get('fitted')
+    assert np.all(rssi >= coverage.RSSI_FLOOR)
+
+
+@pytest.mark.parametrize('width, height, step', [
+    (1_000_000, 1_000_000, 2),
+    (0, 800, 10),
+    (1200, -1, 10),
+    (1200, 800, 0)
+])
+def test_invalid_grid_is_rejected(width, height, step):
+    with pytest.raises(ValueError):
+        coverage.predict((600, 400), [], [], width, height, step)
+
+
+# ===== Raster =====
+
+def test_grid_shape():
+    rssi, crossings, _ = coverage.predict({'x': 600, 'y': 400}, [], [], 1205, 801, 10)
+    assert rssi.shape == crossings.shape == (81, 121)
@@ -0,0 +1,111 @@
+"""
+Signal Analyzer Pro - Pruebas de la reducción visual de series
+LTTB vectorizado contra la implementación de referencia (un bucle por
+bucket, como el algoritmo original) y min/max contra los extremos de cada
+bucket calculados uno por uno, a 10k, 100k y 1M puntos.
+"""
+import math
+
+import numpy as np
+import pytest
+
+from downsample import MAX_WIDTH, downsample, lttb, minmax
+
+
+SIZES = [10_000, 100_000, 1_000_000]
+
+
+def _series(n, seed=0):
+    rng = np.random.default_rng(seed)
+    ts = 1.7e9 + np.arange(n) * 0.1
+    return ts, np.cumsum(rng.normal(0, 0.5, n)) - 60
+
+
+def _lttb_reference(ts, values, threshold):
+    """LTTB de Steinarsson: bucket i en [floor(i·every)+1, floor((i+1)·every)+1)"""
+    n = len(ts)
+    every = (n - 2) / (threshold - 2)
+    selected = [0]
+    a = 0
+    for i in range(threshold - 2):
+        avg_start = int(math.floor((i + 1) * every)) + 1
+        avg_end = min(int(math.floor((i + 2) * every)) + 1, n)
+        avg_t = ts[avg_start:avg_end].mean()
+        avg_v = values[avg_start:avg_end].mean()
+        lo = int(math.floor(i * every)) + 1
+        hi = int(math.floor((i + 1) * every)) + 1
+        area = np.abs((ts[a] - avg_t) * (values[lo:hi] - values[a])
+                      - (ts[a] - ts[lo:hi]) * (avg_v - values[a]))
+        a = lo + int(np.argmax(area))
+        selected.append(a)
+    selected.append(n - 1)
+    return np.array(selected)
+
+
+# ===== LTTB =====
+
+@pytest.mark.parametrize('n', SIZES)
+def test_lttb_matches_reference(n):
+    ts, values = _series(n)
+    np.testing.assert_array_equal(lttb(ts, values, 1200), _lttb_reference(ts, values, 1200))
+
+
+def test_lttb_short_series_is_returned_whole():
+    ts, values = _series(100)
+    assert lttb(ts, values, 100).tolist() == list(range(100))
+    assert lttb(ts, values, 2).tolist() == list(range(100))
+
+
+# ===== min/max =====
+
+@pytest.mark.parametrize('n', SIZES)
+def test_minmax_keeps_every_bucket_extreme(n):
+    ts, values = _series(n, seed=1)
+    buckets = 600
+    idx, vals = minmax(ts, values, buckets)
+    assert np.all(np.diff(idx) >= 0)
+    np.testing.assert_array_equal(vals, values[idx])
+
+    edges = np.linspace(ts[0], ts[-1], buckets + 1)
+    starts = np.searchsorted(ts, edges[:-1], side='left')
+    starts[0] = 0
+    ends = np.append(starts[1:], n)
+    expected = set()
+    for lo, hi in zip(starts.tolist(), ends.tolist()):
+        if hi > lo:
+            chunk = values[lo:hi]
+            expected.add(lo + int(np.argmin(chunk)))
+            expected.add(lo + int(np.argmax(chunk)))
+    assert set(idx.tolist()) == expected
+    assert vals.min() == values.min() and vals.max() == values.max()
+
+
+def test_minmax_uses_aggregate_columns():
+    # Agregados (media, mín, máx): los extremos salen de low/high, no de la media
+    ts = np.array([0.0, 1.0, 2.0, 3.0])
+    mean = np.array([-60.0, -62.0, -61.0, -59.0])
+    low = np.array([-64.0, -70.0, -63.0, -60.0])
+    high = np.array([-55.0, -58.0, -57.0, -50.0])
+    idx, vals = minmax(ts, mean, 2, low=low, high=high)
+    assert idx.tolist() == [0, 1, 2, 3]
+    assert vals.tolist() == [-55.0, -70.0, -63.0, -50.0]
+    # Un agregado solo en su bucket aporta sus dos extremos
+    idx, vals = minmax(ts[:1], mean[:1], 1, low=low[:1], high=high[:1])
+    assert idx.tolist() == [0, 0]
+    assert vals.tolist() == [-64.0, -55.0]
+
+
+# ===== downsample =====
+
+@pytest.mark.parametrize('method', ['lttb', 'minmax'])
+def test_downsample_payload_follows_width(method):
+    ts, values = _series(100_000, seed=2)
+    out = downsample(ts, values, 800, method)
+    assert len(out['ts']) == len(out['rssi']) <= 800
+    assert np.all(np.diff(out['ts']) >= 0)
+    assert len(downsample(ts, values, 10 ** 6, method)['ts']) <= MAX_WIDTH
+
+
+def test_downsample_rejects_unknown_method():
+    with pytest.raises(ValueError):
+        downsample(np.arange(5.0), np.zeros(5), 100, 'promedio')
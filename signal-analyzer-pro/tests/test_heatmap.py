@@ -0,0 +1,97 @@
+"""
+Signal Analyzer Pro - Pruebas del motor de mapas de calor
+La interpolación por FFT contra la suma directa de pesos (y contra el
+algoritmo original del cliente, reference_heatmap), y la caché de renders de
+HeatmapService acotada por bytes.
+"""
+import numpy as np
+import pytest
+
+from heatmap import (KERNELS, MIN_WEIGHT, HeatmapService, interpolate, kernel_weight,
+                     reference_heatmap)
+
+
+def _points(n=30, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.column_stack([rng.uniform(0, 400, n), rng.uniform(0, 400, n), rng.uniform(-90, -40, n)])
+
+
+def _direct(pts, xs, ys, kernel):
+    """Suma directa O(celdas·puntos) de los pesos del kernel, con el mismo corte"""
+    d = np.hypot(xs[None, :, None] - pts[:, 0], ys[:, None, None] - pts[:, 1])
+    w = kernel_weight(kernel, d)
+    w[w <= MIN_WEIGHT] = 0.0
+    total = w.sum(axis=2)
+    rssi = np.full(total.shape, np.nan)
+    covered = total > 1e-9
+    rssi[covered] = (w @ pts[:, 2])[covered] / total[covered]
+    return rssi, total
+
+
+# ===== Interpolación =====
+
+@pytest.mark.parametrize('kernel', sorted(KERNELS))
+def test_grid_aligned_points_match_direct_sum(kernel):
+    # Puntos sobre nodos y paso >= cutoff / MAX_KERNEL_RADIUS: la convolución es exacta
+    rng = np.random.default_rng(1)
+    pts = np.column_stack([rng.integers(0, 150, 40) * 4.0, rng.integers(0, 100, 40) * 4.0,
+                           rng.uniform(-95, -30, 40)])
+    rssi, total = interpolate(pts, 0, 0, 600, 400, step=4.0, kernel=kernel)
+    ref, ref_total = _direct(pts, np.arange(0, 600, 4.0), np.arange(0, 400, 4.0), kernel)
+    assert rssi.shape == (100, 150)
+    np.testing.assert_array_equal(np.isnan(rssi), np.isnan(ref))
+    np.testing.assert_allclose(total, ref_total, atol=1e-9)
+    np.testing.assert_allclose(rssi[~np.isnan(ref)], ref[~np.isnan(ref)], atol=1e-6)
+
+
+@pytest.mark.parametrize('n', [10, 100, 1000])
+def test_matches_client_reference(n):
+    # Posiciones libres: cada punto se corre a lo sumo medio paso al acumular
+    rng = np.random.default_rng(n)
+    pts = np.column_stack([rng.uniform(0, 400, n), rng.uniform(0, 300, n), rng.uniform(-95, -30, n)])
+    rssi, total = interpolate(pts, 0, 0, 400, 300, step=2)
+    ref, ref_total = reference_heatmap(pts, 400, 300, step=2)
+    covered = ~np.isnan(ref)
+    np.testing.assert_array_equal(np.isnan(rssi), ~covered)
+    assert np.max(np.abs(rssi[covered] - ref[covered])) < 0.5
+    assert np.max(np.abs(total - ref_total)) < 0.02 * ref_total.max()
+
+
+def test_fine_step_uses_coarse_grid():
+    # step < cutoff / MAX_KERNEL_RADIUS: convolución gruesa y remuestreo bilineal
+    rng = np.random.default_rng(2)
+    pts = np.column_stack([rng.uniform(0, 64, 20), rng.uniform(0, 64, 20), rng.uniform(-90, -40, 20)])
+    rssi, total = interpolate(pts, 0, 0, 64, 64, step=0.25)
+    ref, ref_total = _direct(pts, np.arange(0, 64, 0.25), np.arange(0, 64, 0.25), 'exp')
+    assert rssi.shape == (256, 256)
+    assert np.max(np.abs(rssi - ref)) < 0.5
+    assert np.max(np.abs(total - ref_total)) < 0.02 * ref_total.max()
+
+
+# ===== Caché =====
+
+def test_cache_is_bounded_by_bytes():
+    # Una región cruda de 128x128 ocupa 128 KB: entran 4 en 600 KB
+    service = HeatmapService(max_bytes=600_000, max_entry_bytes=200_000)
+    pts = _points()
+    for offset in range(10):
+        service.render(pts, offset, 0, 128, 128, step=1.0, fmt='raw')
+    assert len(service._cache) == 4
+    assert service._cache_bytes == sum(len(data) for data, _ in service._cache.values())
+    assert service._cache_bytes <= service.max_bytes
+
+
+def test_large_render_bypasses_cache():
+    service = HeatmapService(max_entry_bytes=100_000)
+    data, shape = service.render(_points(), 0, 0, 200, 200, step=1.0, fmt='raw')
+    assert shape == (200, 200)
+    assert len(data) == 200 * 200 * 8
+    assert len(service._cache) == 0 and service._cache_bytes == 0
+
+
+def test_cached_render_is_reused():
+    service = HeatmapService()
+    pts = _points()
+    first = service.render(pts, 0, 0, 64, 64, step=1.0)
+    assert service.render(pts, 0, 0, 64, 64, step=1.0) is first
+    assert service._cache_bytes == len(first[0])
@@ -0,0 +1,70 @@
+"""
+Signal Analyzer Pro - Pruebas de la ingesta de sondas
+Validación de lotes (decode_batch) y deduplicación del hub entre reinicios
+del colector, con un almacén en memoria.
+"""
+import pytest
+
+from collector import Collector, SimulatedSource
+from ingest import IngestHub, decode_batch, encode_batch
+
+
+class MemoryStore:
+    def __init__(self):
+        self.rows = []
+
+    def append_wifi_many(self, rows):
+        self.rows.extend(rows)
+
+
+def _batch(**changes):
+    batch = {'v': 1, 'probe': 'piso2-a', 'seq': 1, 't0': 1700000000.0,
+             'streams': [{'iface': 'wlan0', 'ssid': 'Oficina', 'channel': 6,
+                          'dt': [0, 500], 'rssi': [-61, -60]}]}
+    batch.update(changes)
+    return batch
+
+
+def test_roundtrip():
+    batch = decode_batch(encode_batch(_batch()))
+    assert batch['streams'][0]['rssi'] == [-61, -60]
+
+
+@pytest.mark.parametrize('body', [
+    b'{"v":1,"probe":"p","seq":1,"t0":1,"streams":[{"iface":"w","dt":[0],"rssi":[NaN]}]}',
+    b'{"v":1,"probe":"p","seq":1,"t0":1,"streams":[{"iface":"w","dt":[0],"rssi":[1e999]}]}',
+    b'{"v":1,"probe":"p","seq":1,"t0":1,"streams":[{"iface":"w","dt":[Infinity],"rssi":[-50]}]}',
+    b'{"v":1,"probe":"p","seq":1,"t0":1,"streams":[{"iface":"w","dt":[0],"rssi":[-500]}]}',
+    b'{"v":1,"probe":"p","seq":1,"t0":1,"streams":[{"iface":"w","dt":[0],"rssi":[12]}]}',
+    b'{"v":1,"probe":"p","seq":1,"t0":NaN,"streams":[]}',
+    b'{"v":1,"probe":"p","seq":1,"t0":1,"streams":[1]}',
+    b'{"v":1,"probe":"p","seq":1,"t0":1,"streams":[{"iface":"w","dt":[0, 1],"rssi":[-50]}]}',
+    b'{"v":1,"probe":"p","boot":"a b","seq":1,"t0":1,"streams":[]}',
+    b'no es json'
+])
+def test_invalid_batches_are_rejected(body):
+    with pytest.raises(ValueError):
+        decode_batch(body)
+
+
+def test_duplicate_batch_is_dropped():
+    store = MemoryStore()
+    hub = IngestHub(store)
+    data = encode_batch(_batch(boot='b1'))
+    assert hub.ingest(decode_batch(data)) == (2, False)
+    assert hub.ingest(decode_batch(data)) == (0, True)
+    assert len(store.rows) == 2
+
+
+def test_restarted_collector_is_not_deduplicated():
+    store = MemoryStore()
+    hub = IngestHub(store)
+    for run in range(2):
+        # Cada corrida vuelve a empezar en seq 1
+        collector = Collector('piso2-a', SimulatedSource(1, seed=run), uploader=None)
+        for _ in range(3):
+            collector.sample()
+            accepted, duplicate = hub.ingest(decode_batch(collector.take_batch()))
+            assert (accepted, duplicate) == (1, False)
+    assert len(store.rows) == 6
+    assert hub.duplicates == 0
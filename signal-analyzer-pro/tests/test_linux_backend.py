@@ -0,0 +1,92 @@
+"""
+Signal Analyzer Pro - Pruebas del backend nativo de Linux
+/proc/net/wireless grabado de varios drivers: formatos en dBm, nivel u8 sin
+signo e interfaces sin asociar. El lector y el backend se prueban sobre los
+archivos (sin radio ni nl80211).
+"""
+import pytest
+
+from linux_backend import LinuxWirelessBackend, ProcNetWirelessReader, parse_proc_net_wireless
+
+
+# ===== Parser =====
+
+def test_signed_dbm(fixture_text):
+    interfaces = parse_proc_net_wireless(fixture_text('proc_net_wireless_dbm.txt'))
+    assert interfaces == {'wlan0': {'link': 54.0, 'level': -56, 'noise': None}}
+
+
+def test_u8_wraparound(fixture_text):
+    interfaces = parse_proc_net_wireless(fixture_text('proc_net_wireless_u8.txt'))
+    assert interfaces['wlan0']['level'] == 200 - 256
+    assert interfaces['wlan0']['noise'] == 161 - 256
+
+
+def test_unassociated_interface_has_no_level(fixture_text):
+    interfaces = parse_proc_net_wireless(fixture_text('proc_net_wireless_multi.txt'))
+    # Sin punto decimal también es válido
+    assert interfaces['wlan0'] == {'link': 60.0, 'level': -61, 'noise': -95}
+    # Nivel 0 = el driver no tiene dato, no una señal de 0 dBm
+    assert interfaces['wlan1']['level'] is None
+    assert interfaces['wlan1']['noise'] is None
+
+
+def test_header_only(fixture_text):
+    assert parse_proc_net_wireless(fixture_text('proc_net_wireless_empty.txt')) == {}
+
+
+@pytest.mark.parametrize('line', [
+    ' wlan0: 0000   54.',
+    ' wlan0: 0000   abc.  -56.  -256',
+    'sin dos puntos'
+])
+def test_malformed_lines_are_skipped(line):
+    header = 'Inter-| sta-|\n face | tus |\n'
+    assert parse_proc_net_wireless(header + line + '\n') == {}
+
+
+# ===== Lector y backend =====
+
+def test_reader_rereads_with_open_descriptor(fixture_path):
+    reader = ProcNetWirelessReader(fixture_path('proc_net_wireless_dbm.txt'))
+    try:
+        first = reader.read()
+        fd = reader._fd
+        assert reader.read() == first
+        assert reader._fd == fd
+    finally:
+        reader.close()
+    assert reader._fd is None
+
+
+def _backend(fixture_path, name, **options):
+    return LinuxWirelessBackend(proc_path=fixture_path(name), use_netlink=False,
+                                info_fallback=lambda: ('Oficina', 44), **options)
+
+
+def test_backend_read(fixture_path):
+    backend = _backend(fixture_path, 'proc_net_wireless_u8.txt')
+    try:
+        assert backend.read() == (-56, 'Oficina', 44)
+    finally:
+        backend.close()
+
+
+def test_backend_skips_unassociated(fixture_path):
+    backend = _backend(fixture_path, 'proc_net_wireless_multi.txt')
+    try:
+        assert backend.read_all() == {'wlan0': (-61, 'Oficina', 44)}
+        # La interfaz pedida no está asociada y no hay nl80211: sin lectura
+        backend.interface = 'wlan1'
+        assert backend.read() == (None, None, None)
+    finally:
+        backend.close()
+
+
+def test_backend_without_wext(fixture_path):
+    backend = _backend(fixture_path, 'proc_net_wireless_empty.txt')
+    try:
+        assert backend.read() == (None, None, None)
+        assert backend.read_all() == {}
+    finally:
+        backend.close()
@@ -0,0 +1,151 @@
+"""
+Signal Analyzer Pro - Pruebas de los parsers de herramientas
+Salidas grabadas de netsh, nmcli, iwconfig y airport: cada parser se
+verifica campo por campo y se mide su throughput con pytest-benchmark
+(pytest --benchmark-only para correr solo las mediciones).
+"""
+import pytest
+
+import parsers
+
+
+# ===== netsh =====
+
+def test_netsh_interfaces_english(fixture_text):
+    info = parsers.parse_netsh_interfaces(fixture_text('netsh_interfaces_en.txt'))
+    assert info['ssid'] == 'Oficina'
+    assert info['bssid'] == '9c:53:22:aa:bb:cc'
+    assert info['channel'] == 44
+    assert info['signal'] == 88
+    # El RSSI directo de Windows 11 tiene prioridad sobre el porcentaje
+    assert info['rssi'] == -52
+    assert info['radio_type'] == '802.11ax'
+    assert info['auth'] == 'WPA2-Personal'
+    assert info['state'] == 'connected'
+
+
+def test_netsh_interfaces_spanish_cp850(fixture_bytes):
+    text, encoding = parsers.decode_output(fixture_bytes('netsh_interfaces_es_cp850.txt'))
+    assert encoding == 'cp850'
+    info = parsers.parse_netsh_interfaces(text)
+    assert info['ssid'] == 'Casa_2.4'
+    assert info['bssid'] == '60:32:b1:de:ad:01'
+    assert info['channel'] == 6
+    assert info['signal'] == 70
+    assert info['rssi'] == parsers.percent_to_dbm(70)
+    assert info['auth'] == 'WPA2-Personal'
+    assert info['state'] == 'conectado'
+
+
+def test_decode_output_uses_cached_encoding(fixture_bytes):
+    raw = fixture_bytes('netsh_interfaces_es_cp850.txt')
+    text, encoding = parsers.decode_output(raw, encoding_cache='cp850')
+    assert encoding == 'cp850'
+    assert 'Señal' in text
+
+
+def test_netsh_networks(fixture_text):
+    networks = parsers.parse_netsh_networks(fixture_text('netsh_networks_en.txt'))
+    assert [n['ssid'] for n in networks] == ['Oficina', 'Invitados']
+    assert networks[0]['auth'] == 'WPA2-Personal'
+    assert networks[0]['bssids'] == [
+        {'mac': '9c:53:22:aa:bb:cc', 'signal': 88, 'channel': 44},
+        {'mac': '9c:53:22:aa:bb:cd', 'signal': 64, 'channel': 1}
+    ]
+    assert networks[1]['bssids'] == [{'mac': '9c:53:22:aa:bb:ce', 'signal': 40, 'channel': 11}]
+
+
+# ===== nmcli =====
+
+@pytest.mark.parametrize('name, expected', [
+    ('nmcli_active_en.txt', (parsers.percent_to_dbm(78), 'Oficina:5G', 36)),
+    ('nmcli_active_es.txt', (parsers.percent_to_dbm(60), 'Casa', 6))
+])
+def test_nmcli_active(fixture_text, name, expected):
+    assert parsers.parse_nmcli_active(fixture_text(name)) == expected
+
+
+def test_nmcli_active_without_connection():
+    assert parsers.parse_nmcli_active('no:Vecino:35:1\n') == (None, None, None)
+
+
+def test_nmcli_networks(fixture_text):
+    networks = parsers.parse_nmcli_networks(fixture_text('nmcli_networks.txt'))
+    assert len(networks) == 4
+    assert networks[0] == {'ssid': 'Oficina',
+                           'bssids': [{'mac': '9C:53:22:AA:BB:CC', 'channel': 44, 'signal': 88}]}
+    # Red oculta: SSID vacío, el BSSID escapado igual se separa bien
+    assert networks[3]['ssid'] == ''
+    assert networks[3]['bssids'][0]['mac'] == '3A:1F:00:11:22:33'
+    assert networks[3]['bssids'][0]['channel'] == 149
+
+
+# ===== iwconfig =====
+
+def test_iwconfig_dbm(fixture_text):
+    # Sin "Channel": el canal sale de la frecuencia (5.22 GHz -> 44)
+    assert parsers.parse_iwconfig(fixture_text('iwconfig_dbm.txt')) == (-52, 'Oficina', 44)
+
+
+def test_iwconfig_relative_quality(fixture_text):
+    rssi, ssid, channel = parsers.parse_iwconfig(fixture_text('iwconfig_quality.txt'))
+    assert rssi == parsers.percent_to_dbm(70)
+    assert ssid == 'Casa'
+    assert channel == 6
+
+
+def test_iwconfig_not_wireless():
+    assert parsers.parse_iwconfig('lo        no wireless extensions.\n') == (None, None, None)
+
+
+# ===== airport =====
+
+def test_airport(fixture_text):
+    assert parsers.parse_airport(fixture_text('airport.txt')) == (-58, 'Oficina', 44)
+
+
+@pytest.mark.parametrize('freq, channel', [
+    (2412, 1), (2437, 6), (2484, 14), (5180, 36), (5220, 44), (5955, 1), (900, None), (None, None)
+])
+def test_freq_to_channel(freq, channel):
+    assert parsers.freq_to_channel(freq) == channel
+
+
+# ===== Throughput =====
+
+BENCHMARKS = [
+    ('netsh_interfaces_en.txt', parsers.parse_netsh_interfaces),
+    ('netsh_networks_en.txt', parsers.parse_netsh_networks),
+    ('nmcli_active_en.txt', parsers.parse_nmcli_active),
+    ('nmcli_networks.txt', parsers.parse_nmcli_networks),
+    ('iwconfig_dbm.txt', parsers.parse_iwconfig),
+    ('airport.txt', parsers.parse_airport)
+]
+
+
+@pytest.mark.parametrize('name, parse', BENCHMARKS, ids=[name for name, _ in BENCHMARKS])
+def test_parse_throughput(benchmark, fixture_text, name, parse):
+    text = fixture_text(name)
+    assert benchmark(parse, text) == parse(text)
+
+
+def test_netsh_decode_and_parse_throughput(benchmark, fixture_bytes):
+    """Camino completo de Windows: bytes de la consola -> campos"""
+    raw = fixture_bytes('netsh_interfaces_es_cp850.txt')
+
+    def run():
+        text, _ = parsers.decode_output(raw, encoding_cache='cp850')
+        return parsers.parse_netsh_interfaces(text)
+
+    assert benchmark(run)['channel'] == 6
+
+
+def test_netsh_large_scan_throughput(benchmark, fixture_text):
+    """Escaneo denso (200 redes): el costo debe crecer lineal con la salida"""
+    header, _, body = fixture_text('netsh_networks_en.txt').partition('\nSSID 1 : ')
+    block = 'SSID 1 : ' + body.split('\nSSID 2 : ')[0]
+    text = header + '\n' + '\n'.join(block.replace('SSID 1 : Oficina', f'SSID {i} : Red-{i}', 1)
+                                     for i in range(1, 201))
+    networks = benchmark(parsers.parse_netsh_networks, text)
+    assert len(networks) == 200
+    assert all(len(n['bssids']) == 2 for n in networks)
@@ -0,0 +1,141 @@
+"""
+Signal Analyzer Pro - Pruebas del planificador de muestreo
+Relojes simulados con wait_time(now=...) y observe(now=...): plazos en
+t0 + k·período, realineación tras plazos perdidos y límites del modo
+adaptativo. PlanificadorMuestreo (la copia de la app de escritorio) se prueba
+con los mismos casos cuando tkinter y matplotlib están instalados.
+"""
+import importlib.util
+import os
+from importlib.machinery import SourceFileLoader
+
+import pytest
+
+from scheduler import AdaptiveScheduler
+
+
+def test_first_wait_is_a_full_period():
+    scheduler = AdaptiveScheduler(0.2)
+    assert scheduler.wait_time(now=100.0) == pytest.approx(0.2)
+
+
+def test_deadlines_do_not_drift():
+    scheduler = AdaptiveScheduler(0.2)
+    now = 100.0
+    wakeups = []
+    for read in (0.01, 0.15, 0.0, 0.05, 0.19):
+        # Cada lectura tarda distinto; el despertar queda en la grilla de 0.2 s
+        now += read
+        now += scheduler.wait_time(now=now)
+        wakeups.append(now)
+    assert wakeups == pytest.approx([100.21, 100.41, 100.61, 100.81, 101.01])
+    assert scheduler.missed == 0
+    assert scheduler.ticks == 5
+
+
+def test_missed_deadlines_realign_without_burst():
+    scheduler = AdaptiveScheduler(0.2)
+    scheduler.wait_time(now=100.0)          # plazo 100.2
+    # La lectura termina en 100.95: 100.4 y 100.6 se pierden y 100.8 sale tarde
+    assert scheduler.wait_time(now=100.95) == 0.0
+    assert scheduler.missed == 2
+    # Una sola muestra atrasada y de vuelta en la grilla (101.0), sin ráfaga
+    assert scheduler.wait_time(now=100.96) == pytest.approx(0.04)
+    assert scheduler.wait_time(now=101.0) == pytest.approx(0.2)
+
+
+def test_late_but_within_one_period_is_not_missed():
+    scheduler = AdaptiveScheduler(0.2)
+    scheduler.wait_time(now=100.0)          # plazo 100.2
+    # Vencido por menos de un período: sale enseguida y sigue la grilla
+    assert scheduler.wait_time(now=100.5) == 0.0
+    assert scheduler.missed == 0
+    assert scheduler.wait_time(now=100.5) == pytest.approx(0.1)
+
+
+def test_reset_restarts_the_grid():
+    scheduler = AdaptiveScheduler(0.2)
+    scheduler.wait_time(now=100.0)
+    scheduler.wait_time(now=101.0)
+    scheduler.reset()
+    assert scheduler.missed == 0
+    assert scheduler.wait_time(now=500.0) == pytest.approx(0.2)
+
+
+def test_fixed_mode_ignores_activity():
+    scheduler = AdaptiveScheduler(1.0)
+    for i in range(20):
+        scheduler.observe(-50 if i % 2 else -80, now=100.0 + i)
+    assert scheduler.interval == 1.0
+
+
+def test_adaptive_speeds_up_to_min_interval():
+    scheduler = AdaptiveScheduler(1.0, adaptive=True)
+    for i in range(20):
+        # Walk-test: 30 dB por muestra
+        scheduler.observe(-50 if i % 2 else -80, now=100.0 + i * 0.1)
+    assert scheduler.interval == pytest.approx(0.25)
+
+
+def test_adaptive_backs_off_to_max_interval():
+    scheduler = AdaptiveScheduler(1.0, adaptive=True)
+    for i in range(100):
+        scheduler.observe(-60, now=100.0 + i)
+    assert scheduler.interval == pytest.approx(4.0)
+
+
+def test_explicit_bounds_and_set_interval_clamp():
+    scheduler = AdaptiveScheduler(1.0, adaptive=True, min_interval=0.5, max_interval=2.0)
+    for i in range(100):
+        scheduler.observe(-60, now=100.0 + i)
+    assert scheduler.interval == pytest.approx(2.0)
+    # Un período pedido más corto no baja el vigente de los límites explícitos
+    scheduler.set_interval(0.1)
+    assert scheduler.min_interval == 0.5
+    assert scheduler.interval == pytest.approx(2.0)
+    # La espera usa el período adaptado
+    assert scheduler.wait_time(now=0.0) == pytest.approx(2.0)
+
+
+# ===== PlanificadorMuestreo (WiFiMonitor.PY) =====
+
+@pytest.fixture(scope='module')
+def planificador_cls():
+    pytest.importorskip('tkinter')
+    pytest.importorskip('matplotlib')
+    path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(
+        os.path.abspath(__file__)))), 'WiFiMonitor.PY')
+    loader = SourceFileLoader('wifimonitor', path)
+    spec = importlib.util.spec_from_loader('wifimonitor', loader)
+    module = importlib.util.module_from_spec(spec)
+    loader.exec_module(module)
+    return module.PlanificadorMuestreo
+
+
+def test_planificador_first_wait_and_grid(planificador_cls):
+    planificador = planificador_cls()
+    assert planificador.espera(0.2, ahora=100.0) == pytest.approx(0.2)
+    assert planificador.espera(0.2, ahora=100.35) == pytest.approx(0.05)
+    assert planificador.perdidos == 0
+
+
+def test_planificador_missed_deadlines(planificador_cls):
+    planificador = planificador_cls()
+    planificador.espera(0.2, ahora=100.0)
+    assert planificador.espera(0.2, ahora=100.95) == 0.0
+    assert planificador.perdidos == 2
+    assert planificador.espera(0.2, ahora=100.96) == pytest.approx(0.04)
+
+
+def test_planificador_clamps_adaptive_interval(planificador_cls):
+    planificador = planificador_cls()
+    planificador.espera(1.0, adaptativo=True, ahora=0.0)
+    planificador.intervalo = 0.01
+    planificador.espera(1.0, adaptativo=True, ahora=0.1)
+    assert planificador.intervalo == pytest.approx(0.25)
+    planificador.intervalo = 100.0
+    planificador.espera(1.0, adaptativo=True, ahora=0.2)
+    assert planificador.intervalo == pytest.approx(4.0)
+    # Sin modo adaptativo vuelve al intervalo pedido
+    planificador.espera(1.0, ahora=0.3)
+    assert planificador.intervalo == 1.0
@@ -0,0 +1,80 @@
+"""
+Signal Analyzer Pro - Pruebas del análisis espectral
+El analizador incremental (SDFT + Welch con suma móvil, autocorrelación por
+sumas de productos) contra el cálculo directo sobre la misma serie.
+"""
+import numpy as np
+import pytest
+
+from spectrum import SpectrumAnalyzer, welch_reference
+
+
+def _signal(n, seed=0):
+    """RSSI con desvanecimiento lento, una componente periódica y ruido"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(n)
+    return -65 + 6 * np.sin(2 * np.pi * t / 37) + np.cumsum(rng.normal(0, 0.3, n)) \
+        + rng.normal(0, 1.5, n)
+
+
+def _feed(values, dt=0.5, **options):
+    analyzer = SpectrumAnalyzer(**options)
+    for i, value in enumerate(values.tolist()):
+        analyzer.update(1.7e9 + i * dt, value)
+    return analyzer
+
+
+def _acf_reference(values, window, max_lag):
+    """Covarianza por lag de los pares cuyo miembro nuevo está en la ventana, normalizada"""
+    start = len(values) - window
+    acf = []
+    for lag in range(min(len(values) - 1, max_lag) + 1):
+        new = values[max(start, lag):]
+        old = values[max(start, lag) - lag:len(values) - lag]
+        acf.append(np.mean(new * old) - new.mean() * old.mean())
+    acf = np.array(acf)
+    return acf / acf[0]
+
+
+@pytest.mark.parametrize('n', [128, 200, 1000, 5000])
+def test_psd_matches_welch_reference(n):
+    values = _signal(n)
+    analyzer = _feed(values)
+    freqs, psd = analyzer.psd()
+    ref_freqs, ref_psd = welch_reference(values, fs=2.0, size=128, segments=8)
+    np.testing.assert_allclose(freqs, ref_freqs)
+    np.testing.assert_allclose(psd, ref_psd, rtol=1e-6, atol=1e-9 * ref_psd.max())
+
+
+def test_psd_with_other_sizes():
+    values = _signal(3000, seed=1)
+    analyzer = _feed(values, dt=0.1, size=64, segments=4)
+    _, psd = analyzer.psd()
+    _, ref_psd = welch_reference(values, fs=10.0, size=64, segments=4)
+    np.testing.assert_allclose(psd, ref_psd, rtol=1e-6, atol=1e-9 * ref_psd.max())
+
+
+def test_no_psd_before_first_segment():
+    analyzer = _feed(_signal(127))
+    assert analyzer.psd() == (None, None)
+    assert analyzer.frame() is None
+
+
+@pytest.mark.parametrize('n', [20, 300, 2000])
+def test_autocorrelation_matches_direct(n):
+    values = _signal(n, seed=2)
+    analyzer = _feed(values)
+    window = min(n, analyzer.window)
+    np.testing.assert_allclose(analyzer.autocorrelation(),
+                               _acf_reference(values, window, analyzer.max_lag), atol=1e-8)
+
+
+def test_reset_discards_history():
+    analyzer = _feed(_signal(1000))
+    analyzer.reset()
+    values = _signal(500, seed=3)
+    for i, value in enumerate(values.tolist()):
+        analyzer.update(i * 0.5, value)
+    _, psd = analyzer.psd()
+    _, ref_psd = welch_reference(values, fs=2.0, size=128, segments=8)
+    np.testing.assert_allclose(psd, ref_psd, rtol=1e-6, atol=1e-9 * ref_psd.max())